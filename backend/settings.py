@@ -17,6 +17,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'users',
     'Tickets',
@@ -104,7 +105,27 @@ CELERY_BEAT_SCHEDULE = {
     "escalate-team-pmo-overdue": {
         "task": "tickets.tasks.escalate_team_pmo_overdue",
         "schedule": 60.0,  # every 60 seconds
-    }
+    },
+    "collect-orphan-media": {
+        "task": "inventory.tasks.collect_orphan_media_task",
+        "schedule": 24 * 60 * 60.0,  # nightly — quarantines, never hard-deletes
+    },
+    "refresh-warranty-status": {
+        "task": "inventory.tasks.refresh_warranty_status",
+        "schedule": 24 * 60 * 60.0,  # nightly — ACTIVE → EXPIRED + per-vendor expiry digest
+    },
+    "reconcile-stock": {
+        "task": "inventory.tasks.reconcile_stock_task",
+        "schedule": 24 * 60 * 60.0,  # nightly — issued/available counters vs open issue records
+    },
+    "expire-stock-reservations": {
+        "task": "inventory.tasks.expire_stock_reservations",
+        "schedule": 5 * 60.0,  # every 5 minutes — expired holds back to available stock
+    },
+    "forecast-stock-depletion": {
+        "task": "inventory.tasks.forecast_stock_depletion",
+        "schedule": 24 * 60 * 60.0,  # nightly — consumption rates, stock-out dates, order quantities
+    },
 }
 
 
@@ -114,6 +135,67 @@ from datetime import timedelta
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Media serving (inventory/views_media.py): /media/ is served by Django in DEBUG only;
+# /api/inventory/media/<path> is the JWT-protected route (invoices) in every environment.
+# None = Django streams the file, "nginx" = X-Accel-Redirect to MEDIA_ACCEL_REDIRECT_PREFIX
+# (make that location `internal`), "apache" = X-Sendfile
+MEDIA_SENDFILE_BACKEND      = None
+MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+
+# Orphaned media collector (inventory/media_gc.py)
+MEDIA_GC_GRACE_HOURS  = 24
+MEDIA_QUARANTINE_ROOT = os.path.join(BASE_DIR, "media_quarantine")
+
+# Host encoded into asset QR codes (inventory/qr.py) — change it, then run
+# `manage.py regenerate_qr_codes` to warm the cache for the new URL
+QR_BASE_URL = "http://192.168.18.160:8000"
+
+# Rendered asset details page (inventory/detail_page.py) — dropped on every asset save
+ASSET_DETAIL_CACHE_TIMEOUT = 60 * 60
+
+# Nightly warranty job (inventory/warranty.py) — digest emailed only if recipients are set
+WARRANTY_DIGEST_DAYS       = 30
+WARRANTY_DIGEST_RECIPIENTS = []
+
+# Fleet depreciation (inventory/depreciation.py) — per-category overrides of DEFAULT_POLICIES, e.g.
+# DEPRECIATION_POLICIES = {"LAPTOP": {"method": "SL", "life_years": 3, "salvage_rate": 0.1}}
+DEPRECIATION_POLICIES      = {}
+DEPRECIATION_CACHE_TIMEOUT = 60 * 60
+
+# Stock depletion forecast (inventory/forecasting.py) — "EWMA" or "SMA" daily net issue rate;
+# target stock covers lead time + FORECAST_REVIEW_DAYS with FORECAST_SERVICE_Z safety stock
+FORECAST_METHOD                 = "EWMA"
+FORECAST_HISTORY_DAYS           = 180
+FORECAST_SMA_WINDOW_DAYS        = 28
+FORECAST_SMOOTHING_ALPHA        = 0.1
+FORECAST_REVIEW_DAYS            = 30
+FORECAST_SERVICE_Z              = 1.65
+FORECAST_DEFAULT_LEAD_TIME_DAYS = 14
+
+# Asset utilization report (inventory/utilization.py) — cached per window + data fingerprint
+UTILIZATION_CACHE_TIMEOUT = 60 * 60
+
+# Kiosk scan lookups (inventory/kiosk.py) — dropped on every issue / return
+KIOSK_CACHE_TIMEOUT = 5 * 60
+
+# Nightly stock reconciliation (inventory/reconcile.py) — False = report drift only
+STOCK_RECONCILE_REPAIR = False
+
+# Stock reservations (inventory/reservations.py) — default hold before the sweeper releases it
+STOCK_RESERVATION_TTL_MINUTES = 24 * 60
+
+# Server-side asset tags (inventory/tags.py) — "<prefix>-<zero-padded number>", prefix per category
+ASSET_TAG_PREFIXES = {
+    "LAPTOP":   "LAP",
+    "DESKTOP":  "DSK",
+    "MOUSE":    "MOU",
+    "KEYBOARD": "KBD",
+    "MONITOR":  "MON",
+    "PRINTER":  "PRN",
+    "OTHER":    "AST",
+}
+ASSET_TAG_DIGITS = 6
+
 
 WSGI_APPLICATION = "backend.wsgi.application"
 
@@ -129,7 +211,6 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
@@ -137,6 +218,13 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
             ],
+            # ✅ Compiled templates kept in memory, even with DEBUG = True
+            "loaders": [
+                ("django.template.loaders.cached.Loader", [
+                    "django.template.loaders.filesystem.Loader",
+                    "django.template.loaders.app_directories.Loader",
+                ]),
+            ],
         },
     },
 ]
@@ -1,7 +1,8 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from inventory.views_media import serve_media
 
 
 
@@ -32,5 +33,9 @@ urlpatterns = [
     path("api/reports/", include("reports.urls")),
 ]
 
+# ✅ Media (incl. QR PNGs): ETag / 304 / Range — development only; in production the
+# web server serves MEDIA_ROOT and private files go through /api/inventory/media/<path>
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += [
+        re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.*)$", serve_media, name="serve_media"),
+    ]
@@ -0,0 +1,190 @@
+# inventory/bulk_edit.py
+"""
+Bulk asset edits (re-locating a floor, re-grading after an audit).
+
+One sparse field map is applied to every asset picked by an id list or a
+filter:
+
+  validate   each field once (Field.clean — type, choices, max_length, FK)
+  dry run    COUNT of matched rows and of rows that would actually change
+  apply      lock the changing rows and read their old values (one SELECT),
+             one UPDATE of just those columns per id chunk, then one
+             bulk_create of AssetChange rows for the audit trail
+
+Only descriptive / placement fields are editable in bulk. Quantities,
+prices, vendor and spec fields have side effects (stock counters, vendor
+rollups, normalized spec columns) that update_inventory handles per row.
+"""
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, Q, Value, When
+from django.utils import timezone
+
+from .detail_page import invalidate_detail_pages
+from .kiosk import invalidate_scan_cache
+from .locations import stocked_at
+from .models import Asset, AssetChange, Location
+from .services import LOW_STOCK_STATUSES, enqueue_reorder_check
+
+EDITABLE_FIELDS = (
+    "category",
+    "type",
+    "brand",
+    "model_name",
+    "condition",
+    "current_location",
+    "remarks",
+    "minimum_stock_level",
+    "assigned_to",
+)
+
+# filter key → lookup ("location_id" is handled separately — subtree stock)
+FILTER_LOOKUPS = {
+    "category":         "category__iexact",
+    "status":           "status__iexact",
+    "condition":        "condition__iexact",
+    "current_location": "current_location__iexact",
+    "vendor_id":        "vendor_id",
+    "assigned_to":      "assigned_to_id",
+}
+
+MAX_IDS          = 5000
+UPDATE_CHUNK     = 1000
+AUDIT_BATCH_SIZE = 1000
+DRY_RUN_SAMPLE   = 20
+
+
+def clean_changes(changes):
+    """{field name: raw value} → {column attname: clean value}. ValidationError with per-field messages."""
+    if not isinstance(changes, dict) or not changes:
+        raise ValidationError({"changes": ["changes must be a non-empty object"]})
+
+    unknown = sorted(set(changes) - set(EDITABLE_FIELDS))
+    if unknown:
+        raise ValidationError({name: ["Not editable in bulk"] for name in unknown})
+
+    cleaned = {}
+    errors  = {}
+    for name, value in changes.items():
+        field = Asset._meta.get_field(name)
+        if value == "" and field.null:
+            value = None
+        try:
+            cleaned[field.attname] = field.clean(value, None)
+        except ValidationError as e:
+            errors[name] = e.messages
+    if errors:
+        raise ValidationError(errors)
+    return cleaned
+
+
+def target_queryset(ids=None, filters=None):
+    """Assets picked by an id list or a non-empty filter. ValueError otherwise."""
+    if ids:
+        if not isinstance(ids, list) or len(ids) > MAX_IDS:
+            raise ValueError(f"ids must be a list of at most {MAX_IDS} ids")
+        try:
+            return Asset.objects.filter(id__in=[int(i) for i in ids])
+        except (TypeError, ValueError):
+            raise ValueError("ids must be integers")
+
+    if not isinstance(filters, dict) or not filters:
+        # Never "every asset" by accident
+        raise ValueError("ids or a non-empty filter is required")
+
+    unknown = sorted(set(filters) - set(FILTER_LOOKUPS) - {"location_id"})
+    if unknown:
+        raise ValueError(f"Unknown filter(s): {', '.join(unknown)}")
+
+    qs = Asset.objects.filter(**{FILTER_LOOKUPS[key]: value for key, value in filters.items() if key != "location_id"})
+    if filters.get("location_id"):
+        try:
+            location = Location.objects.get(id=filters["location_id"])
+        except (Location.DoesNotExist, ValueError):
+            raise ValueError("Location not found")
+        qs = qs.filter(stocked_at(location))
+    return qs
+
+
+def _status_for_minimum(minimum):
+    """views._update_asset_status thresholds against the new minimum_stock_level."""
+    return Case(
+        When(available_quantity__lte=0, then=Value("OUT_OF_STOCK")),
+        When(available_quantity__lte=minimum, then=Value("LOW_STOCK")),
+        default=Value("AVAILABLE"),
+    )
+
+
+def _audit_value(value):
+    return None if value is None else str(value)
+
+
+def bulk_edit(queryset, changes, user=None, remarks=None, dry_run=False):
+    """
+    Apply cleaned `changes` (clean_changes output) to `queryset`.
+    Returns {matched, changed, batch, sample_ids (dry run)}.
+    """
+    columns  = list(changes)
+    changing = queryset.exclude(Q(**changes))
+
+    if dry_run:
+        return {
+            "matched":    queryset.count(),
+            "changed":    changing.count(),
+            "batch":      None,
+            "sample_ids": list(changing.order_by("id").values_list("id", flat=True)[:DRY_RUN_SAMPLE]),
+        }
+
+    new_minimum = changes.get("minimum_stock_level")
+    read        = columns + (["status"] if new_minimum is not None else [])
+    batch       = uuid.uuid4()
+    now         = timezone.now()
+
+    with transaction.atomic():
+        matched = queryset.count()
+        before  = list(changing.select_for_update().order_by("id").values_list("id", *read))
+        if not before:
+            return {"matched": matched, "changed": 0, "batch": None}
+
+        update = dict(changes, updated_at=now)
+        if new_minimum is not None:
+            update["status"] = _status_for_minimum(new_minimum)
+
+        ids = [row[0] for row in before]
+        for start in range(0, len(ids), UPDATE_CHUNK):
+            Asset.objects.filter(id__in=ids[start:start + UPDATE_CHUNK]).update(**update)
+
+        # ✅ Audit trail — one row per changed field, written in batches
+        names = {Asset._meta.get_field(name).attname: name for name in EDITABLE_FIELDS}
+        AssetChange.objects.bulk_create(
+            [
+                AssetChange(
+                    asset_id   = row[0],
+                    field      = names[column],
+                    old_value  = _audit_value(old),
+                    new_value  = _audit_value(changes[column]),
+                    batch      = batch,
+                    changed_by = user,
+                    remarks    = remarks,
+                    created_at = now,
+                )
+                for row in before
+                for column, old in zip(columns, row[1:])
+                if old != changes[column]
+            ],
+            batch_size=AUDIT_BATCH_SIZE,
+        )
+
+        if new_minimum is not None:
+            was_low = {row[0] for row in before if row[-1] in LOW_STOCK_STATUSES}
+            for asset_id in Asset.objects.filter(id__in=ids, status__in=LOW_STOCK_STATUSES).values_list("id", flat=True):
+                if asset_id not in was_low:
+                    enqueue_reorder_check(asset_id)
+
+        # queryset.update() skips the post_save signal
+        invalidate_detail_pages(ids)
+        invalidate_scan_cache(ids)
+
+    return {"matched": matched, "changed": len(ids), "batch": str(batch)}
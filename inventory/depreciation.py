@@ -0,0 +1,220 @@
+# inventory/depreciation.py
+"""
+Fleet depreciation / book value.
+
+The whole fleet is pulled with ONE values_list query into NumPy arrays and
+every asset is valued at once — straight-line ("SL") or declining-balance
+("DB") per category policy, in whole months of service, floored at salvage
+value and scaled by a condition factor. No per-asset Python loop.
+
+`fleet_valuation(as_of)` returns the per-asset arrays plus category totals
+and a year-end schedule; results are cached per (policy version, as-of date,
+fleet fingerprint), where the policy version is a hash of the effective
+policies so editing DEPRECIATION_POLICIES invalidates old entries.
+"""
+import hashlib
+import json
+from datetime import date
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import Asset
+
+# method: "SL" straight-line | "DB" declining balance (annual rate = db_factor / life_years)
+DEFAULT_POLICIES = {
+    "LAPTOP":   {"method": "DB", "life_years": 4, "salvage_rate": 0.10, "db_factor": 2.0},
+    "DESKTOP":  {"method": "SL", "life_years": 5, "salvage_rate": 0.10},
+    "MOUSE":    {"method": "SL", "life_years": 3, "salvage_rate": 0.0},
+    "KEYBOARD": {"method": "SL", "life_years": 3, "salvage_rate": 0.0},
+    "MONITOR":  {"method": "SL", "life_years": 5, "salvage_rate": 0.05},
+    "PRINTER":  {"method": "DB", "life_years": 5, "salvage_rate": 0.05, "db_factor": 1.5},
+    "OTHER":    {"method": "SL", "life_years": 5, "salvage_rate": 0.0},
+}
+DEFAULT_CONDITION_FACTORS = {"NEW": 1.0, "GOOD": 1.0, "FAIR": 0.85, "POOR": 0.6}
+
+POLICIES          = {**DEFAULT_POLICIES, **getattr(settings, "DEPRECIATION_POLICIES", {})}
+CONDITION_FACTORS = {**DEFAULT_CONDITION_FACTORS, **getattr(settings, "DEPRECIATION_CONDITION_FACTORS", {})}
+CACHE_TIMEOUT     = getattr(settings, "DEPRECIATION_CACHE_TIMEOUT", 60 * 60)
+
+MAX_SCHEDULE_YEARS = 10
+
+POLICY_VERSION = hashlib.sha1(
+    json.dumps([POLICIES, CONDITION_FACTORS], sort_keys=True).encode()
+).hexdigest()[:12]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOAD — one query → column arrays
+# ─────────────────────────────────────────────────────────────────────────────
+
+def load_fleet():
+    rows = list(
+        Asset.objects
+        .order_by("id")
+        .values_list("id", "asset_tag", "category", "condition", "purchase_price", "purchase_date")
+    )
+    ids, tags, categories, conditions, prices, dates = zip(*rows) if rows else ((),) * 6
+
+    category = np.array(categories, dtype=object)
+    fleet = {
+        "id":        np.array(ids, dtype=np.int64),
+        "asset_tag": np.array(tags, dtype=object),
+        "category":  category,
+        "condition": np.array(conditions, dtype=object),
+        "cost":      np.array(prices, dtype=np.float64),
+        "purchased": np.array(dates, dtype="datetime64[D]"),
+    }
+
+    # Per-asset policy columns (unknown categories fall back to OTHER)
+    n = len(ids)
+    fleet["life_months"]  = np.full(n, POLICIES["OTHER"]["life_years"] * 12, dtype=np.float64)
+    fleet["salvage_rate"] = np.full(n, POLICIES["OTHER"]["salvage_rate"], dtype=np.float64)
+    fleet["db_rate"]      = np.zeros(n, dtype=np.float64)
+    fleet["is_db"]        = np.zeros(n, dtype=bool)
+    for name, policy in POLICIES.items():
+        mask = category == name
+        if not mask.any():
+            continue
+        fleet["life_months"][mask]  = policy["life_years"] * 12
+        fleet["salvage_rate"][mask] = policy["salvage_rate"]
+        if policy["method"] == "DB":
+            fleet["is_db"][mask]   = True
+            fleet["db_rate"][mask] = policy.get("db_factor", 2.0) / policy["life_years"]
+
+    fleet["condition_factor"] = np.ones(n, dtype=np.float64)
+    for name, factor in CONDITION_FACTORS.items():
+        fleet["condition_factor"][fleet["condition"] == name] = factor
+    return fleet
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# VALUATION — vectorized
+# ─────────────────────────────────────────────────────────────────────────────
+
+def book_values(fleet, as_of):
+    """Book value of every asset at `as_of` (0 for assets bought after it)."""
+    as_of     = np.datetime64(as_of, "D")
+    months    = (as_of.astype("datetime64[M]") - fleet["purchased"].astype("datetime64[M]")).astype(np.int64)
+    months    = np.clip(months, 0, None).astype(np.float64)
+    cost      = fleet["cost"]
+    salvage   = cost * fleet["salvage_rate"]
+    exhausted = months >= fleet["life_months"]
+
+    straight  = cost - (cost - salvage) * np.minimum(months / fleet["life_months"], 1.0)
+    declining = np.where(
+        exhausted,
+        salvage,
+        np.maximum(salvage, cost * (1.0 - np.minimum(fleet["db_rate"], 1.0)) ** (months / 12.0)),
+    )
+
+    book = np.where(fleet["is_db"], declining, straight) * fleet["condition_factor"]
+    return np.where(fleet["purchased"] <= as_of, np.round(book, 2), 0.0)
+
+
+def year_ends_after(as_of, years):
+    """The next `years` 31 Decembers strictly after `as_of`."""
+    first = as_of.year if (as_of.month, as_of.day) != (12, 31) else as_of.year + 1
+    return [date(first + k, 12, 31) for k in range(years)]
+
+
+def _by_category(fleet, in_service, book):
+    rows = []
+    for name in np.unique(fleet["category"][in_service]):
+        mask = in_service & (fleet["category"] == name)
+        cost = float(fleet["cost"][mask].sum())
+        rows.append({
+            "category":                 name,
+            "method":                   POLICIES.get(name, POLICIES["OTHER"])["method"],
+            "assets":                   int(mask.sum()),
+            "cost":                     round(cost, 2),
+            "book_value":               round(float(book[mask].sum()), 2),
+            "accumulated_depreciation": round(cost - float(book[mask].sum()), 2),
+        })
+    return rows
+
+
+def fleet_fingerprint():
+    """Cheap change detector for the cache key: (asset count, latest updated_at)."""
+    stats  = Asset.objects.aggregate(count=Count("id"), latest=Max("updated_at"))
+    latest = stats["latest"].isoformat() if stats["latest"] else "-"
+    return f"{stats['count']}:{latest}"
+
+
+def valuation_cache_key(as_of, schedule_years):
+    fingerprint = hashlib.sha1(fleet_fingerprint().encode()).hexdigest()[:12]
+    return f"depreciation:{POLICY_VERSION}:{as_of.isoformat()}:{schedule_years}:{fingerprint}"
+
+
+def fleet_valuation(as_of, schedule_years=5):
+    """
+    {as_of, policy_version, totals, by_category, schedule, assets} where
+    `assets` holds the per-asset columns (NumPy arrays) for in-service assets.
+    """
+    schedule_years = max(0, min(int(schedule_years), MAX_SCHEDULE_YEARS))
+    key    = valuation_cache_key(as_of, schedule_years)
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    fleet      = load_fleet()
+    in_service = fleet["purchased"] <= np.datetime64(as_of, "D")
+    book       = book_values(fleet, as_of)
+    cost       = float(fleet["cost"][in_service].sum())
+
+    schedule = []
+    previous = book
+    for year_end in year_ends_after(as_of, schedule_years):
+        # Assets already in service at as_of — the scenario does not invent purchases
+        values = np.where(in_service, book_values(fleet, year_end), 0.0)
+        schedule.append({
+            "year_end":     year_end.isoformat(),
+            "book_value":   round(float(values.sum()), 2),
+            "depreciation": round(float((previous - values).sum()), 2),
+        })
+        previous = values
+
+    result = {
+        "as_of":          as_of.isoformat(),
+        "policy_version": POLICY_VERSION,
+        "totals": {
+            "assets":                   int(in_service.sum()),
+            "cost":                     round(cost, 2),
+            "book_value":               round(float(book.sum()), 2),
+            "accumulated_depreciation": round(cost - float(book.sum()), 2),
+        },
+        "by_category": _by_category(fleet, in_service, book),
+        "schedule":    schedule,
+        "assets": {
+            "id":         fleet["id"][in_service],
+            "asset_tag":  fleet["asset_tag"][in_service],
+            "category":   fleet["category"][in_service],
+            "condition":  fleet["condition"][in_service],
+            "purchased":  fleet["purchased"][in_service],
+            "cost":       fleet["cost"][in_service],
+            "book_value": book[in_service],
+        },
+    }
+    cache.set(key, result, CACHE_TIMEOUT)
+    return result
+
+
+def asset_rows(assets, start=0, stop=None):
+    """Per-asset dicts for a slice of fleet_valuation()["assets"] (report rows / CSV)."""
+    stop = len(assets["id"]) if stop is None else min(stop, len(assets["id"]))
+    for i in range(start, stop):
+        cost = float(assets["cost"][i])
+        book = float(assets["book_value"][i])
+        yield {
+            "asset_id":                 int(assets["id"][i]),
+            "asset_tag":                assets["asset_tag"][i],
+            "category":                 assets["category"][i],
+            "condition":                assets["condition"][i],
+            "purchase_date":            str(assets["purchased"][i]),
+            "method":                   POLICIES.get(assets["category"][i], POLICIES["OTHER"])["method"],
+            "cost":                     round(cost, 2),
+            "book_value":               round(book, 2),
+            "accumulated_depreciation": round(cost - book, 2),
+        }
@@ -0,0 +1,71 @@
+# inventory/detail_page.py
+"""
+Cached rendering of the asset details page (the QR scan target, JWT-protected).
+
+The rendered HTML, its ETag and Last-Modified are stored in the cache backend
+under the asset id; the ETag is derived from (asset id, updated_at). Saving or
+deleting an asset drops the entry (inventory/signals.py), so a repeat scan
+costs one cache lookup — no query, no template render.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+from django.template.loader import render_to_string
+
+from .models import Asset
+
+DETAIL_TEMPLATE      = "asset_detail.html"
+DETAIL_CACHE_TIMEOUT = getattr(settings, "ASSET_DETAIL_CACHE_TIMEOUT", 60 * 60)
+
+
+def detail_cache_key(asset_id):
+    return f"asset-detail-page:{asset_id}"
+
+
+def _render(asset_id):
+    asset = (
+        Asset.objects
+        .select_related("vendor", "assigned_to")
+        .filter(id=asset_id)
+        .first()
+    )
+    if asset is None:
+        return None
+
+    version = f"{asset.id}:{asset.updated_at.isoformat()}"
+    return {
+        "html":          render_to_string(DETAIL_TEMPLATE, {"asset": asset}),
+        "etag":          f'"{hashlib.sha1(version.encode()).hexdigest()}"',
+        "last_modified": int(asset.updated_at.timestamp()),
+    }
+
+
+def get_detail_page(asset_id):
+    """{html, etag, last_modified} — from the cache, rendering on a miss. Http404 if gone."""
+    key  = detail_cache_key(asset_id)
+    page = cache.get(key)
+    if page is None:
+        page = _render(asset_id)
+        if page is None:
+            raise Http404("Asset not found")
+        cache.set(key, page, DETAIL_CACHE_TIMEOUT)
+    return page
+
+
+def invalidate_detail_page(asset_id):
+    key = detail_cache_key(asset_id)
+    cache.delete(key)
+    # A scan between the write and COMMIT would re-cache the old row — drop it again
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def invalidate_detail_pages(asset_ids):
+    """Bulk form for queryset.update() paths, which skip the post_save signal."""
+    keys = [detail_cache_key(asset_id) for asset_id in asset_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
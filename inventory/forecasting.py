@@ -0,0 +1,324 @@
+# inventory/forecasting.py
+"""
+Stock depletion forecasting for reorder planning.
+
+The nightly job (tasks.forecast_stock_depletion, `manage.py forecast_stock`)
+rebuilds the StockForecast table in one pass:
+
+  demand     daily net units issued per asset — issues minus returns,
+             aggregated in SQL (one GROUP BY asset, day per side) over the
+             last FORECAST_HISTORY_DAYS; hand-overs between employees are
+             not demand
+  rates      one asset × day matrix in NumPy; an exponentially weighted
+             ("EWMA") or trailing moving average ("SMA") rate for every
+             asset at once, counting only days since the asset existed
+  lead time  request → receipt (ORDER_PLACED) from purchase request history,
+             per asset, else per vendor, else overall, else the default
+  outputs    stock-out date, reorder-by date, target stock (demand over lead
+             time + review period + safety stock) and the quantity to order
+             after what is already on order
+
+Rows are upserted in batches; readers never wait on the computation.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import (
+    Asset, AssetDetails, PurchaseOrder, PurchaseOrderLine, PurchaseRequest,
+    PurchaseRequestTransition, StockForecast,
+)
+
+METHOD                 = getattr(settings, "FORECAST_METHOD", "EWMA")
+HISTORY_DAYS           = getattr(settings, "FORECAST_HISTORY_DAYS", 180)
+SMA_WINDOW_DAYS        = getattr(settings, "FORECAST_SMA_WINDOW_DAYS", 28)
+SMOOTHING_ALPHA        = getattr(settings, "FORECAST_SMOOTHING_ALPHA", 0.1)
+REVIEW_DAYS            = getattr(settings, "FORECAST_REVIEW_DAYS", 30)
+SERVICE_Z              = getattr(settings, "FORECAST_SERVICE_Z", 1.65)  # ≈ 95% cycle service level
+DEFAULT_LEAD_TIME_DAYS = getattr(settings, "FORECAST_DEFAULT_LEAD_TIME_DAYS", 14)
+LEAD_TIME_HISTORY_DAYS = getattr(settings, "FORECAST_LEAD_TIME_HISTORY_DAYS", 365)
+
+METHODS          = ("EWMA", "SMA")
+MAX_HORIZON_DAYS = 3650
+UPSERT_BATCH     = 1000
+
+DAY = 86400.0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOAD — grouped SQL → arrays
+# ─────────────────────────────────────────────────────────────────────────────
+
+def load_assets():
+    rows = list(
+        Asset.objects.order_by("id").values_list("id", "available_quantity", "vendor_id", "created_at")
+    )
+    ids, available, vendors, created = zip(*rows) if rows else ((),) * 4
+    return {
+        "id":        np.array(ids, dtype=np.int64),
+        "available": np.array(available, dtype=np.float64),
+        "vendor_id": np.array([v or 0 for v in vendors], dtype=np.int64),
+        "created":   np.array([timezone.localdate(c) for c in created], dtype="datetime64[D]"),
+    }
+
+
+def daily_net_issues(start):
+    """[(asset_id, day, net units)] since `start` — two GROUP BY queries, issues and returns."""
+    issued = (
+        AssetDetails.objects
+        .filter(asset__isnull=False, transferred_from__isnull=True)
+        .annotate(day=TruncDate(Coalesce("issue_date", "created_at")))
+        .filter(day__gte=start)
+        .values("asset_id", "day")
+        .annotate(units=Sum("quantity_issued"))
+        .order_by()
+        .values_list("asset_id", "day", "units")
+    )
+    returned = (
+        AssetDetails.objects
+        .filter(asset__isnull=False, status="RETURNED", return_date__isnull=False)
+        .annotate(day=TruncDate("return_date"))
+        .filter(day__gte=start)
+        .values("asset_id", "day")
+        .annotate(units=Sum("quantity_issued"))
+        .order_by()
+        .values_list("asset_id", "day", "units")
+    )
+    return list(issued) + [(asset_id, day, -units) for asset_id, day, units in returned]
+
+
+def demand_matrix(assets, start, days):
+    """
+    (row_ids, matrix): one row per asset with activity in the window,
+    `days` columns, matrix[i, d] = net units issued on start + d.
+    """
+    rows = daily_net_issues(start)
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, days))
+
+    asset_ids, day_values, units = zip(*rows)
+    asset_ids = np.array(asset_ids, dtype=np.int64)
+    offsets   = (np.array(day_values, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+    keep      = (offsets >= 0) & (offsets < days) & np.isin(asset_ids, assets["id"])
+
+    row_ids, row_index = np.unique(asset_ids[keep], return_inverse=True)
+    flat   = np.bincount(
+        row_index * days + offsets[keep],
+        weights=np.array(units, dtype=np.float64)[keep],
+        minlength=len(row_ids) * days,
+    )
+    return row_ids, flat.reshape(len(row_ids), days)
+
+
+def lead_times(assets):
+    """Per-asset lead time in days: own receipts, else vendor's, else overall, else the default."""
+    since = timezone.now() - timedelta(days=LEAD_TIME_HISTORY_DAYS)
+    rows  = list(
+        PurchaseRequestTransition.objects
+        .filter(to_status="ORDER_PLACED", created_at__gte=since, purchase_request__asset__isnull=False)
+        .values_list(
+            "purchase_request__asset_id", "purchase_request__asset__vendor_id",
+            "purchase_request__created_at", "created_at",
+        )
+    )
+    lead = np.full(len(assets["id"]), float(DEFAULT_LEAD_TIME_DAYS))
+    if not rows:
+        return lead
+
+    asset_ids, vendor_ids, requested, received = zip(*rows)
+    days = np.clip(
+        np.array([(b - a).total_seconds() for a, b in zip(requested, received)], dtype=np.float64) / DAY,
+        0.0, None,
+    )
+    lead[:] = days.mean()
+
+    # Vendor means, then asset means on top
+    vendor_ids = np.array([v or 0 for v in vendor_ids], dtype=np.int64)
+    for keys, observed in ((assets["vendor_id"], vendor_ids), (assets["id"], np.array(asset_ids, dtype=np.int64))):
+        names, index = np.unique(observed, return_inverse=True)
+        means        = np.bincount(index, weights=days) / np.bincount(index)
+        position     = np.clip(np.searchsorted(names, keys), 0, len(names) - 1)
+        hit          = (names[position] == keys) & (keys != 0)
+        lead[hit]    = means[position[hit]]
+    return lead
+
+
+def on_order_by_asset(asset_ids=None):
+    """
+    {asset_id: units} requested (open purchase requests) or ordered (open
+    purchase-order lines) but not received yet. `asset_ids` narrows both queries.
+    """
+    requests = PurchaseRequest.objects.filter(status__in=PurchaseRequest.OPEN_STATUSES, asset__isnull=False)
+    lines    = PurchaseOrderLine.objects.filter(order__status__in=PurchaseOrder.RECEIVABLE_STATUSES)
+    if asset_ids is not None:
+        requests = requests.filter(asset_id__in=asset_ids)
+        lines    = lines.filter(asset_id__in=asset_ids)
+
+    totals = {}
+    for asset_id, units in (
+        requests.values("asset_id").annotate(units=Sum("quantity_needed")).order_by()
+        .values_list("asset_id", "units")
+    ):
+        totals[asset_id] = totals.get(asset_id, 0) + (units or 0)
+    for asset_id, units in (
+        lines.values("asset_id").annotate(units=Sum(F("quantity_ordered") - F("quantity_received"))).order_by()
+        .values_list("asset_id", "units")
+    ):
+        totals[asset_id] = totals.get(asset_id, 0) + (units or 0)
+    return totals
+
+
+def on_order(assets):
+    """on_order_by_asset() aligned with assets["id"]."""
+    totals = on_order_by_asset()
+    return np.array([totals.get(int(i), 0) for i in assets["id"]], dtype=np.float64)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RATES — vectorized over every asset
+# ─────────────────────────────────────────────────────────────────────────────
+
+def day_weights(days, method):
+    """Weight of each history day (oldest first) for the chosen average."""
+    if method == "SMA":
+        return (np.arange(days) >= days - min(SMA_WINDOW_DAYS, days)).astype(np.float64)
+    return (1.0 - SMOOTHING_ALPHA) ** np.arange(days - 1, -1, -1, dtype=np.float64)
+
+
+def consumption_rates(matrix, first_day, method):
+    """
+    Weighted mean and std of daily net issues per row. Days before
+    `first_day` (the asset did not exist yet) carry no weight.
+    """
+    days    = matrix.shape[1]
+    weights = day_weights(days, method)[None, :] * (np.arange(days)[None, :] >= first_day[:, None])
+    total   = weights.sum(axis=1)
+    safe    = np.where(total > 0, total, 1.0)
+
+    rate = (matrix * weights).sum(axis=1) / safe
+    var  = (weights * (matrix - rate[:, None]) ** 2).sum(axis=1) / safe
+    rate = np.where(total > 0, rate, 0.0)
+    return np.clip(rate, 0.0, None), np.sqrt(np.where(total > 0, var, 0.0))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# JOB
+# ─────────────────────────────────────────────────────────────────────────────
+
+def forecast_stock(method=None, today=None):
+    """Rebuild StockForecast for every asset. Returns a summary dict."""
+    method = (method or METHOD).upper()
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}")
+
+    today  = today or timezone.localdate()
+    # Whole days only — today is still in progress
+    start  = today - timedelta(days=HISTORY_DAYS)
+    assets = load_assets()
+    n      = len(assets["id"])
+
+    rate = np.zeros(n)
+    std  = np.zeros(n)
+    row_ids, matrix = demand_matrix(assets, start, HISTORY_DAYS)
+    if len(row_ids):
+        position = np.searchsorted(assets["id"], row_ids)
+        created  = (assets["created"][position] - np.datetime64(start, "D")).astype(np.int64)
+        # Imported history can predate the asset row — start at the first activity then
+        active        = matrix != 0
+        first_seen    = np.where(active.any(axis=1), active.argmax(axis=1), HISTORY_DAYS)
+        first_day     = np.clip(np.minimum(created, first_seen), 0, HISTORY_DAYS)
+        row_rate, row_std = consumption_rates(matrix, first_day, method)
+        rate[position] = row_rate
+        std[position]  = row_std
+
+    lead      = lead_times(assets)
+    ordered   = on_order(assets)
+    available = np.clip(assets["available"], 0.0, None)
+
+    # Days of stock left at the current rate (inf = not depleting)
+    days_left = np.divide(available, rate, out=np.full(n, np.inf), where=rate > 0)
+    days_left = np.where(available <= 0, 0.0, days_left)
+    depleting = days_left <= MAX_HORIZON_DAYS
+
+    safety    = SERVICE_Z * std * np.sqrt(lead)
+    target    = np.ceil(rate * (lead + REVIEW_DAYS) + safety)
+    recommend = np.clip(target - available - ordered, 0.0, None)
+
+    base     = np.datetime64(today, "D")
+    stockout = base + np.floor(np.where(depleting, days_left, 0)).astype("timedelta64[D]")
+    reorder  = np.maximum(stockout - np.ceil(lead).astype("timedelta64[D]"), base)
+
+    now  = timezone.now()
+    rows = [
+        StockForecast(
+            asset_id             = int(assets["id"][i]),
+            method               = method,
+            daily_rate           = round(float(rate[i]), 4),
+            daily_rate_std       = round(float(std[i]), 4),
+            lead_time_days       = round(float(lead[i]), 2),
+            available_quantity   = int(assets["available"][i]),
+            on_order_quantity    = int(ordered[i]),
+            stockout_date        = stockout[i].item() if depleting[i] else None,
+            reorder_date         = reorder[i].item() if depleting[i] else None,
+            target_stock         = int(target[i]),
+            recommended_quantity = int(recommend[i]),
+            computed_at          = now,
+        )
+        for i in range(n)
+    ]
+    with transaction.atomic():
+        StockForecast.objects.bulk_create(
+            rows,
+            batch_size=UPSERT_BATCH,
+            update_conflicts=True,
+            unique_fields=["asset"],
+            update_fields=[
+                "method", "daily_rate", "daily_rate_std", "lead_time_days", "available_quantity",
+                "on_order_quantity", "stockout_date", "reorder_date", "target_stock",
+                "recommended_quantity", "computed_at",
+            ],
+        )
+
+    return {
+        "method":       method,
+        "assets":       n,
+        "depleting":    int(depleting.sum()),
+        "reorder_now":  int((depleting & (reorder <= base) & (recommend > 0)).sum()),
+        "history_from": start.isoformat(),
+        "computed_at":  now.isoformat(),
+    }
+
+
+def forecast_order_quantity(asset):
+    """
+    Units to order now per the latest forecast: target stock minus what is
+    available and already on order right now (the stored recommendation ages
+    with every issue and purchase). None when the asset has no forecast demand.
+    """
+    target = StockForecast.objects.filter(asset_id=asset.id).values_list("target_stock", flat=True).first()
+    if not target:
+        return None
+    ordered = on_order_by_asset([asset.id]).get(asset.id, 0)
+    return max(0, target - asset.available_quantity - ordered)
+
+
+def forecast_row(forecast):
+    """Report / API fields for a StockForecast (or None)."""
+    if forecast is None:
+        return {
+            "daily_rate": None, "stockout_date": None, "reorder_date": None,
+            "lead_time_days": None, "recommended_quantity": None, "forecast_at": None,
+        }
+    return {
+        "daily_rate":           forecast.daily_rate,
+        "stockout_date":        forecast.stockout_date.isoformat() if forecast.stockout_date else None,
+        "reorder_date":         forecast.reorder_date.isoformat() if forecast.reorder_date else None,
+        "lead_time_days":       forecast.lead_time_days,
+        "recommended_quantity": forecast.recommended_quantity,
+        "forecast_at":          forecast.computed_at.isoformat(),
+    }
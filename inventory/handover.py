@@ -0,0 +1,124 @@
+# inventory/handover.py
+"""
+Employee → employee transfer of issued assets.
+
+The units never come back on the shelf, so Asset counters
+(available_quantity / quantity_issued) are not touched and the Asset row is
+not locked. For a whole batch, in one short transaction:
+
+  lock      the source issue records (one SELECT … FOR UPDATE, id order)
+  close     them as TRANSFERRED in ONE UPDATE
+  open      the target records in ONE bulk_create, each pointing back
+            through transferred_from
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import User
+
+from .kiosk import invalidate_scan_cache
+from .models import AssetDetails
+
+MAX_BATCH = 500
+
+TRANSFER_ISSUE_REASON = "Transferred from {name}"
+
+
+def _parse_item(item):
+    """{"issue_id", "employee_id", "location"?, "remarks"?} → tuple, ValueError if malformed."""
+    try:
+        return int(item["issue_id"]), int(item["employee_id"]), item.get("location"), item.get("remarks")
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("each item needs integer issue_id and employee_id")
+
+
+@transaction.atomic
+def transfer_issue_records(items, transferred_by=None, remarks=None):
+    """
+    Hand open issue records to other employees.
+    Returns {transferred: [...], skipped: [{issue_id, error}]}.
+    """
+    parsed = {}
+    for item in items:
+        issue_id, employee_id, location, item_remarks = _parse_item(item)
+        parsed[issue_id] = (employee_id, location, item_remarks)
+
+    targets = {
+        user.id: user
+        for user in User.objects.filter(id__in={employee_id for employee_id, _, _ in parsed.values()})
+    }
+    sources = {
+        record.id: record
+        for record in (
+            AssetDetails.objects
+            .select_for_update(of=("self",))
+            .select_related("user")
+            .filter(id__in=parsed)
+            .order_by("id")
+        )
+    }
+
+    skipped = []
+    moving  = []
+    for issue_id, (employee_id, location, item_remarks) in parsed.items():
+        record = sources.get(issue_id)
+        target = targets.get(employee_id)
+        if record is None:
+            error = "Issue record not found"
+        elif record.status not in AssetDetails.OPEN_STATUSES:
+            error = f"Issue record is already {record.status.lower()}"
+        elif target is None:
+            error = "Target employee not found"
+        elif not target.is_active or target.employment_status == "EXITED":
+            error = "Target employee is not active"
+        elif target.id == record.user_id:
+            error = "Asset is already issued to this employee"
+        else:
+            moving.append((record, target, location, item_remarks))
+            continue
+        skipped.append({"issue_id": issue_id, "error": error})
+
+    if not moving:
+        return {"transferred": [], "skipped": skipped}
+
+    now = timezone.now()
+
+    # ✅ One UPDATE closes every source record
+    AssetDetails.objects.filter(id__in=[record.id for record, _, _, _ in moving]).update(
+        status="TRANSFERRED", return_date=now, updated_at=now,
+    )
+
+    # ✅ One INSERT opens the target records — the units stay issued throughout
+    opened = AssetDetails.objects.bulk_create([
+        AssetDetails(
+            asset_id         = record.asset_id,
+            user             = target,
+            quantity_issued  = record.quantity_issued,
+            issued_by        = transferred_by,
+            issue_date       = now,
+            location         = location or record.location,
+            issue_reason     = TRANSFER_ISSUE_REASON.format(name=record.user.name),
+            remarks          = item_remarks or remarks,
+            status           = "ISSUED",
+            transferred_from = record,
+        )
+        for record, target, location, item_remarks in moving
+    ])
+
+    # bulk_create / update() skip the post_save signal — kiosk holder lists changed
+    invalidate_scan_cache({record.asset_id for record, _, _, _ in moving})
+
+    return {
+        "transferred": [
+            {
+                "issue_id":         record.id,
+                "new_issue_id":     new.id,
+                "asset_id":         record.asset_id,
+                "quantity":         record.quantity_issued,
+                "from_employee_id": record.user_id,
+                "to_employee_id":   target.id,
+            }
+            for (record, target, _, _), new in zip(moving, opened)
+        ],
+        "skipped": skipped,
+    }
@@ -0,0 +1,113 @@
+# inventory/images.py
+"""
+Image derivatives (thumbnails) for uploaded media — asset attachments,
+warranty scans and profile photos.
+
+Derivatives are resized + re-encoded (WebP, JPEG if Pillow lacks WebP) at
+fixed sizes and stored under MEDIA_ROOT/derivatives/<size>/. They are built
+by a Celery worker after upload, and lazily by the derivative view if a
+request arrives before the worker got to it (or the file was never queued).
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.urls import reverse
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+# size name → longest edge in pixels
+DERIVATIVE_SIZES = {
+    "thumb":  160,
+    "medium": 640,
+}
+
+DERIVATIVE_ROOT  = "derivatives/"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp"}
+
+if features.check("webp"):
+    DERIVATIVE_FORMAT, DERIVATIVE_EXT, DERIVATIVE_CONTENT_TYPE = "WEBP", ".webp", "image/webp"
+else:
+    DERIVATIVE_FORMAT, DERIVATIVE_EXT, DERIVATIVE_CONTENT_TYPE = "JPEG", ".jpg", "image/jpeg"
+
+DERIVATIVE_QUALITY = 80
+
+
+def is_image(name):
+    return bool(name) and os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def derivative_name(source_name, size):
+    stem = os.path.splitext(source_name)[0]
+    return f"{DERIVATIVE_ROOT}{size}/{stem}{DERIVATIVE_EXT}"
+
+
+def derivative_urls(file_field):
+    """{size: url} for an image FileField — URLs hit the lazy derivative view."""
+    if not file_field or not is_image(file_field.name):
+        return None
+    return {
+        size: reverse("image_derivative", args=[size, file_field.name])
+        for size in DERIVATIVE_SIZES
+    }
+
+
+def build_derivative(source_name, size):
+    """Render one derivative if it is missing. Returns its storage name."""
+    target = derivative_name(source_name, size)
+    if default_storage.exists(target):
+        return target
+
+    edge = DERIVATIVE_SIZES[size]
+    with default_storage.open(source_name, "rb") as fh:
+        img = Image.open(fh)
+        # JPEG: let the decoder downscale (DCT scaling) — much cheaper for huge photos
+        img.draft("RGB", (edge, edge))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+
+        has_alpha = "A" in img.getbands() or "transparency" in img.info
+        img = img.convert("RGBA" if has_alpha and DERIVATIVE_FORMAT == "WEBP" else "RGB")
+
+        buffer = BytesIO()
+        img.save(buffer, format=DERIVATIVE_FORMAT, quality=DERIVATIVE_QUALITY, optimize=True)
+
+    saved = default_storage.save(target, ContentFile(buffer.getvalue()))
+    if saved != target:
+        # Another worker rendered it first — keep theirs
+        default_storage.delete(saved)
+    return target
+
+
+def build_derivatives(source_name):
+    """Render every configured size for one source image."""
+    if not is_image(source_name):
+        return []
+    built = []
+    for size in DERIVATIVE_SIZES:
+        try:
+            built.append(build_derivative(source_name, size))
+        except Exception:
+            logger.exception("Could not build %s derivative for %s", size, source_name)
+    return built
+
+
+def enqueue_derivatives(*file_fields):
+    """Queue derivative rendering for uploaded images once the transaction commits."""
+    names = [f.name for f in file_fields if f and is_image(f.name)]
+    if not names:
+        return
+
+    def _enqueue():
+        from .tasks import generate_image_derivatives
+        try:
+            generate_image_derivatives.delay(names)
+        except Exception:
+            # Broker unavailable — the derivative view renders them on first request
+            logger.exception("Could not enqueue image derivatives for %s", names)
+
+    transaction.on_commit(_enqueue)
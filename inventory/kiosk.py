@@ -0,0 +1,149 @@
+# inventory/kiosk.py
+"""
+Check-in / check-out kiosk lookups.
+
+A scanned code is resolved by EXACT match — QR payload URL (asset details
+page), then asset_tag (unique index), serial_number and barcode_qr_code
+(plain b-tree indexes) — never by `icontains`. The compact payload (stock +
+current holders) is read through the cache under the asset id; the code →
+asset id mapping is cached too and re-checked against the payload on every
+hit, so a re-tagged asset can never be served for its old code.
+
+Entries are dropped on every Asset / AssetDetails save or delete
+(inventory/signals.py) and by the set-based receipt path, i.e. on issue,
+return and restock.
+"""
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.urls import Resolver404, resolve
+
+from .models import Asset, AssetDetails
+
+KIOSK_CACHE_TIMEOUT = getattr(settings, "KIOSK_CACHE_TIMEOUT", 5 * 60)
+
+OPEN_ISSUE_STATUSES = AssetDetails.OPEN_STATUSES
+
+
+def scan_code_key(code):
+    return f"kiosk-code:{code}"
+
+
+def scan_payload_key(asset_id):
+    return f"kiosk-asset:{asset_id}"
+
+
+def invalidate_scan_cache(asset_ids):
+    keys = [scan_payload_key(asset_id) for asset_id in asset_ids if asset_id]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    # A scan between the write and COMMIT would re-cache the old row — drop it again
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RESOLVE — code → asset id
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _qr_asset_id(code):
+    """Asset id from a QR payload URL (any host), None if `code` is not one."""
+    if "/" not in code:
+        return None
+    try:
+        match = resolve(urlparse(code).path)
+    except Resolver404:
+        return None
+    if match.url_name != "asset_details":
+        return None
+    return match.kwargs.get("asset_id")
+
+
+def resolve_scan(code):
+    """Asset id for a scanned code, or None. One indexed lookup at most."""
+    asset_id = _qr_asset_id(code)
+    if asset_id is not None:
+        return asset_id if Asset.objects.filter(id=asset_id).exists() else None
+
+    # asset_tag is unique — prefer it when a serial happens to collide with a tag
+    matches = list(
+        Asset.objects
+        .filter(Q(asset_tag=code) | Q(serial_number=code) | Q(barcode_qr_code=code))
+        .values_list("id", "asset_tag")[:5]
+    )
+    for matched_id, tag in matches:
+        if tag == code:
+            return matched_id
+    return matches[0][0] if matches else None
+
+
+def _matches(payload, code):
+    return code in (payload["asset_tag"], payload["serial_number"], payload["barcode_qr_code"]) \
+        or _qr_asset_id(code) == payload["id"]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PAYLOAD — compact asset + holders
+# ─────────────────────────────────────────────────────────────────────────────
+
+def build_scan_payload(asset_id):
+    asset = (
+        Asset.objects
+        .filter(id=asset_id)
+        .values(
+            "id", "asset_tag", "serial_number", "barcode_qr_code", "brand", "model_name",
+            "category", "status", "condition",
+            "total_quantity", "available_quantity", "quantity_issued", "reserved_quantity",
+        )
+        .first()
+    )
+    if asset is None:
+        return None
+
+    asset["holders"] = [
+        {
+            "issue_id":    row["id"],
+            "employee_id": row["user_id"],
+            "name":        row["user__name"],
+            "email":       row["user__email"],
+            "quantity":    row["quantity_issued"],
+            "issued_at":   (row["issue_date"] or row["created_at"]).isoformat(),
+        }
+        for row in (
+            AssetDetails.objects
+            .filter(asset_id=asset_id, status__in=OPEN_ISSUE_STATUSES)
+            .order_by("created_at")
+            .values("id", "user_id", "user__name", "user__email", "quantity_issued", "issue_date", "created_at")
+        )
+    ]
+    return asset
+
+
+def get_scan_payload(asset_id):
+    """Read-through: cached payload, built and cached on a miss."""
+    key     = scan_payload_key(asset_id)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_scan_payload(asset_id)
+        if payload is not None:
+            cache.set(key, payload, KIOSK_CACHE_TIMEOUT)
+    return payload
+
+
+def lookup_scan(code):
+    """Scanned code → compact payload (None if unknown). Hot codes cost no query."""
+    code     = code.strip()
+    asset_id = cache.get(scan_code_key(code))
+    if asset_id is not None:
+        payload = get_scan_payload(asset_id)
+        if payload is not None and _matches(payload, code):
+            return payload
+
+    asset_id = resolve_scan(code)
+    if asset_id is None:
+        return None
+    cache.set(scan_code_key(code), asset_id, KIOSK_CACHE_TIMEOUT)
+    return get_scan_payload(asset_id)
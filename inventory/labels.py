@@ -0,0 +1,225 @@
+# inventory/labels.py
+"""
+Printable QR label sheets.
+
+Label tiles (QR + asset tag, brand, model) are rendered in a process pool and
+pasted onto one sheet at a time; each finished sheet is encoded and handed
+to the caller before the next is composed, so memory stays flat whether the
+sheet run has ten labels or ten thousand. PDF output is written by a small
+streaming writer (one Flate-compressed grayscale image per page) — Pillow's
+own multi-page PDF writer needs every page in memory up front.
+"""
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.db import connections
+from PIL import Image, ImageDraw, ImageFont
+
+from .models import Asset
+from .qr import qr_payload_url, render_qr_image
+
+SHEET_DPI = getattr(settings, "LABEL_SHEET_DPI", 150)
+
+# Inches
+PAGE_SIZES = {
+    "a4":     (8.27, 11.69),
+    "letter": (8.5, 11.0),
+}
+DEFAULT_PAGE  = "a4"
+SHEET_MARGIN  = 0.4
+LABEL_COLUMNS = 3
+LABEL_ROWS    = 8
+LABEL_PADDING = 0.08
+LABELS_PER_SHEET = LABEL_COLUMNS * LABEL_ROWS
+
+LABEL_FORMATS = {
+    "pdf": "application/pdf",
+    "png": "image/png",
+}
+
+# Sheets rendered ahead of the one being written
+PREFETCH_SHEETS = 2
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SELECTION
+# ─────────────────────────────────────────────────────────────────────────────
+
+def label_queryset(category=None, vendor=None, from_date=None, to_date=None, ids=None):
+    assets = Asset.objects.order_by("asset_tag", "id")
+    if category:
+        assets = assets.filter(category__iexact=category)
+    if vendor:
+        assets = assets.filter(vendor_id=vendor)
+    if from_date:
+        assets = assets.filter(purchase_date__gte=from_date)
+    if to_date:
+        assets = assets.filter(purchase_date__lte=to_date)
+    if ids:
+        assets = assets.filter(id__in=ids)
+    return assets
+
+
+def label_jobs(assets):
+    """Picklable (payload, tag, brand, model) per label — the only DB work."""
+    return [
+        (qr_payload_url(asset_id), tag, brand or "", model or "")
+        for asset_id, tag, brand, model in assets.values_list(
+            "id", "asset_tag", "brand", "model_name"
+        ).iterator(chunk_size=2000)
+    ]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LAYOUT
+# ─────────────────────────────────────────────────────────────────────────────
+
+def sheet_geometry(page=DEFAULT_PAGE, dpi=SHEET_DPI):
+    width_in, height_in = PAGE_SIZES[page]
+    margin = int(SHEET_MARGIN * dpi)
+    sheet  = (int(width_in * dpi), int(height_in * dpi))
+    cell   = ((sheet[0] - 2 * margin) // LABEL_COLUMNS, (sheet[1] - 2 * margin) // LABEL_ROWS)
+    return sheet, cell, margin
+
+
+def _fit_text(draw, text, font, max_width):
+    if draw.textlength(text, font=font) <= max_width:
+        return text
+    while text and draw.textlength(text + "…", font=font) > max_width:
+        text = text[:-1]
+    return text + "…"
+
+
+def render_label_tile(job):
+    """Process-pool worker: job = (payload, tag, brand, model, (w, h), dpi) → raw 'L' bytes."""
+    payload, tag, brand, model, (width, height), dpi = job
+    padding = int(LABEL_PADDING * dpi)
+    tile    = Image.new("L", (width, height), 255)
+
+    qr_size = height - 2 * padding
+    qr      = render_qr_image(payload, qr_size)
+    tile.paste(qr, (padding, padding + (qr_size - qr.height) // 2))
+
+    draw       = ImageDraw.Draw(tile)
+    text_x     = padding * 2 + qr_size
+    text_width = width - text_x - padding
+    tag_font   = ImageFont.load_default(size=max(10, height // 7))
+    body_font  = ImageFont.load_default(size=max(8, height // 10))
+
+    y = padding
+    draw.text((text_x, y), _fit_text(draw, tag, tag_font, text_width), font=tag_font, fill=0)
+    y += tag_font.size + padding
+    for line in (brand, model):
+        if line:
+            draw.text((text_x, y), _fit_text(draw, line, body_font, text_width), font=body_font, fill=0)
+            y += body_font.size + padding // 2
+
+    return tile.tobytes()
+
+
+def iter_sheets(jobs, page=DEFAULT_PAGE, dpi=SHEET_DPI, workers=None):
+    """Yield one composed PIL sheet at a time; tiles render in parallel, a few sheets ahead."""
+    sheet_size, cell, margin = sheet_geometry(page, dpi)
+    batches = (jobs[i:i + LABELS_PER_SHEET] for i in range(0, len(jobs), LABELS_PER_SHEET))
+
+    # Forked workers must not share the parent's DB sockets
+    connections.close_all()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+
+        def submit_next():
+            batch = next(batches, None)
+            if batch is not None:
+                in_flight.append([
+                    pool.submit(render_label_tile, (*job, cell, dpi)) for job in batch
+                ])
+
+        for _ in range(PREFETCH_SHEETS):
+            submit_next()
+
+        while in_flight:
+            futures = in_flight.popleft()
+            submit_next()
+
+            sheet = Image.new("L", sheet_size, 255)
+            for index, future in enumerate(futures):
+                column, row = index % LABEL_COLUMNS, index // LABEL_COLUMNS
+                tile = Image.frombytes("L", cell, future.result())
+                sheet.paste(tile, (margin + column * cell[0], margin + row * cell[1]))
+            yield sheet
+
+
+def sheet_count(jobs):
+    return (len(jobs) + LABELS_PER_SHEET - 1) // LABELS_PER_SHEET
+
+
+def sheet_jobs(jobs, sheet):
+    """Labels on 1-based sheet number `sheet`."""
+    return jobs[(sheet - 1) * LABELS_PER_SHEET:sheet * LABELS_PER_SHEET]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# OUTPUT
+# ─────────────────────────────────────────────────────────────────────────────
+
+def sheet_png(sheet, dpi=SHEET_DPI):
+    buffer = BytesIO()
+    sheet.save(buffer, format="PNG", dpi=(dpi, dpi), optimize=True)
+    return buffer.getvalue()
+
+
+def stream_pdf(sheets, dpi=SHEET_DPI):
+    """
+    Minimal PDF writer: yields bytes as each sheet arrives. Objects 1 and 2
+    (catalog, page tree) are written last — the xref table makes order irrelevant.
+    """
+    offsets  = {}
+    position = 0
+    kids     = []
+
+    def obj(number, body, stream=None):
+        nonlocal position
+        offsets[number] = position
+        chunk = f"{number} 0 obj\n".encode() + body
+        if stream is not None:
+            chunk += b"\nstream\n" + stream + b"\nendstream"
+        chunk += b"\nendobj\n"
+        position += len(chunk)
+        return chunk
+
+    header    = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    position += len(header)
+    yield header
+
+    number = 3
+    for sheet in sheets:
+        width, height = sheet.size
+        pt_w, pt_h    = width * 72 / dpi, height * 72 / dpi
+        image_data    = zlib.compress(sheet.tobytes(), 6)
+        content       = f"q {pt_w:.2f} 0 0 {pt_h:.2f} 0 0 cm /Im0 Do Q".encode()
+
+        yield obj(number, (
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode "
+            f"/Length {len(image_data)} >>"
+        ).encode(), image_data)
+        yield obj(number + 1, f"<< /Length {len(content)} >>".encode(), content)
+        yield obj(number + 2, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {pt_w:.2f} {pt_h:.2f}] "
+            f"/Resources << /XObject << /Im0 {number} 0 R >> >> /Contents {number + 1} 0 R >>"
+        ).encode())
+        kids.append(number + 2)
+        number += 3
+
+    kid_refs = " ".join(f"{kid} 0 R" for kid in kids)
+    yield obj(2, f"<< /Type /Pages /Kids [{kid_refs}] /Count {len(kids)} >>".encode())
+    yield obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    xref = [f"xref\n0 {number}\n", "0000000000 65535 f \n"]
+    xref.extend(f"{offsets[n]:010d} 00000 n \n" for n in range(1, number))
+    xref.append(f"trailer\n<< /Size {number} /Root 1 0 R >>\nstartxref\n{position}\n%%EOF\n")
+    yield "".join(xref).encode()
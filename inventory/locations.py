@@ -0,0 +1,200 @@
+# inventory/locations.py
+"""
+Location hierarchy and per-location stock.
+
+Locations form a tree (region → site → building → room). Each row stores a
+materialized path of ids — "/3/17/42/" — so "everything under the Lahore
+site" is one indexed prefix match (`path__startswith=site.path`) joined to
+AssetStock, never a recursive walk or a string match on free-text fields.
+
+AssetStock holds on-hand units per (asset, location). Every move is a
+conditional UPDATE inside one transaction:
+
+  take      quantity −= q   WHERE quantity >= q       (0 rows → not enough)
+  put       quantity += q   (row created on first put)
+  place     unplaced stock → location; the asset row is locked so
+            Σ AssetStock never exceeds Asset.available_quantity
+  issue     units leave the chosen location, or — without one — unplaced
+            stock first, then the locations holding the most; every issue
+            path (issue, kiosk, reservation confirm) goes through it under
+            the same asset row lock, so the bound above holds after issues
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, Sum, Value
+from django.db.models.functions import Concat, Substr
+
+from .models import Asset, AssetStock, Location, StockTransfer
+
+MAX_DEPTH = 8
+
+
+def _child_path(parent, location_id):
+    return f"{parent.path if parent else '/'}{location_id}/"
+
+
+def subtree_filter(location, prefix="location__"):
+    """Filter kwargs for rows at `location` or anywhere below it."""
+    return {f"{prefix}path__startswith": location.path}
+
+
+def stocked_at(location):
+    """Exists() for Asset querysets: the asset has on-hand units in `location`'s subtree."""
+    return Exists(AssetStock.objects.filter(
+        asset_id=OuterRef("pk"), quantity__gt=0, **subtree_filter(location),
+    ))
+
+
+def subtree_stock(location):
+    """AssetStock rows at `location` or below — prefix match on the path index, then the (location, asset) index."""
+    return AssetStock.objects.filter(**subtree_filter(location))
+
+
+def rollup_by_child(location, stock=None):
+    """
+    {child location id: units} for each direct child, plus location.id for
+    units held at `location` itself. One grouped query; the roll-up is done
+    on the paths in Python.
+    """
+    stock    = subtree_stock(location) if stock is None else stock
+    per_path = stock.values_list("location__path").annotate(units=Sum("quantity")).order_by()
+
+    totals = {}
+    offset = len(location.path)
+    for path, units in per_path:
+        rest     = path[offset:]
+        child_id = int(rest.split("/", 1)[0]) if rest else location.id
+        totals[child_id] = totals.get(child_id, 0) + (units or 0)
+    return totals
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TREE MAINTENANCE
+# ─────────────────────────────────────────────────────────────────────────────
+
+@transaction.atomic
+def create_location(name, code, kind="SITE", parent=None):
+    depth = parent.depth + 1 if parent else 0
+    if depth >= MAX_DEPTH:
+        raise ValueError(f"Locations can be nested at most {MAX_DEPTH} levels deep")
+
+    location = Location.objects.create(name=name, code=code, kind=kind, parent=parent, depth=depth)
+    location.path = _child_path(parent, location.id)
+    Location.objects.filter(id=location.id).update(path=location.path)
+    return location
+
+
+@transaction.atomic
+def move_location(location, new_parent):
+    """Re-parent `location`; the whole subtree's paths are rewritten in ONE UPDATE."""
+    if new_parent is not None and new_parent.path.startswith(location.path):
+        raise ValueError("A location cannot be moved under itself")
+
+    old_path  = location.path
+    new_path  = _child_path(new_parent, location.id)
+    depth_by  = (new_parent.depth + 1 if new_parent else 0) - location.depth
+
+    subtree = Location.objects.filter(path__startswith=old_path)
+    if depth_by > 0 and subtree.filter(depth__gte=MAX_DEPTH - depth_by).exists():
+        raise ValueError(f"Locations can be nested at most {MAX_DEPTH} levels deep")
+
+    Location.objects.filter(id=location.id).update(parent=new_parent)
+    subtree.update(
+        path  = Concat(Value(new_path), Substr("path", len(old_path) + 1)),
+        depth = F("depth") + depth_by,
+    )
+    location.refresh_from_db()
+    return location
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# STOCK MOVES
+# ─────────────────────────────────────────────────────────────────────────────
+
+def take_stock(asset_id, location_id, quantity):
+    """Remove units from one location. ValueError when it does not hold enough."""
+    taken = AssetStock.objects.filter(
+        asset_id=asset_id, location_id=location_id, quantity__gte=quantity,
+    ).update(quantity=F("quantity") - quantity)
+    if not taken:
+        raise ValueError("Not enough stock at the source location")
+
+
+def put_stock(asset_id, location_id, quantity):
+    """Add units at one location, creating its stock row on first use."""
+    if AssetStock.objects.filter(asset_id=asset_id, location_id=location_id).update(quantity=F("quantity") + quantity):
+        return
+    try:
+        with transaction.atomic():
+            AssetStock.objects.create(asset_id=asset_id, location_id=location_id, quantity=quantity)
+    except IntegrityError:
+        # Created concurrently — the row exists now
+        AssetStock.objects.filter(asset_id=asset_id, location_id=location_id).update(quantity=F("quantity") + quantity)
+
+
+def placed_quantity(asset_id):
+    return AssetStock.objects.filter(asset_id=asset_id).aggregate(total=Sum("quantity"))["total"] or 0
+
+
+@transaction.atomic
+def issue_stock(asset_id, quantity, location_id=None):
+    """
+    Take `quantity` units off the shelf for an issue. Call BEFORE
+    available_quantity is lowered. ValueError when the chosen location does
+    not hold enough.
+    """
+    if location_id:
+        take_stock(asset_id, location_id, quantity)
+        return
+
+    asset    = Asset.objects.select_for_update().only("id", "available_quantity").get(id=asset_id)
+    unplaced = max(asset.available_quantity - placed_quantity(asset_id), 0)
+    needed   = quantity - min(unplaced, quantity)
+    if needed <= 0:
+        return
+
+    rows = AssetStock.objects.filter(asset_id=asset_id, quantity__gt=0).order_by("-quantity", "location_id")
+    for stock_location_id, held in rows.values_list("location_id", "quantity"):
+        taken = min(held, needed)
+        take_stock(asset_id, stock_location_id, taken)
+        needed -= taken
+        if not needed:
+            return
+    raise ValueError("Not enough stock at any location")
+
+
+@transaction.atomic
+def transfer_stock(asset_id, quantity, from_location=None, to_location=None, user=None, remarks=None):
+    """
+    Move `quantity` units between locations in one transaction.
+    from_location=None places unplaced stock; to_location=None un-places it.
+    """
+    if quantity <= 0:
+        raise ValueError("quantity must be > 0")
+    if from_location is None and to_location is None:
+        raise ValueError("from_location_id or to_location_id is required")
+    if from_location is not None and to_location is not None and from_location.id == to_location.id:
+        raise ValueError("Source and destination are the same location")
+    if to_location is not None and not to_location.is_active:
+        raise ValueError("Destination location is inactive")
+
+    if from_location is None:
+        # Serialise placements of this asset so Σ AssetStock stays <= available
+        asset = Asset.objects.select_for_update().only("id", "available_quantity").get(id=asset_id)
+        if asset.available_quantity - placed_quantity(asset_id) < quantity:
+            raise ValueError("Not enough unplaced stock for this asset")
+    elif not Asset.objects.filter(id=asset_id).exists():
+        raise Asset.DoesNotExist
+    else:
+        take_stock(asset_id, from_location.id, quantity)
+
+    if to_location is not None:
+        put_stock(asset_id, to_location.id, quantity)
+
+    return StockTransfer.objects.create(
+        asset_id       = asset_id,
+        from_location  = from_location,
+        to_location    = to_location,
+        quantity       = quantity,
+        remarks        = remarks,
+        transferred_by = user,
+    )
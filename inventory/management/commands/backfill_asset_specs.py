@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from inventory.detail_page import detail_cache_key
+from inventory.models import Asset
+from inventory.specs import SPEC_FIELDS, normalize_specs
+
+
+class Command(BaseCommand):
+    help = "Parse free-form hardware specs into the normalized shadow columns for existing assets"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per bulk_update")
+        parser.add_argument("--only-missing", action="store_true", help="Skip assets whose RAM/storage are already parsed")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        assets     = Asset.objects.order_by("id")
+        if options["only_missing"]:
+            assets = assets.filter(ram_gb__isnull=True, storage_gb__isnull=True)
+
+        fields = ("processor", "processor_generation", "ram_size", "storage_type", "storage_capacity") + SPEC_FIELDS
+        last_id = 0
+        updated = 0
+        while True:
+            # Keyset batches on id — stable even while rows are being updated
+            batch = list(assets.filter(id__gt=last_id).only("id", "updated_at", *fields)[:batch_size])
+            if not batch:
+                break
+            now = timezone.now()
+            for asset in batch:
+                normalize_specs(asset)
+                asset.updated_at = now
+            # bulk_update skips save() / signals — one UPDATE … CASE per batch
+            Asset.objects.bulk_update(batch, SPEC_FIELDS + ("updated_at",), batch_size=batch_size)
+            cache.delete_many([detail_cache_key(asset.id) for asset in batch])
+            updated += len(batch)
+            last_id  = batch[-1].id
+
+        self.stdout.write(self.style.SUCCESS(f"Normalized specs on {updated} asset(s)."))
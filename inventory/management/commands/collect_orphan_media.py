@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from inventory.media_gc import collect_orphan_media
+
+
+class Command(BaseCommand):
+    help = "Delete or quarantine media files no model references any more (older than a grace period)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="List orphans and byte counts, change nothing")
+        parser.add_argument("--quarantine", action="store_true", help="Move orphans to MEDIA_QUARANTINE_ROOT instead of deleting")
+        parser.add_argument("--grace-hours", type=float, default=None, help="Only touch files older than this (default MEDIA_GC_GRACE_HOURS)")
+        parser.add_argument("--workers", type=int, default=None, help="Parallel directory scanners")
+
+    def handle(self, *args, **options):
+        result = collect_orphan_media(
+            dry_run     = options["dry_run"],
+            quarantine  = options["quarantine"],
+            grace_hours = options["grace_hours"],
+            workers     = options["workers"],
+            log         = self.stdout.write,
+        )
+
+        self.stdout.write(
+            f"Scanned {result['scanned_files']} file(s), {result['scanned_bytes']} bytes. "
+            f"Orphans: {result['orphan_files']} file(s), {result['orphan_bytes']} bytes. "
+            f"Skipped (within grace period): {result['skipped_recent']}."
+        )
+        if result["action"] == "dry-run":
+            self.stdout.write(self.style.SUCCESS("[dry-run] Nothing was changed."))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"{result['action'].capitalize()}d {result['removed_files']} file(s), "
+                f"{result['removed_bytes']} bytes. Errors: {result['errors']}."
+            ))
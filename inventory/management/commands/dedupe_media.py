@@ -0,0 +1,54 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from inventory.storage import BLOB_ROOT, CONTENT_ADDRESSED_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Move existing uploads into content-addressed blobs and repoint model fields to them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        moved = repointed = missing = 0
+
+        for app_label, model_name, field_name in CONTENT_ADDRESSED_FIELDS:
+            model   = apps.get_model(app_label, model_name)
+            storage = model._meta.get_field(field_name).storage
+
+            legacy_names = (
+                model.objects
+                .exclude(**{f"{field_name}__isnull": True})
+                .exclude(**{field_name: ""})
+                .exclude(**{f"{field_name}__startswith": f"{BLOB_ROOT}/"})
+                .values_list(field_name, flat=True)
+                .distinct()
+            )
+
+            for name in legacy_names.iterator():
+                if not storage.exists(name):
+                    missing += 1
+                    self.stdout.write(f"MISSING  {model_name}.{field_name}: {name}")
+                    continue
+
+                if dry_run:
+                    count = model.objects.filter(**{field_name: name}).count()
+                    self.stdout.write(f"WOULD MOVE  {name} ({count} row(s))")
+                    moved     += 1
+                    repointed += count
+                    continue
+
+                with storage.open(name, "rb") as fh:
+                    blob_name = storage.save(name, fh)
+
+                # One UPDATE per distinct file, not per row
+                repointed += model.objects.filter(**{field_name: name}).update(**{field_name: blob_name})
+                moved     += 1
+
+        prefix = "[dry-run] " if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{moved} file(s) moved into blobs, {repointed} row(s) repointed, {missing} missing. "
+            f"Old copies are left for the orphan media collector."
+        ))
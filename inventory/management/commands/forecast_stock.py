@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.forecasting import METHODS, forecast_stock
+
+
+class Command(BaseCommand):
+    help = "Rebuild stock depletion forecasts (consumption rate, stock-out date, recommended order quantity)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--method", choices=METHODS, default=None, help="Override FORECAST_METHOD")
+
+    def handle(self, *args, **options):
+        try:
+            result = forecast_stock(method=options["method"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"  {result['assets']} asset(s) forecast ({result['method']}, history from {result['history_from']})"
+        )
+        summary = f"{result['depleting']} depleting, {result['reorder_now']} due for reorder now"
+        if result["reorder_now"]:
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,63 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.labels import (
+    DEFAULT_PAGE,
+    LABEL_FORMATS,
+    PAGE_SIZES,
+    iter_sheets,
+    label_jobs,
+    label_queryset,
+    sheet_count,
+    sheet_png,
+    stream_pdf,
+)
+
+
+class Command(BaseCommand):
+    help = "Render QR label sheets (QR + tag, brand, model) for a filtered set of assets"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="PDF file, or a directory for PNG sheets")
+        parser.add_argument("--format", default="pdf", choices=sorted(LABEL_FORMATS))
+        parser.add_argument("--page-size", default=DEFAULT_PAGE, choices=sorted(PAGE_SIZES))
+        parser.add_argument("--category", help="Asset category (case-insensitive)")
+        parser.add_argument("--vendor", type=int, help="Vendor id")
+        parser.add_argument("--from-date", help="Purchased on or after (YYYY-MM-DD)")
+        parser.add_argument("--to-date", help="Purchased on or before (YYYY-MM-DD)")
+        parser.add_argument("--ids", default="", help="Only these asset ids (comma-separated)")
+        parser.add_argument("--workers", type=int, default=None, help="Render processes (default: CPU count)")
+
+    def handle(self, *args, **options):
+        try:
+            ids = [int(i) for i in options["ids"].split(",") if i.strip()]
+        except ValueError:
+            raise CommandError("--ids must be a comma-separated list of integers")
+
+        jobs = label_jobs(label_queryset(
+            category  = options["category"],
+            vendor    = options["vendor"],
+            from_date = options["from_date"],
+            to_date   = options["to_date"],
+            ids       = ids,
+        ))
+        if not jobs:
+            raise CommandError("No assets match the filter")
+
+        output = options["output"]
+        sheets = iter_sheets(jobs, options["page_size"], workers=options["workers"])
+
+        if options["format"] == "pdf":
+            with open(output, "wb") as fh:
+                for chunk in stream_pdf(sheets):
+                    fh.write(chunk)
+        else:
+            os.makedirs(output, exist_ok=True)
+            for number, sheet in enumerate(sheets, start=1):
+                with open(os.path.join(output, f"labels_{number:04d}.png"), "wb") as fh:
+                    fh.write(sheet_png(sheet))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(jobs)} label(s) on {sheet_count(jobs)} sheet(s) written to {output}"
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from inventory.rollups import rebuild_vendor_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-vendor / per-month spend rollup from assets, issue records and purchase requests"
+
+    def handle(self, *args, **options):
+        rows = rebuild_vendor_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} vendor/month rollup row(s)."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from inventory.reconcile import DEFAULT_CHUNK_SIZE, reconcile_stock
+
+
+class Command(BaseCommand):
+    help = "Compare asset issued/available counters with open issue records (optionally repair drift)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repair", action="store_true", help="Write the recomputed counters (bulk_update per chunk)")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Asset ids per chunk")
+        parser.add_argument("--start-id", type=int, default=1)
+        parser.add_argument("--end-id", type=int, default=None)
+
+    def handle(self, *args, **options):
+        result = reconcile_stock(
+            repair     = options["repair"],
+            chunk_size = options["chunk_size"],
+            start_id   = options["start_id"],
+            end_id     = options["end_id"],
+        )
+
+        for row in result["mismatches"]:
+            diffs = ", ".join(
+                f"{field} {diff['actual']} → {diff['expected']}" for field, diff in row["fields"].items()
+            )
+            self.stdout.write(f"  {row['asset_tag']} (#{row['asset_id']}): {diffs}")
+        if result["mismatched"] > len(result["mismatches"]):
+            self.stdout.write(f"  … and {result['mismatched'] - len(result['mismatches'])} more")
+
+        summary = f"{result['mismatched']} asset(s) out of sync across {result['checked_chunks']} chunk(s)"
+        if options["repair"]:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {summary}."))
+        elif result["mismatched"]:
+            self.stdout.write(self.style.WARNING(f"{summary} — re-run with --repair to fix."))
+        else:
+            self.stdout.write(self.style.SUCCESS("All stock counters match issue records."))
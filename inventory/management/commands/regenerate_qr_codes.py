@@ -0,0 +1,68 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from inventory.models import Asset
+from inventory.qr import QR_FORMATS, QR_SIZES, qr_cache_name, qr_payload_url, render_to_cache
+
+
+class Command(BaseCommand):
+    help = "Render every asset's QR code into the on-disk cache for the current QR_BASE_URL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--formats", default="png,svg", help="Comma-separated: png,svg")
+        parser.add_argument("--sizes", default=",".join(str(s) for s in QR_SIZES), help="Comma-separated pixel sizes")
+        parser.add_argument("--ids", default="", help="Only these asset ids (comma-separated)")
+        parser.add_argument("--workers", type=int, default=None, help="Render processes (default: CPU count)")
+        parser.add_argument("--force", action="store_true", help="Re-render files that are already cached")
+
+    def handle(self, *args, **options):
+        formats = [f.strip().lower() for f in options["formats"].split(",") if f.strip()]
+        unknown = [f for f in formats if f not in QR_FORMATS]
+        if unknown:
+            raise CommandError(f"Unknown format(s): {', '.join(unknown)}")
+
+        try:
+            sizes = [int(s) for s in options["sizes"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError("--sizes must be integers")
+        bad_sizes = [s for s in sizes if s not in QR_SIZES]
+        if bad_sizes:
+            raise CommandError(f"Unsupported size(s): {bad_sizes}. Allowed: {list(QR_SIZES)}")
+
+        assets = Asset.objects.order_by("id")
+        if options["ids"]:
+            assets = assets.filter(id__in=[int(i) for i in options["ids"].split(",") if i.strip()])
+
+        # Build every job in the parent — workers only render and write bytes
+        jobs = []
+        for asset_id in assets.values_list("id", flat=True).iterator(chunk_size=5000):
+            payload = qr_payload_url(asset_id)
+            for fmt in formats:
+                for size in sizes:
+                    full_path = os.path.join(settings.MEDIA_ROOT, qr_cache_name(asset_id, payload, fmt, size))
+                    jobs.append((payload, fmt, size, full_path, options["force"]))
+
+        if not jobs:
+            self.stdout.write("No assets to render.")
+            return
+
+        # DB connections must not be inherited by forked workers
+        connections.close_all()
+
+        workers   = options["workers"] or os.cpu_count() or 1
+        chunksize = max(1, len(jobs) // (workers * 4))
+        rendered = written = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for size_written in pool.map(render_to_cache, jobs, chunksize=chunksize):
+                if size_written:
+                    rendered += 1
+                    written  += size_written
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{rendered} QR image(s) rendered ({written} bytes), "
+            f"{len(jobs) - rendered} already cached, {workers} worker(s)."
+        ))
@@ -0,0 +1,201 @@
+# inventory/media_gc.py
+"""
+Orphaned media collector.
+
+Builds the set of file paths the database still references (streamed
+values_list queries), walks MEDIA_ROOT with os.scandir in a thread pool and
+deletes — or moves to MEDIA_QUARANTINE_ROOT — every unreferenced file older
+than the grace period. Image derivatives are kept while their source is
+referenced, and cached QR codes while their asset exists and was rendered
+for the current QR_BASE_URL. The grace period covers uploads whose row is
+not committed yet.
+"""
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+
+from .images import DERIVATIVE_ROOT
+from .qr import QR_CACHE_ROOT, qr_payload_url, qr_url_key
+from .storage import CONTENT_ADDRESSED_FIELDS
+
+# Every (app_label, model, field) holding a path relative to MEDIA_ROOT
+REFERENCED_PATH_FIELDS = CONTENT_ADDRESSED_FIELDS + (
+    ("inventory", "Asset", "barcode_qr_code"),
+)
+
+# add_inventory used to truncate barcode_qr_code to this length
+LEGACY_QR_PATH_MAX = 100
+
+GRACE_HOURS     = getattr(settings, "MEDIA_GC_GRACE_HOURS", 24)
+QUARANTINE_ROOT = getattr(settings, "MEDIA_QUARANTINE_ROOT", os.path.join(settings.BASE_DIR, "media_quarantine"))
+SCAN_WORKERS    = getattr(settings, "MEDIA_GC_WORKERS", 8)
+
+
+def referenced_paths():
+    """(exact paths, truncated-path prefixes) referenced by the database."""
+    exact, prefixes = set(), set()
+    for app_label, model_name, field_name in REFERENCED_PATH_FIELDS:
+        model = apps.get_model(app_label, model_name)
+        names = (
+            model.objects
+            .exclude(**{f"{field_name}__isnull": True})
+            .exclude(**{field_name: ""})
+            .values_list(field_name, flat=True)
+            .iterator(chunk_size=5000)
+        )
+        for name in names:
+            name = os.path.normpath(name)
+            exact.add(name)
+            if len(name) >= LEGACY_QR_PATH_MAX:
+                prefixes.add(name)
+    return exact, prefixes
+
+
+def asset_ids():
+    Asset = apps.get_model("inventory", "Asset")
+    return set(Asset.objects.values_list("id", flat=True).iterator(chunk_size=5000))
+
+
+class _Matcher:
+
+    def __init__(self, exact, prefixes, asset_ids):
+        self.exact     = exact
+        self.prefixes  = tuple(prefixes)
+        self.stems     = {os.path.splitext(p)[0] for p in exact}
+        self.asset_ids = asset_ids
+
+    def _is_current_qr(self, rel):
+        # qr_cache/<asset_id>/<url hash>-<size>.<fmt> — alive while the asset
+        # exists and the hash matches today's QR_BASE_URL
+        parts = rel.split(os.sep)
+        if len(parts) != 3 or not parts[1].isdigit():
+            return False
+        asset_id = int(parts[1])
+        if asset_id not in self.asset_ids:
+            return False
+        return parts[2].startswith(f"{qr_url_key(qr_payload_url(asset_id))}-")
+
+    def is_referenced(self, rel):
+        if rel in self.exact:
+            return True
+        if self.prefixes and rel.startswith(self.prefixes):
+            return True
+        if rel.startswith(DERIVATIVE_ROOT):
+            # derivatives/<size>/<source stem>.<ext> — alive while the source is
+            parts = rel.split(os.sep, 2)
+            return len(parts) == 3 and os.path.splitext(parts[2])[0] in self.stems
+        if rel.startswith(QR_CACHE_ROOT):
+            return self._is_current_qr(rel)
+        return False
+
+
+def _scan(path, root, matcher, cutoff, recursive):
+    """Scan one directory (optionally its whole subtree). Returns stats + orphan list."""
+    stats   = {"files": 0, "bytes": 0, "young": 0}
+    orphans = []
+    stack   = [path]
+
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    stack.append(entry.path)
+                continue
+            if not entry.is_file(follow_symlinks=False):
+                continue
+
+            st = entry.stat(follow_symlinks=False)
+            stats["files"] += 1
+            stats["bytes"] += st.st_size
+
+            rel = os.path.relpath(entry.path, root)
+            if matcher.is_referenced(rel):
+                continue
+            if st.st_mtime > cutoff:
+                stats["young"] += 1
+                continue
+            orphans.append((rel, st.st_size))
+
+    return stats, orphans
+
+
+def _scan_units(root):
+    """Split the tree so each second-level directory gets its own worker."""
+    units = [(root, False)]
+    for entry in os.scandir(root):
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        units.append((entry.path, False))
+        for sub in os.scandir(entry.path):
+            if sub.is_dir(follow_symlinks=False):
+                units.append((sub.path, True))
+    return units
+
+
+def collect_orphan_media(dry_run=False, quarantine=False, grace_hours=None, workers=None, log=None):
+    """
+    Find (and unless dry_run, delete or quarantine) unreferenced media files.
+    `log` is an optional callable for per-file output.
+    """
+    root        = os.path.normpath(str(settings.MEDIA_ROOT))
+    grace_hours = GRACE_HOURS if grace_hours is None else grace_hours
+    cutoff      = time.time() - grace_hours * 3600
+
+    result = {
+        "scanned_files":  0,
+        "scanned_bytes":  0,
+        "orphan_files":   0,
+        "orphan_bytes":   0,
+        "skipped_recent": 0,
+        "removed_files":  0,
+        "removed_bytes":  0,
+        "errors":         0,
+        "action":         "dry-run" if dry_run else ("quarantine" if quarantine else "delete"),
+    }
+    if not os.path.isdir(root):
+        return result
+
+    matcher = _Matcher(*referenced_paths(), asset_ids())
+
+    with ThreadPoolExecutor(max_workers=workers or SCAN_WORKERS) as pool:
+        scans = pool.map(lambda unit: _scan(unit[0], root, matcher, cutoff, unit[1]), _scan_units(root))
+        orphans = []
+        for stats, found in scans:
+            result["scanned_files"]  += stats["files"]
+            result["scanned_bytes"]  += stats["bytes"]
+            result["skipped_recent"] += stats["young"]
+            orphans.extend(found)
+
+    result["orphan_files"] = len(orphans)
+    result["orphan_bytes"] = sum(size for _, size in orphans)
+
+    target_root = os.path.join(QUARANTINE_ROOT, timezone.now().strftime("%Y%m%d_%H%M%S"))
+    for rel, size in sorted(orphans):
+        if log:
+            log(f"{'WOULD REMOVE' if dry_run else result['action'].upper()}  {rel}  ({size} bytes)")
+        if dry_run:
+            continue
+        try:
+            source = os.path.join(root, rel)
+            if quarantine:
+                destination = os.path.join(target_root, rel)
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                shutil.move(source, destination)
+            else:
+                os.remove(source)
+            result["removed_files"] += 1
+            result["removed_bytes"] += size
+        except OSError:
+            result["errors"] += 1
+
+    return result
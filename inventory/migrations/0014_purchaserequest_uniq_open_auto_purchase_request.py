@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0013_vendor_category_vendor_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='purchaserequest',
+            constraint=models.UniqueConstraint(condition=models.Q(('request_type', 'AUTO'), ('status__in', ['PENDING_FINANCE', 'APPROVED_FINANCE', 'APPROVED_HR'])), fields=('asset',), name='uniq_open_auto_purchase_request'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Trigram search indexes for inventory.search — PostgreSQL only.
+# Other backends (SQLite dev) use the portable fallback and skip this.
+
+from django.db import migrations
+
+SEARCH_COLUMNS = ("asset_tag", "serial_number", "model_name", "brand")
+PREFIX_COLUMNS = ("asset_tag", "serial_number")
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        # substring + similarity matching (LIKE '%x%', %, <%)
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS inventory_asset_{column}_trgm "
+            f"ON inventory_asset USING gin (UPPER({column}) gin_trgm_ops)"
+        )
+    for column in PREFIX_COLUMNS:
+        # short prefixes (< 3 chars) the trigram index cannot serve
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS inventory_asset_{column}_prefix "
+            f"ON inventory_asset (UPPER({column}) text_pattern_ops)"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS inventory_asset_{column}_trgm")
+    for column in PREFIX_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS inventory_asset_{column}_prefix")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0014_purchaserequest_uniq_open_auto_purchase_request'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:44
+
+import inventory.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0015_asset_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='asset',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=inventory.storage.ContentAddressedStorage(), upload_to='asset_attachments/'),
+        ),
+        migrations.AlterField(
+            model_name='asset',
+            name='warranty_documents',
+            field=models.FileField(blank=True, null=True, storage=inventory.storage.ContentAddressedStorage(), upload_to='asset_warranty_docs/'),
+        ),
+        migrations.AlterField(
+            model_name='purchaserequest',
+            name='invoice_attachment',
+            field=models.FileField(blank=True, null=True, storage=inventory.storage.ContentAddressedStorage(), upload_to='purchase_invoices/'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0016_content_addressed_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['warranty_end', 'id'], name='asset_warranty_end_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0017_asset_warranty_end_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorMonthlySpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('spend', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('assets_purchased', models.IntegerField(default=0)),
+                ('units_received', models.IntegerField(default=0)),
+                ('receipts', models.IntegerField(default=0)),
+                ('lead_time_seconds', models.BigIntegerField(default=0)),
+                ('units_issued', models.IntegerField(default=0)),
+                ('units_damaged_lost', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_spend', to='inventory.vendor')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('vendor', 'month'), name='uniq_vendor_monthly_spend')],
+            },
+        ),
+    ]
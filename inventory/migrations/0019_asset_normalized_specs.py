@@ -0,0 +1,68 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_input_ports_gin(apps, schema_editor):
+    # jsonb containment (input_ports @> '["HDMI"]') — PostgreSQL only
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS inventory_asset_input_ports_gin "
+        "ON inventory_asset USING gin (input_ports jsonb_path_ops)"
+    )
+
+
+def drop_input_ports_gin(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS inventory_asset_input_ports_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0018_vendor_monthly_spend'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='cpu_generation',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='ram_gb',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='storage_gb',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='storage_kind',
+            field=models.CharField(blank=True, choices=[('NVME', 'NVMe SSD'), ('SSD', 'SSD'), ('EMMC', 'eMMC'), ('HDD', 'HDD'), ('HYBRID', 'SSD + HDD')], editable=False, max_length=10, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['category', 'ram_gb'], name='asset_category_ram_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['category', 'storage_gb'], name='asset_category_storage_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['cpu_generation'], name='asset_cpu_generation_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['screen_size_inch'], name='asset_screen_size_idx'),
+        ),
+        migrations.RunPython(create_input_ports_gin, drop_input_ports_gin),
+    ]
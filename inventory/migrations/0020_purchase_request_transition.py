@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:58
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0019_asset_normalized_specs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchaseRequestTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(choices=[('PENDING_FINANCE', 'Pending Finance Approval'), ('APPROVED_FINANCE', 'Finance Approved'), ('APPROVED_HR', 'HR Approved'), ('ORDER_PLACED', 'Order Placed'), ('COMPLETED', 'Completed'), ('REJECTED', 'Rejected')], max_length=20)),
+                ('to_status', models.CharField(choices=[('PENDING_FINANCE', 'Pending Finance Approval'), ('APPROVED_FINANCE', 'Finance Approved'), ('APPROVED_HR', 'HR Approved'), ('ORDER_PLACED', 'Order Placed'), ('COMPLETED', 'Completed'), ('REJECTED', 'Rejected')], max_length=20)),
+                ('quantity', models.PositiveIntegerField(blank=True, null=True)),
+                ('remarks', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('purchase_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='inventory.purchaserequest')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['purchase_request', 'created_at'], name='pr_transition_history_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0025_asset_change_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assetdetails',
+            name='transferred_from',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transferred_to', to='inventory.assetdetails'),
+        ),
+        migrations.AlterField(
+            model_name='assetdetails',
+            name='status',
+            field=models.CharField(choices=[('ISSUED', 'Issued'), ('RETURNED', 'Returned'), ('DAMAGED', 'Damaged'), ('LOST', 'Lost'), ('PARTIAL_RETURN', 'Partial Return'), ('TRANSFERRED', 'Transferred')], default='ISSUED', max_length=20),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0028_purchase_orders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10)),
+                ('daily_rate', models.FloatField(default=0)),
+                ('daily_rate_std', models.FloatField(default=0)),
+                ('lead_time_days', models.FloatField(default=0)),
+                ('available_quantity', models.IntegerField(default=0)),
+                ('on_order_quantity', models.IntegerField(default=0)),
+                ('stockout_date', models.DateField(blank=True, null=True)),
+                ('reorder_date', models.DateField(blank=True, null=True)),
+                ('target_stock', models.IntegerField(default=0)),
+                ('recommended_quantity', models.IntegerField(default=0)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('asset', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='forecast', to='inventory.asset')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['stockout_date'], name='stock_forecast_stockout_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+def fill_ports_normalized(apps, schema_editor):
+    from inventory.specs import parse_ports
+
+    Asset = apps.get_model("inventory", "Asset")
+    batch = []
+    for asset in Asset.objects.exclude(input_ports__isnull=True).only("id", "input_ports").iterator(chunk_size=1000):
+        asset.ports_normalized = parse_ports(asset.input_ports)
+        batch.append(asset)
+        if len(batch) >= 1000:
+            Asset.objects.bulk_update(batch, ["ports_normalized"])
+            batch = []
+    if batch:
+        Asset.objects.bulk_update(batch, ["ports_normalized"])
+
+
+def move_ports_gin(apps, schema_editor):
+    # jsonb containment (ports_normalized @> '["HDMI"]') — PostgreSQL only
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS inventory_asset_input_ports_gin")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS inventory_asset_ports_normalized_gin "
+        "ON inventory_asset USING gin (ports_normalized jsonb_path_ops)"
+    )
+
+
+def restore_input_ports_gin(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS inventory_asset_ports_normalized_gin")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS inventory_asset_input_ports_gin "
+        "ON inventory_asset USING gin (input_ports jsonb_path_ops)"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0029_stock_forecasts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='ports_normalized',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_ports_normalized, migrations.RunPython.noop),
+        migrations.RunPython(move_ports_gin, restore_input_ports_gin),
+    ]
@@ -3,6 +3,8 @@ from django.db import models
 from users.models import User
 from django.utils import timezone
 
+from .storage import content_addressed_storage
+
 
 class Asset(models.Model):
 
@@ -66,6 +68,7 @@ class Asset(models.Model):
     total_quantity      = models.IntegerField(default=1)
     available_quantity  = models.IntegerField(default=1)
     quantity_issued     = models.IntegerField(default=0)
+    reserved_quantity   = models.IntegerField(default=0)  # held by StockReservation, still in available_quantity
     minimum_stock_level = models.IntegerField(default=0)
 
     # ── HARDWARE SPECIFICATIONS ───────────────────────────────────────────────
@@ -79,6 +82,22 @@ class Asset(models.Model):
     battery_health       = models.IntegerField(null=True, blank=True)
     os_installed         = models.CharField(max_length=100, null=True, blank=True)
 
+    # ── NORMALIZED SPECS (shadow columns) ─────────────────────────────────────
+    # ✅ Parsed from the free-form fields above on every save — see inventory/specs.py
+    STORAGE_KIND_CHOICES = (
+        ('NVME',   'NVMe SSD'),
+        ('SSD',    'SSD'),
+        ('EMMC',   'eMMC'),
+        ('HDD',    'HDD'),
+        ('HYBRID', 'SSD + HDD'),
+    )
+    ram_gb         = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    storage_gb     = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    storage_kind   = models.CharField(max_length=10, choices=STORAGE_KIND_CHOICES, null=True, blank=True, editable=False)
+    cpu_generation = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    # Canonical port names parsed from input_ports (which is kept as entered)
+    ports_normalized = models.JSONField(null=True, blank=True, editable=False)
+
     # ── MONITOR SPECIFICATIONS ────────────────────────────────────────────────
     screen_size_inch   = models.DecimalField(max_digits=4, decimal_places=1, null=True, blank=True)
     resolution         = models.CharField(max_length=50, null=True, blank=True)
@@ -120,14 +139,29 @@ class Asset(models.Model):
     current_location = models.CharField(max_length=150, null=True, blank=True)
 
     # ── ADDITIONAL ────────────────────────────────────────────────────────────
-    attachment         = models.FileField(upload_to="asset_attachments/",  null=True, blank=True)
-    warranty_documents = models.FileField(upload_to="asset_warranty_docs/", null=True, blank=True)
+    # ✅ Content-addressed (deduplicated) — see inventory/storage.py
+    attachment         = models.FileField(upload_to="asset_attachments/",  storage=content_addressed_storage, null=True, blank=True)
+    warranty_documents = models.FileField(upload_to="asset_warranty_docs/", storage=content_addressed_storage, null=True, blank=True)
     remarks            = models.TextField(null=True, blank=True)
     created_at         = models.DateTimeField(auto_now_add=True)
     updated_at         = models.DateTimeField(auto_now=True)
 
     # ✅ NO save() override — all status/quantity logic is in views.py
 
+    class Meta:
+        indexes = [
+            # ✅ warranty expiry range filters + keyset pagination on (warranty_end, id)
+            models.Index(fields=["warranty_end", "id"], name="asset_warranty_end_idx"),
+            # ✅ faceted spec filters ("laptops with >= 16 GB RAM and >= 512 GB SSD")
+            models.Index(fields=["category", "ram_gb"],     name="asset_category_ram_idx"),
+            models.Index(fields=["category", "storage_gb"], name="asset_category_storage_idx"),
+            models.Index(fields=["cpu_generation"],         name="asset_cpu_generation_idx"),
+            models.Index(fields=["screen_size_inch"],       name="asset_screen_size_idx"),
+            # ✅ kiosk scan lookup — exact match (asset_tag is already unique)
+            models.Index(fields=["serial_number"],   name="asset_serial_number_idx"),
+            models.Index(fields=["barcode_qr_code"], name="asset_barcode_idx"),
+        ]
+
     def __str__(self):
         return f"{self.asset_tag} — {self.brand} {self.model_name}"
 
@@ -140,8 +174,12 @@ class AssetDetails(models.Model):
         ('DAMAGED',  'Damaged'),
         ('LOST',           'Lost'),
         ('PARTIAL_RETURN', 'Partial Return'),
+        ('TRANSFERRED',    'Transferred'),  # handed to another employee — see transferred_from
     )
 
+    # Issue records that still hold stock (counted in Asset.quantity_issued)
+    OPEN_STATUSES = ("ISSUED", "PARTIAL_RETURN")
+
     asset = models.ForeignKey(
         Asset, on_delete=models.CASCADE,
         null=True, blank=True,
@@ -169,6 +207,12 @@ class AssetDetails(models.Model):
         null=True, related_name='assets_issued'
     )
 
+    # Record this one was handed over from (employee → employee transfer)
+    transferred_from = models.OneToOneField(
+        'self', on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='transferred_to'
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -194,6 +238,9 @@ class PurchaseRequest(models.Model):
         ("REJECTED",         "Rejected"),
     )
 
+    # Requests still waiting on approval — stock has not been received yet
+    OPEN_STATUSES = ("PENDING_FINANCE", "APPROVED_FINANCE", "APPROVED_HR")
+
     TRIGGERED_BY_CHOICES = (
         ("SYSTEM", "System"),
         ("ADMIN",  "Admin"),
@@ -215,11 +262,24 @@ class PurchaseRequest(models.Model):
     quantity_needed    = models.PositiveIntegerField()
     status             = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING_FINANCE")
     remarks            = models.TextField(blank=True, null=True)
-    invoice_attachment = models.FileField(upload_to="purchase_invoices/", null=True, blank=True)
+    invoice_attachment = models.FileField(upload_to="purchase_invoices/", storage=content_addressed_storage, null=True, blank=True)
 
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # ✅ At most one open AUTO request per asset (reorder engine idempotency)
+            models.UniqueConstraint(
+                fields=["asset"],
+                condition=models.Q(
+                    request_type="AUTO",
+                    status__in=["PENDING_FINANCE", "APPROVED_FINANCE", "APPROVED_HR"],
+                ),
+                name="uniq_open_auto_purchase_request",
+            ),
+        ]
+
     def __str__(self):
         return f"PR-{self.id} | {self.asset.asset_tag}"
 
@@ -260,4 +320,474 @@ class Vendor(models.Model):
     created_at     = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class VendorMonthlySpend(models.Model):
+    """
+    Incrementally maintained per-vendor / per-month rollup (inventory/rollups.py).
+    Updated in the same transaction as the asset / issue / receipt that changes it;
+    `manage.py rebuild_vendor_rollups` recomputes it from scratch.
+    """
+
+    vendor = models.ForeignKey(
+        Vendor, on_delete=models.CASCADE,
+        related_name="monthly_spend"
+    )
+    month = models.DateField()  # first day of the month
+
+    spend               = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    assets_purchased    = models.IntegerField(default=0)
+    units_received      = models.IntegerField(default=0)
+    receipts            = models.IntegerField(default=0)
+    lead_time_seconds   = models.BigIntegerField(default=0)  # summed over receipts
+    units_issued        = models.IntegerField(default=0)
+    units_damaged_lost  = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["vendor", "month"], name="uniq_vendor_monthly_spend"),
+        ]
+
+    def __str__(self):
+        return f"{self.vendor_id} | {self.month:%Y-%m}"
+
+
+
+class PurchaseRequestTransition(models.Model):
+    """
+    Status history for purchase requests, written by inventory/purchasing.py
+    (one bulk_create per batch of transitions).
+    """
+
+    purchase_request = models.ForeignKey(
+        PurchaseRequest, on_delete=models.CASCADE,
+        related_name="transitions"
+    )
+
+    from_status = models.CharField(max_length=20, choices=PurchaseRequest.STATUS_CHOICES)
+    to_status   = models.CharField(max_length=20, choices=PurchaseRequest.STATUS_CHOICES)
+
+    changed_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL
+    )
+
+    quantity = models.PositiveIntegerField(null=True, blank=True)  # units received (ORDER_PLACED)
+    remarks  = models.TextField(blank=True, null=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["purchase_request", "created_at"], name="pr_transition_history_idx"),
+        ]
+
+    def __str__(self):
+        return f"PR-{self.purchase_request_id} | {self.from_status} → {self.to_status}"
+
+
+
+class StockReservation(models.Model):
+    """
+    Time-limited hold on stock (inventory/reservations.py). While HELD the
+    quantity counts in Asset.reserved_quantity, so it cannot be issued to
+    anyone else; confirm() turns it into an AssetDetails issue record,
+    release() / the expiry sweeper give it back.
+    """
+
+    STATUS_CHOICES = (
+        ("HELD",      "Held"),
+        ("CONFIRMED", "Confirmed"),
+        ("RELEASED",  "Released"),
+        ("EXPIRED",   "Expired"),
+    )
+
+    asset = models.ForeignKey(
+        Asset, on_delete=models.CASCADE,
+        related_name="reservations"
+    )
+
+    quantity = models.PositiveIntegerField()
+    status   = models.CharField(max_length=10, choices=STATUS_CHOICES, default="HELD")
+
+    reserved_for = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        related_name="stock_reservations"
+    )
+    reserved_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL,
+        related_name="stock_reservations_made"
+    )
+    ticket = models.ForeignKey(
+        "Tickets.Ticket", null=True, blank=True, on_delete=models.SET_NULL,
+        related_name="stock_reservations"
+    )
+    issue_record = models.OneToOneField(
+        AssetDetails, null=True, blank=True, on_delete=models.SET_NULL,
+        related_name="reservation"
+    )
+
+    reason     = models.TextField(blank=True, null=True)
+    expires_at = models.DateTimeField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # ✅ expiry sweeper: HELD rows past expires_at
+            models.Index(fields=["status", "expires_at"], name="reservation_expiry_idx"),
+        ]
+
+    def __str__(self):
+        return f"RES-{self.id} | {self.asset_id} × {self.quantity} ({self.status})"
+
+
+
+class Location(models.Model):
+    """
+    Site hierarchy (region → site → building → room). `path` is a
+    materialized path of ids ("/3/17/42/") kept by inventory/locations.py,
+    so a whole subtree is one indexed prefix match: path__startswith.
+    """
+
+    KIND_CHOICES = (
+        ("REGION",   "Region"),
+        ("SITE",     "Site"),
+        ("BUILDING", "Building"),
+        ("ROOM",     "Room"),
+    )
+
+    name = models.CharField(max_length=150)
+    code = models.CharField(max_length=50, unique=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default="SITE")
+
+    parent = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.PROTECT,
+        related_name="children"
+    )
+    path  = models.CharField(max_length=255, blank=True, default="")
+    depth = models.PositiveSmallIntegerField(default=0)
+
+    is_active  = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # ✅ subtree queries: path LIKE '/3/17/%' (pattern ops so Postgres can use it for LIKE)
+            models.Index(fields=["path"], name="location_path_idx", opclasses=["varchar_pattern_ops"]),
+        ]
+
+    def __str__(self):
+        return f"{self.code} — {self.name}"
+
+
+class AssetStock(models.Model):
+    """
+    On-hand (not issued) units of an asset at one location. The sum over
+    locations never exceeds Asset.available_quantity; the difference is
+    stock that has not been placed anywhere yet.
+    """
+
+    asset = models.ForeignKey(
+        Asset, on_delete=models.CASCADE,
+        related_name="stock_by_location"
+    )
+    location = models.ForeignKey(
+        Location, on_delete=models.PROTECT,
+        related_name="stock"
+    )
+
+    quantity         = models.IntegerField(default=0)
+    minimum_quantity = models.IntegerField(default=0)  # per-location low-stock threshold (0 = none)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["asset", "location"], name="uniq_asset_stock_location"),
+            models.CheckConstraint(condition=models.Q(quantity__gte=0), name="asset_stock_quantity_non_negative"),
+        ]
+        indexes = [
+            # ✅ location-scoped lists / reports join from location → asset
+            models.Index(fields=["location", "asset"], name="asset_stock_location_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.asset_id} @ {self.location_id}: {self.quantity}"
+
+
+class StockTransfer(models.Model):
+    """Audit row per transfer; a null side means unplaced stock (receive / un-place)."""
+
+    asset = models.ForeignKey(
+        Asset, on_delete=models.CASCADE,
+        related_name="stock_transfers"
+    )
+    from_location = models.ForeignKey(
+        Location, null=True, blank=True, on_delete=models.PROTECT,
+        related_name="transfers_out"
+    )
+    to_location = models.ForeignKey(
+        Location, null=True, blank=True, on_delete=models.PROTECT,
+        related_name="transfers_in"
+    )
+
+    quantity       = models.PositiveIntegerField()
+    remarks        = models.TextField(blank=True, null=True)
+    transferred_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL
+    )
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.asset_id} × {self.quantity}: {self.from_location_id} → {self.to_location_id}"
+
+
+class TagCounter(models.Model):
+    """
+    Asset tag counter per prefix — the non-PostgreSQL backend of
+    inventory/tags.py (PostgreSQL uses one native sequence per prefix).
+    Allocation bumps next_value by a whole block in one UPDATE.
+    """
+
+    prefix     = models.CharField(max_length=10, unique=True)
+    next_value = models.BigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.prefix}: next {self.next_value}"
+
+
+class AssetChange(models.Model):
+    """
+    Field-level edit history for assets, written by inventory/bulk_edit.py
+    (one bulk_create per batch). `batch` groups the rows of one bulk edit.
+    """
+
+    asset = models.ForeignKey(
+        Asset, on_delete=models.CASCADE,
+        related_name="changes"
+    )
+
+    field     = models.CharField(max_length=50)
+    old_value = models.TextField(blank=True, null=True)
+    new_value = models.TextField(blank=True, null=True)
+
+    batch      = models.UUIDField(db_index=True)
+    changed_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    remarks    = models.TextField(blank=True, null=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["asset", "created_at"], name="asset_change_history_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.asset_id} | {self.field}: {self.old_value} → {self.new_value}"
+
+
+class StockTakeSession(models.Model):
+    """
+    One physical audit. Handheld scanners upload batches of scans into
+    StockTakeScan; inventory/stocktake.py compares them with the books.
+    """
+
+    STATUS_CHOICES = (
+        ("OPEN",    "Open"),
+        ("APPLIED", "Corrections applied"),
+        ("CLOSED",  "Closed"),
+    )
+
+    name     = models.CharField(max_length=150)
+    location = models.ForeignKey(
+        Location, null=True, blank=True, on_delete=models.PROTECT,
+        related_name="stock_takes"
+    )  # audited subtree; None = everything with placed stock
+    status   = models.CharField(max_length=10, choices=STATUS_CHOICES, default="OPEN")
+
+    started_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    closed_at  = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Stock take {self.id}: {self.name} ({self.status})"
+
+
+class StockTakeScan(models.Model):
+    """Staging row per scanned code — bulk-loaded, resolved to assets set-based."""
+
+    session  = models.ForeignKey(
+        StockTakeSession, on_delete=models.CASCADE,
+        related_name="scans"
+    )
+    code     = models.CharField(max_length=255)
+    asset    = models.ForeignKey(
+        Asset, null=True, blank=True, on_delete=models.CASCADE,
+        related_name="stock_take_scans"
+    )  # None until resolved / unknown code
+    location = models.ForeignKey(
+        Location, null=True, blank=True, on_delete=models.PROTECT,
+        related_name="+"
+    )
+    condition  = models.CharField(max_length=20, blank=True, default="")
+    device     = models.CharField(max_length=100, blank=True, default="")
+    batch      = models.PositiveIntegerField(default=1)
+    scanned_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["session", "asset"], name="stock_take_scan_asset_idx"),
+            models.Index(fields=["session", "code"],  name="stock_take_scan_code_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.session_id}: {self.code}"
+
+
+class PurchaseOrder(models.Model):
+    """
+    Multi-line order to one vendor, received in one or more deliveries
+    (GoodsReceipt). Stock is posted per receipt by inventory/purchase_orders.py.
+    """
+
+    STATUS_CHOICES = (
+        ("DRAFT",              "Draft"),
+        ("ORDERED",            "Ordered"),
+        ("PARTIALLY_RECEIVED", "Partially Received"),
+        ("RECEIVED",           "Received"),
+        ("CANCELLED",          "Cancelled"),
+    )
+
+    # Orders that can still take deliveries
+    RECEIVABLE_STATUSES = ("ORDERED", "PARTIALLY_RECEIVED")
+
+    vendor = models.ForeignKey(
+        Vendor, null=True, blank=True, on_delete=models.SET_NULL,
+        related_name="purchase_orders"
+    )
+    status  = models.CharField(max_length=20, choices=STATUS_CHOICES, default="DRAFT")
+    remarks = models.TextField(blank=True, null=True)
+
+    created_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    ordered_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="po_status_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"PO-{self.id} ({self.status})"
+
+
+class PurchaseOrderLine(models.Model):
+
+    order = models.ForeignKey(
+        PurchaseOrder, on_delete=models.CASCADE,
+        related_name="lines"
+    )
+    asset = models.ForeignKey(
+        Asset, on_delete=models.PROTECT,
+        related_name="purchase_order_lines"
+    )
+
+    quantity_ordered  = models.PositiveIntegerField()
+    quantity_received = models.PositiveIntegerField(default=0)
+    unit_price        = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["order", "asset"], name="uniq_po_line_asset"),
+            models.CheckConstraint(
+                condition=models.Q(quantity_received__lte=models.F("quantity_ordered")),
+                name="po_line_not_over_received",
+            ),
+        ]
+
+    def __str__(self):
+        return f"PO-{self.order_id} | {self.asset_id}: {self.quantity_received}/{self.quantity_ordered}"
+
+
+class GoodsReceipt(models.Model):
+    """One delivery against a purchase order — the invoice is stored here, once."""
+
+    order = models.ForeignKey(
+        PurchaseOrder, on_delete=models.CASCADE,
+        related_name="receipts"
+    )
+
+    invoice_number     = models.CharField(max_length=100, null=True, blank=True)
+    invoice_attachment = models.FileField(upload_to="purchase_invoices/", storage=content_addressed_storage, null=True, blank=True)
+    remarks            = models.TextField(blank=True, null=True)
+
+    received_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    received_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Receipt {self.id} for PO-{self.order_id}"
+
+
+class GoodsReceiptLine(models.Model):
+
+    receipt = models.ForeignKey(
+        GoodsReceipt, on_delete=models.CASCADE,
+        related_name="lines"
+    )
+    order_line = models.ForeignKey(
+        PurchaseOrderLine, on_delete=models.CASCADE,
+        related_name="receipt_lines"
+    )
+    quantity = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"Receipt {self.receipt_id} | line {self.order_line_id}: {self.quantity}"
+
+
+class StockForecast(models.Model):
+    """
+    Projected depletion per asset, rewritten by the nightly forecasting job
+    (inventory/forecasting.py). The low-stock report and purchase request
+    creation read it instead of recomputing consumption history.
+    """
+
+    asset = models.OneToOneField(
+        Asset, on_delete=models.CASCADE,
+        related_name="forecast"
+    )
+
+    method               = models.CharField(max_length=10)  # "EWMA" | "SMA"
+    daily_rate           = models.FloatField(default=0)     # net units issued per day
+    daily_rate_std       = models.FloatField(default=0)
+    lead_time_days       = models.FloatField(default=0)
+    available_quantity   = models.IntegerField(default=0)   # at computed_at
+    on_order_quantity    = models.IntegerField(default=0)
+    stockout_date        = models.DateField(null=True, blank=True)  # None = not depleting
+    reorder_date         = models.DateField(null=True, blank=True)  # stockout_date - lead time
+    target_stock         = models.IntegerField(default=0)   # cover lead time + review period + safety stock
+    recommended_quantity = models.IntegerField(default=0)
+
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["stockout_date"], name="stock_forecast_stockout_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.asset_id}: {self.daily_rate:.2f}/day, out {self.stockout_date or '—'}"
@@ -0,0 +1,192 @@
+# inventory/purchase_orders.py
+"""
+Multi-line purchase orders with partial receipts.
+
+A PurchaseOrder has one line per asset. Each delivery is a GoodsReceipt
+(invoice stored once, on the receipt) with one GoodsReceiptLine per line it
+covers. Posting a receipt is one transaction:
+
+  lock      the order (receipts against one order are serialised) and its lines
+  check     every line: quantity > 0 and received + quantity <= ordered
+  update    quantity_received on all covered lines in ONE CASE-based UPDATE
+  insert    the receipt + its lines (one bulk_create)
+  stock     purchasing._apply_receipts — ONE set-based UPDATE of the Asset
+            counters, one status re-derive, reorder hooks, vendor rollups
+            (credited to the order's vendor, else each asset's)
+  status    ORDERED → PARTIALLY_RECEIVED → RECEIVED
+
+Over-receipts are rejected — the whole receipt, not just the line.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .locations import put_stock
+from .models import Asset, GoodsReceipt, GoodsReceiptLine, PurchaseOrder, PurchaseOrderLine
+from .purchasing import _apply_receipts
+
+MAX_LINES = 500
+
+CANCELLABLE_STATUSES = ("DRAFT", "ORDERED", "PARTIALLY_RECEIVED")
+
+
+def _positive_int(value, name):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+    if value <= 0:
+        raise ValueError(f"{name} must be greater than 0")
+    return value
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ORDERS
+# ─────────────────────────────────────────────────────────────────────────────
+
+@transaction.atomic
+def create_order(lines, vendor=None, user=None, remarks=None, place=True):
+    """lines: [{"asset_id", "quantity", "unit_price"?}] → PurchaseOrder (ORDERED, or DRAFT when place=False)."""
+    if not isinstance(lines, list) or not lines:
+        raise ValueError("lines must be a non-empty list")
+    if len(lines) > MAX_LINES:
+        raise ValueError(f"At most {MAX_LINES} lines per order")
+
+    parsed = {}
+    for line in lines:
+        if not isinstance(line, dict):
+            raise ValueError("Each line must be an object")
+        asset_id = _positive_int(line.get("asset_id"), "asset_id")
+        if asset_id in parsed:
+            raise ValueError(f"Asset {asset_id} appears on more than one line")
+        unit_price = line.get("unit_price")
+        if unit_price not in (None, ""):
+            try:
+                unit_price = Decimal(str(unit_price))
+            except InvalidOperation:
+                raise ValueError("unit_price must be a number")
+        else:
+            unit_price = None
+        parsed[asset_id] = (_positive_int(line.get("quantity"), "quantity"), unit_price)
+
+    known = set(Asset.objects.filter(id__in=parsed).values_list("id", flat=True))
+    if len(known) != len(parsed):
+        raise ValueError(f"Unknown asset_id(s): {sorted(set(parsed) - known)}")
+
+    now   = timezone.now()
+    order = PurchaseOrder.objects.create(
+        vendor     = vendor,
+        status     = "ORDERED" if place else "DRAFT",
+        remarks    = remarks,
+        created_by = user,
+        ordered_at = now if place else None,
+    )
+    PurchaseOrderLine.objects.bulk_create([
+        PurchaseOrderLine(order=order, asset_id=asset_id, quantity_ordered=quantity, unit_price=unit_price)
+        for asset_id, (quantity, unit_price) in parsed.items()
+    ])
+    return order
+
+
+def place_order(order_id):
+    """DRAFT → ORDERED (conditional UPDATE). ValueError if the order is not a draft."""
+    now = timezone.now()
+    if not PurchaseOrder.objects.filter(id=order_id, status="DRAFT").update(status="ORDERED", ordered_at=now, updated_at=now):
+        if not PurchaseOrder.objects.filter(id=order_id).exists():
+            raise PurchaseOrder.DoesNotExist
+        raise ValueError("Only draft orders can be placed")
+    return PurchaseOrder.objects.get(id=order_id)
+
+
+def cancel_order(order_id):
+    """No further deliveries. Units already received stay received."""
+    if not PurchaseOrder.objects.filter(id=order_id, status__in=CANCELLABLE_STATUSES).update(
+        status="CANCELLED", updated_at=timezone.now(),
+    ):
+        if not PurchaseOrder.objects.filter(id=order_id).exists():
+            raise PurchaseOrder.DoesNotExist
+        raise ValueError("Order can no longer be cancelled")
+    return PurchaseOrder.objects.get(id=order_id)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RECEIPTS
+# ─────────────────────────────────────────────────────────────────────────────
+
+@transaction.atomic
+def receive_order(order_id, lines, user=None, invoice_number=None, invoice_file=None, remarks=None, location=None):
+    """
+    Post one delivery. lines: [{"line_id" | "asset_id", "quantity"}].
+    `location` (optional) places the received units there. Returns the GoodsReceipt.
+    """
+    order = PurchaseOrder.objects.select_for_update().get(id=order_id)
+    if order.status not in PurchaseOrder.RECEIVABLE_STATUSES:
+        raise ValueError(f"Order is {order.status.lower()} — it cannot take deliveries")
+    if not isinstance(lines, list) or not lines:
+        raise ValueError("lines must be a non-empty list")
+
+    order_lines = {line.id: line for line in order.lines.select_for_update()}
+    by_asset    = {line.asset_id: line for line in order_lines.values()}
+
+    delivered = {}
+    for item in lines:
+        if not isinstance(item, dict):
+            raise ValueError("Each line must be an object")
+        if item.get("line_id") not in (None, ""):
+            line = order_lines.get(_positive_int(item["line_id"], "line_id"))
+        else:
+            line = by_asset.get(_positive_int(item.get("asset_id"), "asset_id"))
+        if line is None:
+            raise ValueError("Line is not on this order")
+        if line.id in delivered:
+            raise ValueError(f"Line {line.id} appears twice in the receipt")
+
+        quantity = _positive_int(item.get("quantity"), "quantity")
+        if line.quantity_received + quantity > line.quantity_ordered:
+            raise ValueError(
+                f"Line {line.id}: receiving {quantity} would exceed the ordered "
+                f"{line.quantity_ordered} ({line.quantity_received} already received)"
+            )
+        delivered[line.id] = quantity
+
+    now = timezone.now()
+
+    # ✅ One UPDATE for every covered line
+    PurchaseOrderLine.objects.filter(id__in=delivered).update(
+        quantity_received=F("quantity_received") + Case(
+            *[When(id=line_id, then=Value(quantity)) for line_id, quantity in delivered.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+    )
+
+    receipt = GoodsReceipt.objects.create(
+        order              = order,
+        invoice_number     = invoice_number,
+        invoice_attachment = invoice_file,
+        remarks            = remarks,
+        received_by        = user,
+        received_at        = now,
+    )
+    GoodsReceiptLine.objects.bulk_create([
+        GoodsReceiptLine(receipt=receipt, order_line_id=line_id, quantity=quantity)
+        for line_id, quantity in delivered.items()
+    ])
+
+    # ✅ Asset counters, stock status, reorder hooks and vendor rollups — set-based
+    requested_at = order.ordered_at or order.created_at
+    _apply_receipts(
+        [(order_lines[line_id].asset_id, quantity, requested_at) for line_id, quantity in delivered.items()],
+        now,
+        vendor_id=order.vendor_id,
+    )
+    if location is not None:
+        for line_id, quantity in delivered.items():
+            put_stock(order_lines[line_id].asset_id, location.id, quantity)
+
+    outstanding = order.lines.filter(quantity_received__lt=F("quantity_ordered")).exists()
+    order.status = "PARTIALLY_RECEIVED" if outstanding else "RECEIVED"
+    order.save(update_fields=["status", "updated_at"])
+    return receipt
@@ -0,0 +1,228 @@
+# inventory/purchasing.py
+"""
+Purchase-request state machine.
+
+TRANSITIONS lists the legal status moves. `apply_transitions` takes a batch
+of {request_id, status[, purchased_quantity, remarks]} and, in one
+transaction:
+
+  * locks the requests and validates each move against TRANSITIONS,
+  * issues ONE conditional UPDATE per target status
+    (… WHERE id IN (…) AND status IN (<allowed sources>)),
+  * writes the history rows with a single bulk_create,
+  * applies receipts (→ ORDER_PLACED) to asset quantities with one
+    set-based UPDATE and re-derives the stock status with another.
+
+Invalid items are reported back and skipped; the rest of the batch applies.
+The single-request finance / HR views go through the same path.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .detail_page import invalidate_detail_pages
+from .kiosk import invalidate_scan_cache
+from .models import Asset, PurchaseRequest, PurchaseRequestTransition
+from .rollups import record_receipts
+from .services import LOW_STOCK_STATUSES, enqueue_reorder_check
+
+TRANSITIONS = {
+    "PENDING_FINANCE":  ("APPROVED_FINANCE", "REJECTED"),
+    "APPROVED_FINANCE": ("APPROVED_HR", "REJECTED"),
+    "APPROVED_HR":      ("ORDER_PLACED", "REJECTED"),
+    # Stock is received on ORDER_PLACED — from here the request can only be closed
+    "ORDER_PLACED":     ("COMPLETED",),
+    "COMPLETED":        (),
+    "REJECTED":         (),
+}
+
+# Target status → statuses it may be reached from
+ALLOWED_FROM = {}
+for _source, _targets in TRANSITIONS.items():
+    for _target in _targets:
+        ALLOWED_FROM[_target] = ALLOWED_FROM.get(_target, ()) + (_source,)
+
+# The transition that adds purchased stock to the asset
+RECEIPT_STATUS = "ORDER_PLACED"
+
+# Same thresholds as views._update_asset_status, as one SQL expression
+STOCK_STATUS = Case(
+    When(available_quantity__lte=0, then=Value("OUT_OF_STOCK")),
+    When(available_quantity__lte=F("minimum_stock_level"), then=Value("LOW_STOCK")),
+    default=Value("AVAILABLE"),
+)
+
+
+def can_transition(from_status, to_status):
+    return to_status in TRANSITIONS.get(from_status, ())
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# INPUT
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _parse_item(item):
+    """Raw dict → (request_id, status, quantity, remarks). Raises ValueError."""
+    if not isinstance(item, dict):
+        raise ValueError("Each item must be an object")
+
+    try:
+        request_id = int(item.get("request_id"))
+    except (TypeError, ValueError):
+        raise ValueError("request_id must be an integer")
+
+    status = str(item.get("status") or "").upper()
+    if status not in ALLOWED_FROM:
+        raise ValueError(f"status must be one of {sorted(ALLOWED_FROM)}")
+
+    quantity = item.get("purchased_quantity")
+    if quantity not in (None, ""):
+        try:
+            quantity = int(quantity)
+        except (TypeError, ValueError):
+            raise ValueError("purchased_quantity must be an integer")
+        if quantity <= 0:
+            raise ValueError("purchased_quantity must be greater than 0")
+    else:
+        quantity = None
+
+    return request_id, status, quantity, item.get("remarks")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RECEIPTS — set-based asset quantity update
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _apply_receipts(receipts, now, vendor_id=None):
+    """
+    receipts: [(asset_id, units, requested_at)] → asset quantities, status, rollups.
+    `vendor_id` credits the vendor rollup to that vendor (a purchase order's)
+    instead of each asset's own vendor.
+    """
+    per_asset = defaultdict(int)
+    for asset_id, units, _ in receipts:
+        per_asset[asset_id] += units
+
+    assets   = Asset.objects.filter(id__in=per_asset)
+    previous = dict(assets.select_for_update().values_list("id", "status"))
+    delta    = Case(
+        *[When(id=asset_id, then=Value(units)) for asset_id, units in per_asset.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    assets.update(
+        total_quantity     = F("total_quantity") + delta,
+        available_quantity = F("available_quantity") + delta,
+        updated_at         = now,
+    )
+    # Second statement so the thresholds see the new available_quantity
+    assets.update(status=STOCK_STATUS)
+
+    vendors = {}
+    for asset_id, asset_vendor_id, status in assets.values_list("id", "vendor_id", "status"):
+        vendors[asset_id] = asset_vendor_id
+        if status in LOW_STOCK_STATUSES and status != previous.get(asset_id):
+            enqueue_reorder_check(asset_id)
+
+    # ✅ Vendor rollup: units received + lead time (request → receipt)
+    record_receipts(
+        [(vendor_id or vendors.get(asset_id), units, requested_at) for asset_id, units, requested_at in receipts],
+        received_at=now,
+    )
+    # queryset.update() skips the post_save signal
+    invalidate_detail_pages(per_asset)
+    invalidate_scan_cache(per_asset)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ENGINE
+# ─────────────────────────────────────────────────────────────────────────────
+
+def apply_transitions(items, user=None, remarks=None):
+    """
+    Apply a batch of transitions. `remarks` is the default for items without
+    their own. Receipts use `purchased_quantity`, defaulting to the request's
+    quantity_needed. Returns {"applied": [...], "skipped": [...]}.
+    """
+    applied = []
+    skipped = []
+    wanted  = {}
+
+    for item in items:
+        try:
+            request_id, status, quantity, note = _parse_item(item)
+        except ValueError as e:
+            skipped.append({"request_id": item.get("request_id") if isinstance(item, dict) else None, "error": str(e)})
+            continue
+        if request_id in wanted:
+            skipped.append({"request_id": request_id, "error": "Duplicate request_id in batch"})
+            continue
+        wanted[request_id] = (status, quantity, note if note is not None else remarks)
+
+    if not wanted:
+        return {"applied": applied, "skipped": skipped}
+
+    now = timezone.now()
+    with transaction.atomic():
+        current = {
+            row["id"]: row
+            for row in (
+                PurchaseRequest.objects
+                .select_for_update()
+                .filter(id__in=wanted)
+                .values("id", "status", "asset_id", "quantity_needed", "created_at")
+            )
+        }
+
+        by_target = defaultdict(list)
+        for request_id, (status, _, _) in wanted.items():
+            row = current.get(request_id)
+            if row is None:
+                skipped.append({"request_id": request_id, "error": "Purchase request not found"})
+            elif not can_transition(row["status"], status):
+                skipped.append({"request_id": request_id, "error": f"Cannot move from {row['status']} to {status}"})
+            elif status == RECEIPT_STATUS and row["asset_id"] is None:
+                skipped.append({"request_id": request_id, "error": "Purchase request has no asset"})
+            else:
+                by_target[status].append(request_id)
+
+        history  = []
+        receipts = []
+        for status, request_ids in by_target.items():
+            # ✅ One conditional UPDATE per target status
+            PurchaseRequest.objects.filter(
+                id__in=request_ids, status__in=ALLOWED_FROM[status],
+            ).update(status=status, updated_at=now)
+
+            for request_id in request_ids:
+                row               = current[request_id]
+                _, quantity, note = wanted[request_id]
+                if status == RECEIPT_STATUS:
+                    quantity = quantity or row["quantity_needed"]
+                    receipts.append((row["asset_id"], quantity, row["created_at"]))
+                else:
+                    quantity = None
+
+                history.append(PurchaseRequestTransition(
+                    purchase_request_id = request_id,
+                    from_status         = row["status"],
+                    to_status           = status,
+                    changed_by          = user,
+                    quantity            = quantity,
+                    remarks             = note,
+                    created_at          = now,
+                ))
+                applied.append({
+                    "request_id":  request_id,
+                    "from_status": row["status"],
+                    "to_status":   status,
+                    "quantity":    quantity,
+                })
+
+        PurchaseRequestTransition.objects.bulk_create(history, batch_size=500)
+        if receipts:
+            _apply_receipts(receipts, now)
+
+    return {"applied": applied, "skipped": skipped}
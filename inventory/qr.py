@@ -0,0 +1,117 @@
+# inventory/qr.py
+"""
+On-demand QR codes for assets.
+
+The payload is built from settings.QR_BASE_URL at request time, so changing
+the host only needs a settings change (plus `regenerate_qr_codes` to warm
+the cache). Rendered images are cached in a bounded in-process LRU and on
+disk under MEDIA_ROOT/qr_cache/<asset_id>/, keyed by (asset id, payload URL,
+format, size) — a new base URL simply produces new cache entries.
+"""
+import hashlib
+import os
+import uuid
+from functools import lru_cache
+from io import BytesIO
+
+import qrcode
+import qrcode.image.svg
+from django.conf import settings
+from django.urls import reverse
+
+QR_BASE_URL   = getattr(settings, "QR_BASE_URL", "http://localhost:8000").rstrip("/")
+QR_CACHE_ROOT = "qr_cache/"
+QR_LRU_SIZE   = getattr(settings, "QR_LRU_SIZE", 512)
+
+QR_FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+# Allowed pixel sizes (PNG) — requests snap to the nearest, keeps the cache bounded
+QR_SIZES     = (150, 300, 600, 1200)
+DEFAULT_SIZE = 300
+QR_BORDER    = 4
+
+
+def qr_payload_url(asset_id):
+    """What the QR encodes — the public asset details page."""
+    return f"{QR_BASE_URL}{reverse('asset_details', args=[asset_id])}"
+
+
+def normalize_size(size):
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        return DEFAULT_SIZE
+    return min(QR_SIZES, key=lambda allowed: abs(allowed - size))
+
+
+def qr_url_key(payload):
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def qr_cache_name(asset_id, payload, fmt, size):
+    return f"{QR_CACHE_ROOT}{asset_id}/{qr_url_key(payload)}-{size}.{fmt}"
+
+
+def _build_qr(payload, size, border=QR_BORDER):
+    qr = qrcode.QRCode(border=border)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    qr.box_size = max(1, size // (qr.modules_count + 2 * border))
+    return qr
+
+
+def render_qr_image(payload, size, border=1):
+    """Grayscale PIL image of at most size×size px — for composing label sheets."""
+    return _build_qr(payload, size, border).make_image().get_image().convert("L")
+
+
+def render_qr_bytes(payload, fmt, size):
+    """Pure render — no DB / Django state, safe to run in a process pool."""
+    qr = _build_qr(payload, size)
+
+    if fmt == "svg":
+        img = qr.make_image(image_factory=qrcode.image.svg.SvgPathImage)
+    else:
+        img = qr.make_image()
+
+    buffer = BytesIO()
+    img.save(buffer)
+    return buffer.getvalue()
+
+
+def write_atomic(full_path, data):
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    tmp_path = f"{full_path}.{uuid.uuid4().hex}.part"
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp_path, full_path)
+
+
+def render_to_cache(job):
+    """Process-pool worker: job = (payload, fmt, size, full_path, force). Returns bytes written."""
+    payload, fmt, size, full_path, force = job
+    if not force and os.path.exists(full_path):
+        return 0
+    data = render_qr_bytes(payload, fmt, size)
+    write_atomic(full_path, data)
+    return len(data)
+
+
+@lru_cache(maxsize=QR_LRU_SIZE)
+def _cached_qr(asset_id, payload, fmt, size):
+    full_path = os.path.join(settings.MEDIA_ROOT, qr_cache_name(asset_id, payload, fmt, size))
+    try:
+        with open(full_path, "rb") as fh:
+            data = fh.read()
+    except FileNotFoundError:
+        data = render_qr_bytes(payload, fmt, size)
+        write_atomic(full_path, data)
+    etag = f'"{hashlib.sha256(data).hexdigest()}"'
+    return data, etag
+
+
+def get_qr(asset_id, fmt="png", size=DEFAULT_SIZE):
+    """(bytes, strong etag) — LRU, then disk cache, then render."""
+    return _cached_qr(asset_id, qr_payload_url(asset_id), fmt, normalize_size(size))
@@ -0,0 +1,149 @@
+# inventory/reconcile.py
+"""
+Stock counter reconciliation.
+
+Asset.quantity_issued / available_quantity / status are maintained by hand
+in the issue, return and purchase views. The truth is:
+
+    quantity_issued    = Σ AssetDetails.quantity_issued over open records
+    available_quantity = total_quantity − quantity_issued
+    reserved_quantity  = Σ StockReservation.quantity over HELD reservations
+    status             = stock thresholds (views._update_asset_status)
+
+total_quantity itself (receipts minus damage / loss) has no independent
+source and is taken as correct.
+
+`reconcile_stock` walks the table in id-range chunks. Per chunk: one
+grouped aggregate over AssetDetails (and one over HELD reservations), one read of the counters, a compare in
+Python and — with repair=True — one bulk_update of the drifted rows. In
+repair mode each chunk is its own short transaction holding row locks on
+that chunk only, so it is safe to run nightly next to live traffic.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from .detail_page import invalidate_detail_pages
+from .kiosk import invalidate_scan_cache
+from .models import Asset, AssetDetails, StockReservation
+from .services import LOW_STOCK_STATUSES, enqueue_reorder_check
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+# Mismatches listed in the result (all of them are counted)
+MAX_REPORTED       = 500
+
+COUNTER_FIELDS = ("quantity_issued", "available_quantity", "reserved_quantity", "status")
+
+
+def expected_status(available, minimum_stock_level):
+    """Mirror of views._update_asset_status."""
+    if available <= 0:
+        return "OUT_OF_STOCK"
+    if available <= minimum_stock_level:
+        return "LOW_STOCK"
+    return "AVAILABLE"
+
+
+def _reconcile_chunk(low, high, repair):
+    """Check (and optionally fix) assets with low <= id < high → list of mismatch dicts."""
+    assets = Asset.objects.filter(id__gte=low, id__lt=high).order_by("id")
+    if repair:
+        assets = assets.select_for_update()
+
+    rows = list(assets.only(
+        "id", "asset_tag", "total_quantity", "available_quantity",
+        "quantity_issued", "reserved_quantity", "minimum_stock_level", "status",
+    ))
+    if not rows:
+        return []
+
+    # ✅ One grouped aggregate per chunk
+    issued = dict(
+        AssetDetails.objects
+        .filter(asset_id__gte=low, asset_id__lt=high, status__in=AssetDetails.OPEN_STATUSES)
+        .values_list("asset_id")
+        .annotate(total=Sum("quantity_issued"))
+        .order_by()
+    )
+    reserved = dict(
+        StockReservation.objects
+        .filter(asset_id__gte=low, asset_id__lt=high, status="HELD")
+        .values_list("asset_id")
+        .annotate(total=Sum("quantity"))
+        .order_by()
+    )
+
+    mismatches = []
+    drifted    = []
+    for asset in rows:
+        expected = {"quantity_issued": issued.get(asset.id, 0)}
+        expected["available_quantity"] = asset.total_quantity - expected["quantity_issued"]
+        expected["reserved_quantity"]  = reserved.get(asset.id, 0)
+        expected["status"]             = expected_status(expected["available_quantity"], asset.minimum_stock_level)
+
+        diffs = {
+            field: {"actual": getattr(asset, field), "expected": value}
+            for field, value in expected.items()
+            if getattr(asset, field) != value
+        }
+        if not diffs:
+            continue
+
+        mismatches.append({"asset_id": asset.id, "asset_tag": asset.asset_tag, "fields": diffs})
+        if repair and "status" in diffs and expected["status"] in LOW_STOCK_STATUSES:
+            enqueue_reorder_check(asset.id)
+        for field, value in expected.items():
+            setattr(asset, field, value)
+        drifted.append(asset)
+
+    if repair and drifted:
+        now = timezone.now()
+        for asset in drifted:
+            asset.updated_at = now
+        # bulk_update skips save() / signals — one UPDATE … CASE for the chunk
+        Asset.objects.bulk_update(drifted, COUNTER_FIELDS + ("updated_at",))
+        changed_ids = [asset.id for asset in drifted]
+        invalidate_detail_pages(changed_ids)
+        invalidate_scan_cache(changed_ids)
+
+    return mismatches
+
+
+def reconcile_stock(repair=False, chunk_size=DEFAULT_CHUNK_SIZE, start_id=1, end_id=None):
+    """
+    Compare every asset's counters with its open issue records.
+    Returns {checked_chunks, mismatched, repaired, mismatches[:MAX_REPORTED]}.
+    """
+    chunk_size = max(1, int(chunk_size))
+    if end_id is None:
+        end_id = Asset.objects.aggregate(last=Max("id"))["last"] or 0
+
+    mismatches = []
+    mismatched = 0
+    chunks     = 0
+    for low in range(start_id, end_id + 1, chunk_size):
+        high = min(low + chunk_size, end_id + 1)
+        if repair:
+            with transaction.atomic():
+                found = _reconcile_chunk(low, high, repair=True)
+        else:
+            found = _reconcile_chunk(low, high, repair=False)
+        chunks     += 1
+        mismatched += len(found)
+        mismatches.extend(found[:MAX_REPORTED - len(mismatches)])
+
+    if mismatched:
+        logger.warning(
+            "Stock reconciliation: %s asset(s) out of sync%s",
+            mismatched, " (repaired)" if repair else "",
+        )
+    return {
+        "checked_chunks": chunks,
+        "mismatched":     mismatched,
+        "repaired":       mismatched if repair else 0,
+        "mismatches":     mismatches,
+    }
@@ -0,0 +1,181 @@
+# inventory/reservations.py
+"""
+Time-limited stock reservations.
+
+A HELD reservation counts in Asset.reserved_quantity; available_quantity
+still includes it (the units are on the shelf), and every issue path checks
+available_quantity − reserved_quantity. Apart from locations.issue_stock
+on confirm, nothing here takes a SELECT … FOR UPDATE on the asset — each
+step is one conditional UPDATE:
+
+  reserve   reserved += q      WHERE available >= reserved + q
+  confirm   reservation HELD → CONFIRMED (if not expired), then
+            units leave stock locations (locations.issue_stock), then
+            reserved −= q, available −= q, issued += q, status re-derived —
+            stock was set aside at reserve time, so it is not re-validated
+  release   reservation HELD → RELEASED, reserved −= q
+  sweep     every expired HELD row → EXPIRED in ONE UPDATE, then one
+            CASE-based UPDATE gives the units back per asset
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .detail_page import invalidate_detail_pages
+from .kiosk import invalidate_scan_cache
+from .locations import issue_stock
+from .models import Asset, AssetDetails, StockReservation
+from .rollups import record_issue
+from .services import LOW_STOCK_STATUSES, enqueue_reorder_check
+
+DEFAULT_TTL_MINUTES = getattr(settings, "STOCK_RESERVATION_TTL_MINUTES", 24 * 60)
+MAX_TTL_MINUTES     = 14 * 24 * 60
+
+CONFIRM_ISSUE_REASON = "Reservation confirmed"
+
+
+def _status_after_issue(quantity):
+    """views._update_asset_status thresholds, evaluated on available_quantity − quantity."""
+    return Case(
+        When(available_quantity__lte=quantity, then=Value("OUT_OF_STOCK")),
+        When(available_quantity__lte=F("minimum_stock_level") + quantity, then=Value("LOW_STOCK")),
+        default=Value("AVAILABLE"),
+    )
+
+
+def _claim(reservation_id, new_status, now, unexpired=False):
+    """HELD → new_status for one reservation (conditional UPDATE). ValueError if it is not HELD."""
+    held = StockReservation.objects.filter(id=reservation_id, status="HELD")
+    if unexpired:
+        held = held.filter(expires_at__gt=now)
+    if held.update(status=new_status, updated_at=now):
+        return StockReservation.objects.get(id=reservation_id)
+
+    current = StockReservation.objects.filter(id=reservation_id).values_list("status", flat=True).first()
+    if current is None:
+        raise StockReservation.DoesNotExist
+    if current == "HELD":
+        raise ValueError("Reservation has expired")
+    raise ValueError(f"Reservation is already {current.lower()}")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# OPERATIONS
+# ─────────────────────────────────────────────────────────────────────────────
+
+@transaction.atomic
+def reserve_stock(asset_id, quantity, reserved_for, reserved_by=None, ticket=None, ttl_minutes=None, reason=None):
+    """Hold `quantity` units for `reserved_for`. ValueError when not enough unreserved stock."""
+    if quantity <= 0:
+        raise ValueError("quantity must be > 0")
+    ttl_minutes = DEFAULT_TTL_MINUTES if ttl_minutes is None else ttl_minutes
+    if not 0 < ttl_minutes <= MAX_TTL_MINUTES:
+        raise ValueError(f"ttl_minutes must be between 1 and {MAX_TTL_MINUTES}")
+
+    held = Asset.objects.filter(
+        id=asset_id,
+        available_quantity__gte=F("reserved_quantity") + quantity,
+    ).update(reserved_quantity=F("reserved_quantity") + quantity)
+    if not held:
+        if not Asset.objects.filter(id=asset_id).exists():
+            raise Asset.DoesNotExist
+        raise ValueError("Not enough unreserved stock available")
+
+    reservation = StockReservation.objects.create(
+        asset_id     = asset_id,
+        quantity     = quantity,
+        reserved_for = reserved_for,
+        reserved_by  = reserved_by,
+        ticket       = ticket,
+        reason       = reason,
+        expires_at   = timezone.now() + timedelta(minutes=ttl_minutes),
+    )
+    invalidate_scan_cache([asset_id])
+    return reservation
+
+
+@transaction.atomic
+def confirm_reservation(reservation_id, issued_by=None, location=None, issue_reason=None, remarks=None,
+                        location_id=None):
+    """Turn a live hold into an AssetDetails issue record. Returns (reservation, issue record)."""
+    now         = timezone.now()
+    reservation = _claim(reservation_id, "CONFIRMED", now, unexpired=True)
+    quantity    = reservation.quantity
+
+    issue_stock(reservation.asset_id, quantity, location_id)
+
+    Asset.objects.filter(id=reservation.asset_id).update(
+        reserved_quantity  = F("reserved_quantity") - quantity,
+        available_quantity = F("available_quantity") - quantity,
+        quantity_issued    = F("quantity_issued") + quantity,
+        status             = _status_after_issue(quantity),
+        updated_at         = now,
+    )
+    asset = Asset.objects.get(id=reservation.asset_id)
+    if asset.status in LOW_STOCK_STATUSES:
+        enqueue_reorder_check(asset.id)
+
+    record = AssetDetails.objects.create(
+        asset           = asset,
+        user_id         = reservation.reserved_for_id,
+        quantity_issued = quantity,
+        issued_by       = issued_by,
+        issue_date      = now,
+        location        = location,
+        issue_reason    = issue_reason or reservation.reason or CONFIRM_ISSUE_REASON,
+        remarks         = remarks,
+        status          = "ISSUED",
+    )
+    reservation.issue_record = record
+    reservation.save(update_fields=["issue_record", "updated_at"])
+    record_issue(asset, quantity)
+
+    # queryset.update() skips the post_save signal
+    invalidate_detail_pages([asset.id])
+    invalidate_scan_cache([asset.id])
+    return reservation, record
+
+
+@transaction.atomic
+def release_reservation(reservation_id):
+    reservation = _claim(reservation_id, "RELEASED", timezone.now())
+    Asset.objects.filter(id=reservation.asset_id).update(
+        reserved_quantity=F("reserved_quantity") - reservation.quantity,
+    )
+    invalidate_scan_cache([reservation.asset_id])
+    return reservation
+
+
+def sweep_expired_reservations(now=None):
+    """Release every expired hold. Returns the number of reservations expired."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        # Rows being confirmed / released right now are skipped, not waited on
+        expired = list(
+            StockReservation.objects
+            .select_for_update(skip_locked=True)
+            .filter(status="HELD", expires_at__lte=now)
+            .values_list("id", "asset_id", "quantity")
+        )
+        if not expired:
+            return 0
+
+        # ✅ One UPDATE expires the whole batch
+        StockReservation.objects.filter(id__in=[row[0] for row in expired]).update(status="EXPIRED", updated_at=now)
+
+        per_asset = defaultdict(int)
+        for _, asset_id, quantity in expired:
+            per_asset[asset_id] += quantity
+        Asset.objects.filter(id__in=per_asset).update(
+            reserved_quantity=F("reserved_quantity") - Case(
+                *[When(id=asset_id, then=Value(quantity)) for asset_id, quantity in per_asset.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+        )
+        invalidate_scan_cache(per_asset)
+    return len(expired)
@@ -0,0 +1,247 @@
+# inventory/rollups.py
+"""
+Vendor rollups.
+
+VendorMonthlySpend holds per-vendor / per-month counters (spend, assets,
+receipts, lead time, issued and damaged/lost units). The views bump them
+with F() increments inside the same transaction as the write that changed
+them, so vendor scorecards are a single GROUP BY over a small table
+instead of a scan over every asset, issue record and purchase request.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Asset, AssetDetails, GoodsReceiptLine, PurchaseRequest, VendorMonthlySpend
+
+ROLLUP_FIELDS = (
+    "spend",
+    "assets_purchased",
+    "units_received",
+    "receipts",
+    "lead_time_seconds",
+    "units_issued",
+    "units_damaged_lost",
+)
+
+# Purchase requests that have been received (finance_mark_as_purchased onwards)
+RECEIVED_STATUSES = ("ORDER_PLACED", "COMPLETED")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HELPERS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def month_start(value):
+    """date / datetime / 'YYYY-MM-DD' → first day of that month (None if unparseable)."""
+    if isinstance(value, datetime):
+        value = timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    elif isinstance(value, str):
+        try:
+            value = parse_date(value)
+        except ValueError:
+            value = None
+    if not isinstance(value, date):
+        return None
+    return value.replace(day=1)
+
+
+def _money(value):
+    return Decimal(str(value)) if value not in (None, "") else Decimal("0")
+
+
+def _bump(vendor_id, when, **deltas):
+    """Add `deltas` to the (vendor, month) row, creating it on first use."""
+    month  = month_start(when)
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not vendor_id or month is None or not deltas:
+        return
+
+    rows       = VendorMonthlySpend.objects.filter(vendor_id=vendor_id, month=month)
+    increments = {field: F(field) + delta for field, delta in deltas.items()}
+    if rows.update(updated_at=timezone.now(), **increments):
+        return
+    try:
+        with transaction.atomic():
+            VendorMonthlySpend.objects.create(vendor_id=vendor_id, month=month, **deltas)
+    except IntegrityError:
+        # Lost the insert race — the row exists now
+        rows.update(updated_at=timezone.now(), **increments)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# WRITE PATH — called from the views, inside their transaction
+# ─────────────────────────────────────────────────────────────────────────────
+
+def spend_snapshot(asset):
+    """What an asset contributes to the rollup — take it before editing the asset."""
+    return asset.vendor_id, month_start(asset.purchase_date), _money(asset.purchase_price)
+
+
+def record_asset_added(asset):
+    vendor_id, month, price = spend_snapshot(asset)
+    _bump(vendor_id, month, spend=price, assets_purchased=1)
+
+
+def record_asset_removed(asset):
+    vendor_id, month, price = spend_snapshot(asset)
+    _bump(vendor_id, month, spend=-price, assets_purchased=-1)
+
+
+def record_asset_changed(before, asset):
+    """Move spend between buckets after a price / purchase date / vendor edit."""
+    after = spend_snapshot(asset)
+    if after == before:
+        return
+    vendor_id, month, price = before
+    _bump(vendor_id, month, spend=-price, assets_purchased=-1)
+    vendor_id, month, price = after
+    _bump(vendor_id, month, spend=price, assets_purchased=1)
+
+
+def record_issue(asset, units, when=None):
+    _bump(asset.vendor_id, when or timezone.now(), units_issued=units)
+
+
+def record_damage_loss(asset, units, when=None):
+    _bump(asset.vendor_id, when or timezone.now(), units_damaged_lost=units)
+
+
+def record_receipts(receipts, received_at=None):
+    """Batch of (vendor_id, units, requested_at) received together → one bump per vendor."""
+    received_at = received_at or timezone.now()
+    per_vendor  = defaultdict(lambda: {"units_received": 0, "receipts": 0, "lead_time_seconds": 0})
+    for vendor_id, units, requested_at in receipts:
+        row = per_vendor[vendor_id]
+        row["units_received"]    += units
+        row["receipts"]          += 1
+        row["lead_time_seconds"] += max(0, int((received_at - requested_at).total_seconds()))
+    for vendor_id, deltas in per_vendor.items():
+        _bump(vendor_id, received_at, **deltas)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REBUILD — backfill / repair (one GROUP BY per source table)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def rebuild_vendor_rollups():
+    """
+    Recompute every row from source tables. Receipt time for historical
+    purchase requests is approximated by their updated_at; purchase-order
+    deliveries use GoodsReceipt.received_at.
+    """
+    totals = {}
+
+    def add(vendor_id, month, **values):
+        if not vendor_id or month is None:
+            return
+        row = totals.setdefault((vendor_id, month_start(month)), dict.fromkeys(ROLLUP_FIELDS, 0))
+        for field, value in values.items():
+            row[field] += value or 0
+
+    for row in (
+        Asset.objects.filter(vendor__isnull=False)
+        .annotate(month=TruncMonth("purchase_date"))
+        .values("vendor_id", "month")
+        .annotate(spend=Sum("purchase_price"), assets=Count("id"))
+    ):
+        add(row["vendor_id"], row["month"], spend=row["spend"], assets_purchased=row["assets"])
+
+    issues = AssetDetails.objects.filter(asset__vendor__isnull=False)
+    # Hand-over targets (transferred_from set) move units already counted — not new issues
+    for row in (
+        issues.filter(transferred_from__isnull=True)
+        .annotate(month=TruncMonth("created_at"))
+        .values("asset__vendor_id", "month")
+        .annotate(units=Sum("quantity_issued"))
+    ):
+        add(row["asset__vendor_id"], row["month"], units_issued=row["units"])
+
+    for row in (
+        issues.filter(status__in=["DAMAGED", "LOST"], return_date__isnull=False)
+        .annotate(month=TruncMonth("return_date"))
+        .values("asset__vendor_id", "month")
+        .annotate(units=Sum("quantity_issued"))
+    ):
+        add(row["asset__vendor_id"], row["month"], units_damaged_lost=row["units"])
+
+    received = PurchaseRequest.objects.filter(status__in=RECEIVED_STATUSES, asset__vendor__isnull=False)
+    for asset_vendor_id, requested_at, received_at, units in received.values_list(
+        "asset__vendor_id", "created_at", "updated_at", "quantity_needed"
+    ).iterator(chunk_size=2000):
+        add(
+            asset_vendor_id, received_at,
+            units_received=units, receipts=1,
+            lead_time_seconds=max(0, int((received_at - requested_at).total_seconds())),
+        )
+
+    # Purchase-order deliveries — one receipt per line, credited like receive_order does
+    po_received = (
+        GoodsReceiptLine.objects
+        .annotate(
+            vendor=Coalesce("receipt__order__vendor_id", "order_line__asset__vendor_id"),
+            requested_at=Coalesce("receipt__order__ordered_at", "receipt__order__created_at"),
+        )
+        .filter(vendor__isnull=False)
+    )
+    for vendor_id, requested_at, received_at, units in po_received.values_list(
+        "vendor", "requested_at", "receipt__received_at", "quantity"
+    ).iterator(chunk_size=2000):
+        add(
+            vendor_id, received_at,
+            units_received=units, receipts=1,
+            lead_time_seconds=max(0, int((received_at - requested_at).total_seconds())),
+        )
+
+    with transaction.atomic():
+        VendorMonthlySpend.objects.all().delete()
+        VendorMonthlySpend.objects.bulk_create(
+            [
+                VendorMonthlySpend(vendor_id=vendor_id, month=month, **values)
+                for (vendor_id, month), values in totals.items()
+            ],
+            batch_size=1000,
+        )
+    return len(totals)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# READ PATH — scorecards served from the rollup
+# ─────────────────────────────────────────────────────────────────────────────
+
+def vendor_scorecards(from_month=None, to_month=None):
+    """One GROUP BY over VendorMonthlySpend → per-vendor scorecard dicts."""
+    rollups = VendorMonthlySpend.objects.all()
+    if from_month:
+        rollups = rollups.filter(month__gte=month_start(from_month))
+    if to_month:
+        rollups = rollups.filter(month__lte=month_start(to_month))
+
+    rows = (
+        rollups
+        .values("vendor_id", "vendor__name")
+        .annotate(**{field: Sum(field) for field in ROLLUP_FIELDS})
+        .filter(~Q(assets_purchased=0) | ~Q(receipts=0) | ~Q(units_issued=0))
+        .order_by("-spend", "vendor__name")
+    )
+
+    scorecards = []
+    for row in rows:
+        scorecards.append({
+            "vendor_id":           row["vendor_id"],
+            "vendor_name":         row["vendor__name"],
+            "total_spend":         float(row["spend"] or 0),
+            "assets_purchased":    row["assets_purchased"],
+            "units_received":      row["units_received"],
+            "units_issued":        row["units_issued"],
+            "units_damaged_lost":  row["units_damaged_lost"],
+            "damage_loss_rate":    round(row["units_damaged_lost"] / row["units_issued"], 4) if row["units_issued"] else 0.0,
+            "avg_lead_time_days":  round(row["lead_time_seconds"] / row["receipts"] / 86400, 2) if row["receipts"] else None,
+        })
+    return scorecards
@@ -0,0 +1,103 @@
+# inventory/search.py
+"""
+Asset search backend.
+
+PostgreSQL : pg_trgm GIN indexes on UPPER(asset_tag / serial_number /
+             model_name / brand) — see migration 0015. Prefix, substring
+             and typo-tolerant (trigram similarity) matches, ranked.
+Other DBs  : portable fallback (SQLite dev) — prefix + substring matches,
+             ranked, no typo tolerance.
+"""
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Greatest, Upper
+
+# Weights — exact > prefix > substring > fuzzy (trigram similarity is 0..1)
+RANK_EXACT     = 4.0
+RANK_PREFIX    = 3.0
+RANK_SUBSTRING = 2.0
+
+# Shorter terms can't use trigrams — prefix matches only ("HP", "LG")
+MIN_TRIGRAM_LENGTH = 3
+
+
+def search_assets(queryset, term):
+    """Filter + rank an Asset queryset by a free-text term (ordered by -search_rank)."""
+    term = (term or "").strip()
+    if not term:
+        return queryset
+
+    if connection.vendor == "postgresql":
+        return _search_postgres(queryset, term)
+    return _search_fallback(queryset, term)
+
+
+def _annotate_upper(queryset):
+    # Same expressions as the functional indexes, so the planner can use them
+    return queryset.annotate(
+        _tag_u    = Upper("asset_tag"),
+        _serial_u = Upper("serial_number"),
+        _model_u  = Upper("model_name"),
+        _brand_u  = Upper("brand"),
+    )
+
+
+def _base_rank(needle):
+    return Case(
+        When(Q(_tag_u=needle) | Q(_serial_u=needle), then=Value(RANK_EXACT)),
+        When(Q(_tag_u__startswith=needle) | Q(_serial_u__startswith=needle), then=Value(RANK_PREFIX)),
+        When(
+            Q(_tag_u__contains=needle)   | Q(_serial_u__contains=needle) |
+            Q(_model_u__contains=needle) | Q(_brand_u__contains=needle),
+            then=Value(RANK_SUBSTRING),
+        ),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _search_postgres(queryset, term):
+    from django.contrib.postgres.search import TrigramSimilarity, TrigramWordSimilarity
+
+    needle = term.upper()
+    qs     = _annotate_upper(queryset)
+
+    if len(needle) < MIN_TRIGRAM_LENGTH:
+        return (
+            qs.filter(
+                Q(_tag_u__startswith=needle)   | Q(_serial_u__startswith=needle) |
+                Q(_brand_u__startswith=needle) | Q(_model_u__startswith=needle)
+            )
+            .annotate(search_rank=_base_rank(needle))
+            .order_by("-search_rank", "id")
+        )
+
+    matches = (
+        Q(_tag_u__contains=needle)   | Q(_serial_u__contains=needle) |
+        Q(_model_u__contains=needle) | Q(_brand_u__contains=needle)  |
+        # typo tolerance — `%` / `<%` operators, served by the same GIN indexes
+        Q(_tag_u__trigram_similar=needle)        | Q(_serial_u__trigram_similar=needle) |
+        Q(_model_u__trigram_word_similar=needle) | Q(_brand_u__trigram_word_similar=needle)
+    )
+
+    rank = Greatest(
+        _base_rank(needle),
+        TrigramSimilarity("_tag_u", needle),
+        TrigramSimilarity("_serial_u", needle),
+        TrigramWordSimilarity(Value(needle), "_model_u"),
+        TrigramWordSimilarity(Value(needle), "_brand_u"),
+        output_field=FloatField(),
+    )
+
+    return qs.filter(matches).annotate(search_rank=rank).order_by("-search_rank", "id")
+
+
+def _search_fallback(queryset, term):
+    needle = term.upper()
+    qs     = _annotate_upper(queryset)
+
+    return (
+        qs.annotate(search_rank=_base_rank(needle))
+        .filter(search_rank__gt=0)
+        .order_by("-search_rank", "id")
+    )
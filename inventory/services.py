@@ -0,0 +1,89 @@
+# inventory/services.py
+import logging
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .forecasting import forecast_order_quantity
+from .models import Asset, PurchaseRequest
+
+logger = logging.getLogger(__name__)
+
+LOW_STOCK_STATUSES = ("LOW_STOCK", "OUT_OF_STOCK")
+
+# Reorder target = minimum_stock_level * multiplier (override in settings)
+REORDER_TARGET_MULTIPLIER = getattr(settings, "INVENTORY_REORDER_TARGET_MULTIPLIER", 2)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REORDER ENGINE — auto purchase requests on low stock
+# ─────────────────────────────────────────────────────────────────────────────
+
+def reorder_quantity(asset):
+    """
+    Quantity needed to bring available stock back up to the reorder target,
+    or up to the forecast target stock (inventory/forecasting.py) when that
+    is higher.
+    """
+    target = max(asset.minimum_stock_level * REORDER_TARGET_MULTIPLIER, asset.minimum_stock_level + 1)
+    return max(1, target - asset.available_quantity, forecast_order_quantity(asset) or 0)
+
+
+def create_auto_purchase_request(asset_id):
+    """
+    Idempotent: creates at most one open AUTO purchase request per asset.
+    Returns the open request (new or existing), or None if stock recovered
+    before the job ran.
+    """
+    with transaction.atomic():
+        # Row lock serializes concurrent jobs for the same asset
+        asset = Asset.objects.select_for_update().filter(id=asset_id).first()
+        if asset is None:
+            return None
+
+        if asset.available_quantity > asset.minimum_stock_level:
+            return None
+
+        existing = PurchaseRequest.objects.filter(
+            asset=asset,
+            request_type="AUTO",
+            status__in=PurchaseRequest.OPEN_STATUSES,
+        ).first()
+        if existing:
+            return existing
+
+        quantity = reorder_quantity(asset)
+        try:
+            with transaction.atomic():
+                return PurchaseRequest.objects.create(
+                    asset           = asset,
+                    request_type    = "AUTO",
+                    triggered_by    = "SYSTEM",
+                    quantity_needed = quantity,
+                    status          = "PENDING_FINANCE",
+                    remarks         = (
+                        f"Auto-generated: available {asset.available_quantity} "
+                        f"<= minimum stock level {asset.minimum_stock_level}"
+                    ),
+                )
+        except IntegrityError:
+            # Lost the race to the partial unique constraint — reuse the winner
+            return PurchaseRequest.objects.filter(
+                asset=asset,
+                request_type="AUTO",
+                status__in=PurchaseRequest.OPEN_STATUSES,
+            ).first()
+
+
+def enqueue_reorder_check(asset_id):
+    """Queue the reorder job once the surrounding transaction commits."""
+    def _enqueue():
+        from .tasks import check_reorder
+        try:
+            check_reorder.delay(asset_id)
+        except Exception:
+            # Broker unavailable — fall back to running the job inline
+            logger.exception("Could not enqueue reorder check for asset %s", asset_id)
+            create_auto_purchase_request(asset_id)
+
+    transaction.on_commit(_enqueue)
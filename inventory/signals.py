@@ -0,0 +1,26 @@
+# inventory/signals.py
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .detail_page import invalidate_detail_page
+from .kiosk import invalidate_scan_cache
+from .models import Asset, AssetDetails
+from .specs import normalize_specs
+
+
+@receiver(pre_save, sender=Asset, dispatch_uid="asset_normalize_specs")
+def asset_normalize_specs(sender, instance, **kwargs):
+    # Shadow spec columns (ram_gb, storage_gb, …) always match the free-form fields
+    normalize_specs(instance)
+
+
+@receiver([post_save, post_delete], sender=Asset, dispatch_uid="asset_detail_page_invalidate")
+def asset_changed(sender, instance, **kwargs):
+    invalidate_detail_page(instance.pk)
+    invalidate_scan_cache([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=AssetDetails, dispatch_uid="asset_issue_changed")
+def asset_issue_changed(sender, instance, **kwargs):
+    # Kiosk payload lists current holders — issue / return changes it
+    invalidate_scan_cache([instance.asset_id])
@@ -0,0 +1,296 @@
+# inventory/specs.py
+"""
+Normalized hardware specs.
+
+The spec fields on Asset are free-form strings ("16GB DDR4", "512 GB NVMe +
+1TB HDD", "11th Gen"). `normalize_specs` parses them into numeric / enum
+shadow columns (ram_gb, storage_gb, storage_kind, cpu_generation,
+ports_normalized — input_ports as a list of canonical port names). The
+user-entered fields are never rewritten. It runs on every Asset save
+(inventory/signals.py) and from `manage.py backfill_asset_specs`.
+
+`facet_counts` computes every facet bucket in ONE aggregate query with
+conditional counts; each facet is counted with all *other* active filters
+applied, so selecting a value never hides its siblings.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Count, Q, TextField
+from django.db.models.functions import Cast
+
+SPEC_FIELDS = ("ram_gb", "storage_gb", "storage_kind", "cpu_generation", "ports_normalized")
+
+_CAPACITY_RE = re.compile(r"(?:(\d+)\s*[x×]\s*)?(\d+(?:\.\d+)?)\s*(TB|GB|MB|T|G)\b", re.I)
+_BARE_NUM_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*$")
+_GEN_RE      = (
+    re.compile(r"(\d{1,2})\s*(?:st|nd|rd|th)?\s*gen", re.I),
+    re.compile(r"gen(?:eration)?\s*(\d{1,2})", re.I),
+    re.compile(r"^\s*(\d{1,2})\s*$"),
+)
+_INTEL_MODEL_RE = re.compile(r"i[3579]\s*-\s*(\d{4,5})", re.I)
+# Trailing version on a port key: "hdmi2.0", "displayport1.4", "usb3.2gen2", "dpv1.2"
+_PORT_VERSION_RE = re.compile(r"v?\d+(?:\.\d+)*(?:gen\d+)?$")
+
+# Most specific first — "NVMe SSD" is NVME, "SSD + HDD" is HYBRID
+STORAGE_KINDS = ("NVME", "SSD", "EMMC", "HDD")
+
+# Canonical port name → aliases (matched case-insensitively, ignoring spaces / dashes)
+PORT_ALIASES = {
+    "HDMI":        ("hdmi", "minihdmi", "microhdmi"),
+    "DISPLAYPORT": ("displayport", "dp", "minidp", "minidisplayport"),
+    "USB-C":       ("usbc", "typec", "usbtypec"),
+    "THUNDERBOLT": ("thunderbolt", "tb3", "tb4", "thunderbolt3", "thunderbolt4"),
+    "USB-A":       ("usb", "usba", "usb2", "usb3", "usb20", "usb30", "usb31", "usb32"),
+    "VGA":         ("vga", "dsub"),
+    "DVI":         ("dvi", "dvid", "dvii"),
+    "ETHERNET":    ("ethernet", "rj45", "lan"),
+    "AUDIO":       ("audio", "3.5mm", "headphone", "headphonejack", "aux"),
+}
+_PORT_LOOKUP = {alias: name for name, aliases in PORT_ALIASES.items() for alias in aliases}
+
+# Facet buckets: label → Q on the shadow columns
+FACET_BUCKETS = {
+    "ram_gb": {
+        "<8":  Q(ram_gb__lt=8),
+        "8":   Q(ram_gb__gte=8,  ram_gb__lt=16),
+        "16":  Q(ram_gb__gte=16, ram_gb__lt=32),
+        "32":  Q(ram_gb__gte=32, ram_gb__lt=64),
+        "64+": Q(ram_gb__gte=64),
+    },
+    "storage_gb": {
+        "<256":  Q(storage_gb__lt=256),
+        "256":   Q(storage_gb__gte=256,  storage_gb__lt=512),
+        "512":   Q(storage_gb__gte=512,  storage_gb__lt=1024),
+        "1TB":   Q(storage_gb__gte=1024, storage_gb__lt=2048),
+        "2TB+":  Q(storage_gb__gte=2048),
+    },
+    "cpu_generation": {
+        "<8":    Q(cpu_generation__lt=8),
+        "8-10":  Q(cpu_generation__gte=8,  cpu_generation__lte=10),
+        "11-12": Q(cpu_generation__gte=11, cpu_generation__lte=12),
+        "13+":   Q(cpu_generation__gte=13),
+    },
+    "screen_size_inch": {
+        "<15":   Q(screen_size_inch__lt=15),
+        "15-20": Q(screen_size_inch__gte=15, screen_size_inch__lt=20),
+        "20-25": Q(screen_size_inch__gte=20, screen_size_inch__lt=25),
+        "25-30": Q(screen_size_inch__gte=25, screen_size_inch__lt=30),
+        "30+":   Q(screen_size_inch__gte=30),
+    },
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PARSERS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _to_gb(amount, unit):
+    unit = unit.upper()[0]
+    if unit == "T":
+        return amount * 1024
+    if unit == "M":
+        return amount / 1024
+    return amount
+
+
+def parse_capacity_gb(value, bare_unit="GB"):
+    """'16GB' → 16, '2x8 GB' → 16, '512GB SSD + 1TB HDD' → 1536, '16' → 16. None if unparseable."""
+    if value in (None, ""):
+        return None
+    text = str(value)
+
+    total = 0
+    for count, amount, unit in _CAPACITY_RE.findall(text):
+        total += int(count or 1) * _to_gb(float(amount), unit)
+    if not total:
+        bare = _BARE_NUM_RE.match(text)
+        if not bare:
+            return None
+        total = _to_gb(float(bare.group(1)), bare_unit)
+    return int(round(total)) or None
+
+
+def parse_storage_kind(*values):
+    text  = " ".join(str(v) for v in values if v).upper().replace("-", "").replace(" ", "")
+    kinds = [kind for kind in STORAGE_KINDS if kind in text]
+    if not kinds:
+        return None
+    if "HDD" in kinds and len(kinds) > 1:
+        return "HYBRID"
+    return kinds[0]
+
+
+def parse_cpu_generation(generation, processor=None):
+    """'11th Gen' / 'Gen 12' / '13' → int; falls back to the Intel model number in `processor`."""
+    for pattern in _GEN_RE:
+        match = pattern.search(str(generation or ""))
+        if match:
+            return int(match.group(1))
+    match = _INTEL_MODEL_RE.search(str(processor or ""))
+    if match:
+        digits = match.group(1)
+        return int(digits[:2]) if len(digits) == 5 else int(digits[0])
+    return None
+
+
+def canonical_port(name):
+    """'HDMI 2.0' → HDMI, 'USB 3.0' → USB-A, 'DisplayPort 1.4' → DISPLAYPORT; unknown names upper-cased."""
+    key = re.sub(r"[\s_\-]", "", str(name).lower())
+    if key in _PORT_LOOKUP:
+        return _PORT_LOOKUP[key]
+    return _PORT_LOOKUP.get(_PORT_VERSION_RE.sub("", key), str(name).strip().upper())
+
+
+def parse_ports(value):
+    """JSON list / dict / comma-separated string → de-duplicated list of canonical port names (None if empty)."""
+    if value in (None, "", [], {}):
+        return None
+    if isinstance(value, dict):
+        items = [k for k, v in value.items() if v]
+    elif isinstance(value, (list, tuple)):
+        items = value
+    else:
+        items = re.split(r"[,;/|]", str(value))
+
+    ports = []
+    for item in items:
+        if not str(item).strip():
+            continue
+        port = canonical_port(item)
+        if port not in ports:
+            ports.append(port)
+    return ports
+
+
+def normalize_specs(asset):
+    """Fill the shadow columns from the free-form spec fields (does not save)."""
+    asset.ram_gb           = parse_capacity_gb(asset.ram_size)
+    asset.storage_gb       = parse_capacity_gb(asset.storage_capacity)
+    asset.storage_kind     = parse_storage_kind(asset.storage_type, asset.storage_capacity)
+    asset.cpu_generation   = parse_cpu_generation(asset.processor_generation, asset.processor)
+    asset.ports_normalized = parse_ports(asset.input_ports)
+    return asset
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FILTERS + FACETS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def port_q(port):
+    port = canonical_port(port)
+    if connection.vendor == "postgresql":
+        # jsonb @> — served by the GIN index on ports_normalized
+        return Q(ports_normalized__contains=[port])
+    return Q(_ports_text__contains=f'"{port}"')
+
+
+def with_port_text(queryset):
+    """Portable fallback for port filters (JSON containment is Postgres-only)."""
+    if connection.vendor == "postgresql":
+        return queryset
+    return queryset.annotate(_ports_text=Cast("ports_normalized", TextField()))
+
+
+def spec_filters(params):
+    """
+    Query params → {facet: Q}. Keys are facet names so facet_counts() can
+    drop a facet's own filter when counting its buckets.
+    """
+    filters = {}
+
+    def _int(name):
+        try:
+            return int(params.get(name)) if params.get(name) not in (None, "") else None
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be an integer")
+
+    if params.get("category"):
+        filters["category"] = Q(category__iexact=params["category"])
+
+    ram_q = Q()
+    if _int("min_ram") is not None:
+        ram_q &= Q(ram_gb__gte=_int("min_ram"))
+    if _int("max_ram") is not None:
+        ram_q &= Q(ram_gb__lte=_int("max_ram"))
+    if ram_q:
+        filters["ram_gb"] = ram_q
+
+    storage_q = Q()
+    if _int("min_storage") is not None:
+        storage_q &= Q(storage_gb__gte=_int("min_storage"))
+    if _int("max_storage") is not None:
+        storage_q &= Q(storage_gb__lte=_int("max_storage"))
+    if storage_q:
+        filters["storage_gb"] = storage_q
+
+    kinds = [k.upper() for k in params.getlist("storage_kind") if k]
+    if kinds:
+        filters["storage_kind"] = Q(storage_kind__in=kinds)
+
+    if _int("min_cpu_gen") is not None:
+        filters["cpu_generation"] = Q(cpu_generation__gte=_int("min_cpu_gen"))
+
+    screen_q = Q()
+    for bound, lookup in (("min_screen", "gte"), ("max_screen", "lte")):
+        if params.get(bound):
+            try:
+                screen_q &= Q(**{f"screen_size_inch__{lookup}": float(params[bound])})
+            except ValueError:
+                raise ValueError(f"{bound} must be a number")
+    if screen_q:
+        filters["screen_size_inch"] = screen_q
+
+    ports = [p for p in params.getlist("port") if p]
+    if ports:
+        port_filter = Q()
+        for port in ports:
+            port_filter &= port_q(port)  # all selected ports must be present
+        filters["ports"] = port_filter
+
+    return filters
+
+
+def apply_filters(queryset, filters, skip=None):
+    for facet, q in filters.items():
+        if facet != skip:
+            queryset = queryset.filter(q)
+    return queryset
+
+
+def _combined(filters, skip=None):
+    combined = Q()
+    for facet, q in filters.items():
+        if facet != skip:
+            combined &= q
+    return combined
+
+
+def facet_counts(queryset, filters):
+    """
+    Every facet bucket as a conditional Count in a single aggregate query.
+    `queryset` is the base set (search applied, spec filters NOT applied).
+    """
+    aggregates = {}
+    labels     = {}
+
+    def add(facet, label, bucket_q):
+        alias = f"f{len(aggregates)}"
+        aggregates[alias] = Count("id", filter=_combined(filters, skip=facet) & bucket_q)
+        labels[alias]     = (facet, label)
+
+    for value, _ in queryset.model.CATEGORY_CHOICES:
+        add("category", value, Q(category=value))
+    for facet, buckets in FACET_BUCKETS.items():
+        for label, bucket_q in buckets.items():
+            add(facet, label, bucket_q)
+    for kind in STORAGE_KINDS + ("HYBRID",):
+        add("storage_kind", kind, Q(storage_kind=kind))
+    for port in PORT_ALIASES:
+        add("ports", port, port_q(port))
+
+    facets = {facet: {} for facet, _ in labels.values()}
+    for alias, count in queryset.aggregate(**aggregates).items():
+        facet, label = labels[alias]
+        facets[facet][label] = count
+    return facets
@@ -0,0 +1,376 @@
+# inventory/stocktake.py
+"""
+Offline stock-take sessions.
+
+Handheld scanners upload batches of scans as JSON lines (gzip-compressed or
+plain), one object per line:
+
+    {"code": "LAP-000123", "location_id": 7, "condition": "FAIR", "scanned_at": "…", "device": "HH-2"}
+
+A bare JSON string is accepted as {"code": …}. Lines are parsed as a stream
+and bulk-loaded into the StockTakeScan staging table; codes are then
+resolved to assets with one set-based UPDATE per identifier column
+(asset_tag, serial_number, barcode_qr_code). QR payload URLs are resolved
+while parsing.
+
+Discrepancies are joins between the staging table and the books:
+
+  missing      on-hand stock (AssetStock) in the session's subtree that no
+               scan saw
+  misplaced    seen at a location, but stock is recorded elsewhere
+  unexpected   seen, but no on-hand stock is recorded anywhere (e.g. still
+               issued to someone)
+  unknown      codes that match no asset
+  condition    scanned condition differs from Asset.condition
+
+Corrections reuse inventory/bulk_edit.py, so they are audited (AssetChange).
+Location corrections also fix the books through locations.transfer_stock
+(one StockTransfer per move): misplaced stock is moved to where it was seen,
+units recorded inside the session's area first, and unexpected assets get
+unplaced stock placed there. An asset with nothing to move or place (e.g.
+still issued) is counted as unresolved and stays in the report.
+"""
+import gzip
+import io
+import json
+import zlib
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, Max, OuterRef, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .bulk_edit import bulk_edit, clean_changes
+from .kiosk import _qr_asset_id
+from .locations import placed_quantity, stocked_at, transfer_stock
+from .models import Asset, AssetDetails, AssetStock, Location, StockTakeScan
+
+MAX_SCANS_PER_UPLOAD = 50000
+MAX_LINE_BYTES       = 4096
+INSERT_BATCH_SIZE    = 1000
+# Rows listed per discrepancy kind (all of them are counted)
+MAX_LISTED           = 1000
+
+CODE_COLUMNS = ("asset_tag", "serial_number", "barcode_qr_code")
+CONDITIONS   = dict(Asset.CONDITION_CHOICES)
+
+
+def _lines(body):
+    """Readable JSONL stream from a gzip-compressed (magic bytes) or plain body."""
+    if body[:2] == b"\x1f\x8b":
+        return gzip.GzipFile(fileobj=io.BytesIO(body))
+    return io.BytesIO(body)
+
+
+def _condition(value):
+    value = str(value or "").upper()
+    return value if value in CONDITIONS else ""
+
+
+def parse_scans(body):
+    """Yield (line number, row dict). ValueError on malformed input."""
+    stream = _lines(body)
+    number = 0
+    try:
+        while True:
+            # Bounded reads — a compressed upload cannot inflate one giant line into memory
+            raw = stream.readline(MAX_LINE_BYTES + 1)
+            if not raw:
+                break
+            number += 1
+            if number > MAX_SCANS_PER_UPLOAD:
+                raise ValueError(f"At most {MAX_SCANS_PER_UPLOAD} scans per upload")
+            if len(raw) > MAX_LINE_BYTES:
+                raise ValueError(f"line {number}: too long")
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                row = json.loads(raw)
+            except ValueError:
+                raise ValueError(f"line {number}: invalid JSON")
+            if isinstance(row, str):
+                row = {"code": row}
+            if not isinstance(row, dict) or not str(row.get("code") or "").strip():
+                raise ValueError(f"line {number}: code is required")
+            yield number, row
+    except (OSError, EOFError, zlib.error):
+        raise ValueError("Could not decompress the upload")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOAD
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _resolve_codes(session):
+    """Fill StockTakeScan.asset — one UPDATE per identifier column, unresolved rows only."""
+    for column in CODE_COLUMNS:
+        match = Asset.objects.filter(**{column: OuterRef("code")}).order_by("id").values("id")[:1]
+        (
+            StockTakeScan.objects
+            .filter(session=session, asset__isnull=True)
+            .filter(Exists(match))
+            .update(asset_id=Subquery(match))
+        )
+
+
+@transaction.atomic
+def load_scans(session, body, default_location=None, device=""):
+    """Stage one uploaded batch. Returns {batch, loaded, unresolved}."""
+    rows = list(parse_scans(body))
+    if not rows:
+        raise ValueError("The upload contains no scans")
+
+    try:
+        location_ids = {int(row["location_id"]) for _, row in rows if row.get("location_id")}
+    except (TypeError, ValueError):
+        raise ValueError("location_id must be an integer")
+    locations = Location.objects.in_bulk(location_ids)
+    if len(locations) != len(location_ids):
+        raise ValueError(f"Unknown location_id(s): {sorted(location_ids - set(locations))}")
+
+    # QR payload URLs carry the asset id — keep the ones that still exist
+    qr_ids   = {number: _qr_asset_id(str(row["code"]).strip()) for number, row in rows}
+    qr_known = set(Asset.objects.filter(id__in={i for i in qr_ids.values() if i}).values_list("id", flat=True))
+
+    batch = (session.scans.aggregate(last=Max("batch"))["last"] or 0) + 1
+    StockTakeScan.objects.bulk_create(
+        (
+            StockTakeScan(
+                session    = session,
+                code       = str(row["code"]).strip()[:255],
+                asset_id   = qr_ids[number] if qr_ids[number] in qr_known else None,
+                location   = locations[int(row["location_id"])] if row.get("location_id") else default_location,
+                condition  = _condition(row.get("condition")),
+                device     = str(row.get("device") or device)[:100],
+                batch      = batch,
+                scanned_at = parse_datetime(str(row["scanned_at"])) if row.get("scanned_at") else None,
+            )
+            for number, row in rows
+        ),
+        batch_size=INSERT_BATCH_SIZE,
+    )
+    _resolve_codes(session)
+
+    return {
+        "batch":      batch,
+        "loaded":     len(rows),
+        "unresolved": session.scans.filter(batch=batch, asset__isnull=True).count(),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DISCREPANCIES
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _on_hand():
+    return AssetStock.objects.filter(asset_id=OuterRef("asset_id"), quantity__gt=0)
+
+
+def _querysets(session):
+    scans = StockTakeScan.objects.filter(session=session)
+    seen  = scans.filter(asset__isnull=False)
+
+    located   = seen.filter(location__isnull=False)
+    # Stock recorded at the scanned location or anywhere below it
+    placed_ok = located.filter(Exists(_on_hand().filter(location__path__startswith=OuterRef("location__path"))))
+
+    if session.location_id:
+        expected = Asset.objects.filter(stocked_at(session.location))
+    else:
+        expected = Asset.objects.filter(Exists(AssetStock.objects.filter(asset_id=OuterRef("pk"), quantity__gt=0)))
+
+    return {
+        "missing":    expected.exclude(id__in=seen.values("asset_id")),
+        "misplaced":  (
+            located.filter(Exists(_on_hand()))
+            .exclude(asset_id__in=placed_ok.values("asset_id"))
+        ),
+        "unexpected": seen.filter(~Exists(_on_hand())),
+        "unknown":    scans.filter(asset__isnull=True),
+        "condition":  seen.exclude(condition="").exclude(condition=F("asset__condition")),
+    }
+
+
+def _latest_per_asset(scans, *fields):
+    """{asset_id: row} keeping each asset's latest scan."""
+    latest = {}
+    for row in scans.order_by("scanned_at", "id").values("asset_id", *fields):
+        latest[row["asset_id"]] = row
+    return latest
+
+
+def discrepancies(session, limit=MAX_LISTED):
+    qs = _querysets(session)
+
+    missing = list(
+        qs["missing"].order_by("asset_tag")
+        .values("id", "asset_tag", "category", "brand", "model_name", "current_location")[:limit]
+    )
+
+    misplaced_rows = _latest_per_asset(qs["misplaced"], "asset__asset_tag", "location_id", "location__code")
+    misplaced_ids  = sorted(misplaced_rows)[:limit]
+    recorded       = {}
+    for asset_id, code, quantity in (
+        AssetStock.objects.filter(asset_id__in=misplaced_ids, quantity__gt=0)
+        .values_list("asset_id", "location__code", "quantity")
+    ):
+        recorded.setdefault(asset_id, []).append({"location": code, "quantity": quantity})
+
+    unexpected_rows = _latest_per_asset(qs["unexpected"], "asset__asset_tag", "location__code")
+    unexpected_ids  = sorted(unexpected_rows)[:limit]
+    holders         = {}
+    for asset_id, name in (
+        AssetDetails.objects.filter(asset_id__in=unexpected_ids, status__in=AssetDetails.OPEN_STATUSES)
+        .values_list("asset_id", "user__name")
+    ):
+        holders.setdefault(asset_id, []).append(name)
+
+    condition_rows = _latest_per_asset(qs["condition"], "asset__asset_tag", "asset__condition", "condition")
+
+    unknown = list(
+        qs["unknown"].values("code").annotate(scans=Count("id")).order_by("code")[:limit]
+    )
+
+    return {
+        "summary": {
+            "scans":      session.scans.count(),
+            "missing":    qs["missing"].count(),
+            "misplaced":  len(misplaced_rows),
+            "unexpected": len(unexpected_rows),
+            "unknown":    qs["unknown"].values("code").distinct().count(),
+            "condition":  len(condition_rows),
+        },
+        "missing": missing,
+        "misplaced": [
+            {
+                "asset_id":  asset_id,
+                "asset_tag": misplaced_rows[asset_id]["asset__asset_tag"],
+                "seen_at":   misplaced_rows[asset_id]["location__code"],
+                "recorded":  recorded.get(asset_id, []),
+            }
+            for asset_id in misplaced_ids
+        ],
+        "unexpected": [
+            {
+                "asset_id":  asset_id,
+                "asset_tag": unexpected_rows[asset_id]["asset__asset_tag"],
+                "seen_at":   unexpected_rows[asset_id]["location__code"],
+                "issued_to": holders.get(asset_id, []),
+            }
+            for asset_id in unexpected_ids
+        ],
+        "unknown_codes": unknown,
+        "condition_changes": [
+            {
+                "asset_id":  asset_id,
+                "asset_tag": row["asset__asset_tag"],
+                "recorded":  row["asset__condition"],
+                "scanned":   row["condition"],
+            }
+            for asset_id, row in sorted(condition_rows.items())[:limit]
+        ],
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CORRECTIONS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _grouped(latest, key):
+    groups = {}
+    for asset_id, row in latest.items():
+        groups.setdefault(row[key], []).append(asset_id)
+    return groups
+
+
+def _seen_units(session, latest):
+    """{asset_id: scans of the asset at its latest scan location} — the units seen there."""
+    counts = {
+        (asset_id, location_id): n
+        for asset_id, location_id, n in (
+            StockTakeScan.objects.filter(session=session, asset_id__in=latest)
+            .values("asset_id", "location_id").annotate(n=Count("id"))
+            .values_list("asset_id", "location_id", "n").order_by()
+        )
+    }
+    return {asset_id: counts.get((asset_id, row["location_id"]), 1) for asset_id, row in latest.items()}
+
+
+def _move_seen_stock(session, asset_id, location, units, user, remarks):
+    """Transfer up to `units` recorded units to `location`, session area first. Returns transfers made."""
+    rows = sorted(
+        AssetStock.objects.filter(asset_id=asset_id, quantity__gt=0).select_related("location"),
+        key=lambda row: (
+            not (session.location_id is None or row.location.path.startswith(session.location.path)),
+            -row.quantity,
+            row.location_id,
+        ),
+    )
+    moved = 0
+    for row in rows:
+        if not units:
+            break
+        quantity = min(row.quantity, units)
+        transfer_stock(asset_id, quantity, from_location=row.location, to_location=location, user=user, remarks=remarks)
+        units -= quantity
+        moved += 1
+    return moved
+
+
+@transaction.atomic
+def apply_corrections(session, user=None, locations=True, conditions=True):
+    """
+    Write what the audit found. For misplaced / unexpected assets (at their
+    latest scan location): move or place the seen units there and set
+    current_location. Condition where it differs. Descriptive fields are one
+    audited bulk edit per distinct value. Returns {locations, transfers,
+    unresolved, conditions}.
+    """
+    qs      = _querysets(session)
+    remarks = f"Stock take #{session.id}: {session.name}"
+    applied = {"locations": 0, "transfers": 0, "unresolved": 0, "conditions": 0}
+
+    if locations:
+        # Evaluated before any stock moves — the querysets read AssetStock
+        misplaced  = _latest_per_asset(qs["misplaced"], "location_id", "location__name")
+        unexpected = _latest_per_asset(qs["unexpected"].filter(location__isnull=False), "location_id", "location__name")
+        latest     = {**misplaced, **unexpected}
+
+        for name, asset_ids in _grouped(latest, "location__name").items():
+            result = bulk_edit(Asset.objects.filter(id__in=asset_ids), clean_changes({"current_location": name}), user, remarks)
+            applied["locations"] += result["changed"]
+
+        units   = _seen_units(session, latest)
+        targets = Location.objects.in_bulk({row["location_id"] for row in latest.values()})
+        for asset_id, row in sorted(latest.items()):
+            location = targets[row["location_id"]]
+            if not location.is_active:
+                applied["unresolved"] += 1
+            elif asset_id in misplaced:
+                applied["transfers"] += _move_seen_stock(session, asset_id, location, units[asset_id], user, remarks)
+            else:
+                available = Asset.objects.values_list("available_quantity", flat=True).get(id=asset_id)
+                quantity  = min(units[asset_id], available - placed_quantity(asset_id))
+                if quantity > 0:
+                    transfer_stock(asset_id, quantity, to_location=location, user=user, remarks=remarks)
+                    applied["transfers"] += 1
+                else:
+                    applied["unresolved"] += 1
+
+    if conditions:
+        latest = _latest_per_asset(qs["condition"], "condition")
+        for condition, asset_ids in _grouped(latest, "condition").items():
+            result = bulk_edit(Asset.objects.filter(id__in=asset_ids), clean_changes({"condition": condition}), user, remarks)
+            applied["conditions"] += result["changed"]
+
+    session.status = "APPLIED"
+    session.save(update_fields=["status"])
+    return applied
+
+
+def close_session(session):
+    session.status    = "CLOSED"
+    session.closed_at = timezone.now()
+    session.save(update_fields=["status", "closed_at"])
+    return session
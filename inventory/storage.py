@@ -0,0 +1,105 @@
+# inventory/storage.py
+"""
+Content-addressed media storage.
+
+Uploads are hashed (SHA-256) while being streamed to disk and stored once
+under MEDIA_ROOT/blobs/<aa>/<sha256><ext>. Re-uploading the same invoice,
+attachment or photo reuses the existing blob, so disk and backups only grow
+with unique content. The hash is part of the name, so it doubles as a strong
+ETag and the blob never changes (safe to cache forever).
+
+Blobs can be shared by several rows — never delete one directly; the orphan
+media collector reclaims blobs nothing references any more.
+"""
+import hashlib
+import os
+import re
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.urls import reverse
+from django.utils.deconstruct import deconstructible
+
+BLOB_ROOT = "blobs"
+TMP_DIR   = ".upload_tmp"
+
+# (app_label, model, field) of every FileField stored content-addressed
+CONTENT_ADDRESSED_FIELDS = (
+    ("inventory", "Asset",           "attachment"),
+    ("inventory", "Asset",           "warranty_documents"),
+    ("inventory", "PurchaseRequest", "invoice_attachment"),
+    ("inventory", "GoodsReceipt",    "invoice_attachment"),
+    ("users",     "User",            "profile_image"),
+)
+
+BLOB_NAME_RE = re.compile(rf"^{BLOB_ROOT}/[0-9a-f]{{2}}/(?P<hash>[0-9a-f]{{64}})(\.[A-Za-z0-9]+)?$")
+
+
+def blob_name_for(digest, ext=""):
+    return f"{BLOB_ROOT}/{digest[:2]}/{digest}{ext}"
+
+
+def content_hash(name):
+    """SHA-256 hex of a content-addressed name, or None for legacy names."""
+    match = BLOB_NAME_RE.match(name or "")
+    return match.group("hash") if match else None
+
+
+def strong_etag(name):
+    digest = content_hash(name)
+    return f'"{digest}"' if digest else None
+
+
+def protected_url(file_field):
+    """URL of a stored file through the authenticated media view (invoices, receipts)."""
+    if not file_field:
+        return None
+    return reverse("protected_media", args=[file_field.name])
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is decided by _save() from the content hash
+        return name
+
+    def _save(self, name, content):
+        ext = os.path.splitext(name)[1].lower()
+
+        tmp_dir = self.path(TMP_DIR)
+        os.makedirs(tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(tmp_dir, f"{uuid.uuid4().hex}.part")
+
+        digest = hashlib.sha256()
+        # os.open with 0o666 → same umask-based permissions FileSystemStorage uses
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    out.write(chunk)
+
+            name      = blob_name_for(digest.hexdigest(), ext)
+            full_path = self.path(name)
+
+            if os.path.exists(full_path):
+                # ✅ Already stored — drop the duplicate
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(tmp_path, self.file_permissions_mode)
+                # Atomic — concurrent identical uploads just replace equal bytes
+                os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return name
+
+
+content_addressed_storage = ContentAddressedStorage()
@@ -0,0 +1,121 @@
+# inventory/tags.py
+"""
+Server-side asset tag allocation.
+
+Tags look like "<prefix>-<number>" (LAP-000123), with one prefix per category
+(settings.ASSET_TAG_PREFIXES). Numbers are unique but gap-tolerant: a
+rolled-back create simply burns its number. Nothing reads MAX(asset_tag).
+
+PostgreSQL : one native sequence per prefix (inventory_tag_<prefix>_seq).
+             nextval() is non-transactional and takes no row lock, so
+             concurrent creators never wait on each other; a block of n
+             numbers is one SELECT nextval(…) FROM generate_series(1, n).
+Other DBs  : a TagCounter row per prefix; a block is claimed with one
+             UPDATE next_value = next_value + n (SQLite serialises writes
+             anyway).
+
+The sequence / counter is created on first use, starting past the highest
+existing "<prefix>-<digits>" tag, so client-invented tags are not re-issued.
+"""
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import F
+
+from .models import Asset, TagCounter
+
+TAG_PREFIXES   = getattr(settings, "ASSET_TAG_PREFIXES", {})
+DEFAULT_PREFIX = TAG_PREFIXES.get("OTHER", "AST")
+TAG_DIGITS     = getattr(settings, "ASSET_TAG_DIGITS", 6)
+
+# Largest block one call may claim (bulk imports ask for blocks, not one tag per row)
+MAX_BLOCK = 1000
+
+_PREFIX_RE = re.compile(r"^[A-Z0-9]{1,10}$")
+
+
+def prefix_for(category):
+    prefix = TAG_PREFIXES.get((category or "").upper(), DEFAULT_PREFIX)
+    if not _PREFIX_RE.match(prefix):
+        # Also goes into a sequence name — keep it to plain characters
+        raise ImproperlyConfigured(f"Asset tag prefix {prefix!r} must be 1-10 characters of A-Z / 0-9")
+    return prefix
+
+
+def format_tag(prefix, number):
+    return f"{prefix}-{number:0{TAG_DIGITS}d}"
+
+
+def _highest_existing(prefix):
+    """Largest number already used as "<prefix>-<digits>" (0 if none). Runs once per prefix."""
+    pattern = re.compile(rf"^{re.escape(prefix)}-(\d+)$")
+    highest = 0
+    for tag in Asset.objects.filter(asset_tag__startswith=f"{prefix}-").values_list("asset_tag", flat=True).iterator():
+        match = pattern.match(tag)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BACKENDS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _sequence_name(prefix):
+    return f"inventory_tag_{prefix.lower()}_seq"
+
+
+def _allocate_postgres(prefix, count):
+    name = _sequence_name(prefix)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [name])
+        if cursor.fetchone()[0] is None:
+            start = _highest_existing(prefix) + 1
+            try:
+                with transaction.atomic():
+                    cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {name} START WITH {start}")
+            except DatabaseError:
+                # Created concurrently by another request — use it
+                pass
+        cursor.execute(f"SELECT nextval('{name}') FROM generate_series(1, %s)", [count])
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def _allocate_counter(prefix, count):
+    with transaction.atomic():
+        if not TagCounter.objects.filter(prefix=prefix).update(next_value=F("next_value") + count):
+            first = _highest_existing(prefix) + 1
+            try:
+                with transaction.atomic():
+                    TagCounter.objects.create(prefix=prefix, next_value=first + count)
+                return list(range(first, first + count))
+            except IntegrityError:
+                # Created concurrently — claim from it like everyone else
+                TagCounter.objects.filter(prefix=prefix).update(next_value=F("next_value") + count)
+
+        # The UPDATE holds the row lock — nobody else can move next_value before this read
+        end = TagCounter.objects.values_list("next_value", flat=True).get(prefix=prefix)
+        return list(range(end - count, end))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PUBLIC
+# ─────────────────────────────────────────────────────────────────────────────
+
+def allocate_tags(category, count=1):
+    """`count` unused asset tags for `category`, in ascending order."""
+    if not 0 < count <= MAX_BLOCK:
+        raise ValueError(f"count must be between 1 and {MAX_BLOCK}")
+
+    prefix = prefix_for(category)
+    if connection.vendor == "postgresql":
+        numbers = _allocate_postgres(prefix, count)
+    else:
+        numbers = _allocate_counter(prefix, count)
+    return [format_tag(prefix, number) for number in numbers]
+
+
+def allocate_tag(category):
+    return allocate_tags(category, 1)[0]
@@ -0,0 +1,77 @@
+# inventory/tasks.py
+from celery import shared_task
+from django.conf import settings
+
+from .forecasting import forecast_stock
+from .images import build_derivatives
+from .media_gc import collect_orphan_media
+from .reconcile import reconcile_stock
+from .reservations import sweep_expired_reservations
+from .services import create_auto_purchase_request
+from .warranty import refresh_warranty_statuses, send_expiry_digest, upcoming_expiry_digest
+
+
+@shared_task
+def check_reorder(asset_id):
+    pr = create_auto_purchase_request(asset_id)
+    if pr is None:
+        return f"Asset {asset_id}: stock above minimum, no purchase request"
+    return f"Asset {asset_id}: open AUTO purchase request PR-{pr.id}"
+
+
+@shared_task
+def generate_image_derivatives(source_names):
+    built = []
+    for name in source_names:
+        built.extend(build_derivatives(name))
+    return f"Built {len(built)} image derivative(s)"
+
+
+@shared_task
+def collect_orphan_media_task(dry_run=False, quarantine=True):
+    result = collect_orphan_media(dry_run=dry_run, quarantine=quarantine)
+    return (
+        f"{result['action']}: {result['orphan_files']} orphan file(s), "
+        f"{result['orphan_bytes']} bytes, {result['removed_files']} removed"
+    )
+
+
+@shared_task
+def refresh_warranty_status(digest=True):
+    updated = refresh_warranty_statuses()
+    if not digest:
+        return f"Warranty status updated on {updated} asset(s)"
+
+    rows = upcoming_expiry_digest()
+    sent = send_expiry_digest(rows)
+    return (
+        f"Warranty status updated on {updated} asset(s); "
+        f"digest: {sum(r['assets'] for r in rows)} upcoming expiries across {len(rows)} vendor(s)"
+        f"{' (emailed)' if sent else ''}"
+    )
+
+
+@shared_task
+def reconcile_stock_task(repair=None):
+    if repair is None:
+        repair = getattr(settings, "STOCK_RECONCILE_REPAIR", False)
+    result = reconcile_stock(repair=repair)
+    return (
+        f"Stock reconciliation: {result['mismatched']} asset(s) out of sync"
+        f"{', repaired' if repair and result['mismatched'] else ''}"
+    )
+
+
+@shared_task
+def expire_stock_reservations():
+    expired = sweep_expired_reservations()
+    return f"Released {expired} expired stock reservation(s)"
+
+
+@shared_task
+def forecast_stock_depletion(method=None):
+    result = forecast_stock(method=method)
+    return (
+        f"Stock forecast ({result['method']}): {result['assets']} asset(s), "
+        f"{result['depleting']} depleting, {result['reorder_now']} to reorder now"
+    )
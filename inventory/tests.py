@@ -1,3 +1,432 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from datetime import date
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.http import Http404
+from django.test import Client, RequestFactory, TestCase, override_settings
+
+from users.jwt_utils import generate_token
+from users.models import User
+
+from .handover import transfer_issue_records
+from .locations import create_location, placed_quantity, transfer_stock
+from .models import (
+    Asset,
+    AssetDetails,
+    AssetStock,
+    PurchaseRequest,
+    PurchaseRequestTransition,
+    StockTakeSession,
+    StockTransfer,
+    Vendor,
+    VendorMonthlySpend,
+)
+from .purchase_orders import create_order, receive_order
+from .purchasing import apply_transitions
+from .reconcile import reconcile_stock
+from .rollups import rebuild_vendor_rollups
+from .reservations import confirm_reservation, release_reservation, reserve_stock
+from .search import search_assets
+from .stocktake import apply_corrections, discrepancies, load_scans
+from .tags import allocate_tag, allocate_tags, prefix_for
+from .views_media import serve_media
+
+
+def make_asset(tag, quantity=10, **fields):
+    fields.setdefault("brand", "Dell")
+    fields.setdefault("model_name", "Latitude 5440")
+    fields.setdefault("category", "LAPTOP")
+    return Asset.objects.create(
+        asset_tag          = tag,
+        total_quantity     = quantity,
+        available_quantity = quantity,
+        purchase_date      = date(2025, 1, 1),
+        purchase_price     = 100,
+        **fields,
+    )
+
+
+class ApiTestCase(TestCase):
+    """Admin JWT client + one employee to issue to."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin    = User.objects.create(email="admin@example.com", name="Admin", role="ADMIN")
+        cls.employee = User.objects.create(email="emp@example.com", name="Employee", role="EMPLOYEE")
+
+    def setUp(self):
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {generate_token(self.admin)}"
+
+    def post_json(self, url, data):
+        return self.client.post(url, json.dumps(data), content_type="application/json")
+
+    def issue(self, asset, quantity, **extra):
+        return self.post_json("/api/inventory/issue/", {
+            "asset_id":        asset.id,
+            "employee_id":     self.employee.id,
+            "quantity_issued": quantity,
+            "issue_date":      "2025-02-01T09:00:00Z",
+            "location":        "Desk",
+            "issue_reason":    "New joiner",
+            **extra,
+        })
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SEARCH
+# ─────────────────────────────────────────────────────────────────────────────
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hp   = make_asset("LAP-0001", brand="HP", model_name="EliteBook 840")
+        cls.lg   = make_asset("MON-0001", brand="LG", model_name="UltraFine", category="MONITOR")
+        cls.dell = make_asset("LAP-0002", serial_number="HPX-991")
+
+    def search(self, term):
+        return list(search_assets(Asset.objects.all(), term).values_list("id", flat=True))
+
+    def test_short_term_matches_brand(self):
+        self.assertIn(self.hp.id, self.search("HP"))
+        self.assertEqual(self.search("lg "), [self.lg.id])
+
+    def test_short_term_matches_tag_prefix(self):
+        self.assertEqual(set(self.search("LA")), {self.hp.id, self.dell.id})
+
+    def test_exact_serial_ranks_first(self):
+        self.assertEqual(self.search("HPX-991")[0], self.dell.id)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MEDIA — invoices only through the authenticated route
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ProtectedInvoiceTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.asset   = make_asset("LAP-0001")
+        self.request = PurchaseRequest.objects.create(
+            asset=self.asset, request_type="MANUAL", triggered_by="ADMIN", quantity_needed=2,
+        )
+        self.request.invoice_attachment.save("invoice.pdf", ContentFile(b"%PDF-1.4 invoice"), save=True)
+
+    def invoice_url(self):
+        response = self.client.get("/api/inventory/purchase-requests/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["purchase_requests"][0]["invoice_attachment"]
+
+    def test_invoice_url_resolves_with_auth(self):
+        url = self.invoice_url()
+        self.assertTrue(url.startswith("/api/inventory/media/"))
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.4 invoice")
+
+    def test_invoice_url_requires_auth(self):
+        self.assertEqual(Client().get(self.invoice_url()).status_code, 401)
+
+    def test_invoice_blob_not_public(self):
+        # /media/ is only routed in DEBUG — call the view directly
+        name = self.request.invoice_attachment.name
+        with self.assertRaises(Http404):
+            serve_media(RequestFactory().get(f"/media/{name}"), name)
+
+    def test_blob_shared_with_attachment_is_public(self):
+        self.asset.attachment.save("photo.pdf", ContentFile(b"%PDF-1.4 invoice"), save=True)
+        name = self.asset.attachment.name
+        self.assertEqual(name, self.request.invoice_attachment.name)
+        self.assertEqual(serve_media(RequestFactory().get(f"/media/{name}"), name).status_code, 200)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PURCHASE-REQUEST STATE MACHINE
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ApplyTransitionsTests(TestCase):
+
+    def setUp(self):
+        self.asset = make_asset("LAP-0001", quantity=5)
+
+    def make_request(self, status):
+        return PurchaseRequest.objects.create(
+            asset=self.asset, request_type="MANUAL", triggered_by="ADMIN", quantity_needed=3, status=status,
+        )
+
+    def test_receive_refused_outside_allowed_sources(self):
+        for status in ("PENDING_FINANCE", "APPROVED_FINANCE", "COMPLETED", "REJECTED"):
+            with self.subTest(status=status):
+                pr     = self.make_request(status)
+                result = apply_transitions([{"request_id": pr.id, "status": "ORDER_PLACED"}])
+
+                self.assertEqual(result["applied"], [])
+                self.assertEqual(result["skipped"][0]["request_id"], pr.id)
+                pr.refresh_from_db()
+                self.assertEqual(pr.status, status)
+
+        self.asset.refresh_from_db()
+        self.assertEqual((self.asset.total_quantity, self.asset.available_quantity), (5, 5))
+        self.assertFalse(PurchaseRequestTransition.objects.exists())
+
+    def test_receive_from_hr_approval_adds_stock(self):
+        received = self.make_request("APPROVED_HR")
+        refused  = self.make_request("PENDING_FINANCE")
+
+        result = apply_transitions([
+            {"request_id": received.id, "status": "ORDER_PLACED", "purchased_quantity": 4},
+            {"request_id": refused.id,  "status": "ORDER_PLACED"},
+        ])
+
+        self.assertEqual([row["request_id"] for row in result["applied"]], [received.id])
+        self.assertEqual([row["request_id"] for row in result["skipped"]], [refused.id])
+        self.asset.refresh_from_db()
+        self.assertEqual((self.asset.total_quantity, self.asset.available_quantity), (9, 9))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RECONCILIATION
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ReconcileTests(ApiTestCase):
+
+    def test_repair_restores_counters_from_issue_records(self):
+        asset = make_asset("LAP-0001", quantity=10, minimum_stock_level=2)
+        self.assertEqual(self.issue(asset, 3).status_code, 201)
+        # Drift: a lost write left the counters as if nothing was issued
+        Asset.objects.filter(id=asset.id).update(quantity_issued=0, available_quantity=10, status="AVAILABLE")
+
+        report = reconcile_stock(repair=False)
+        self.assertEqual(report["mismatched"], 1)
+        self.assertEqual(report["repaired"], 0)
+        self.assertEqual(report["mismatches"][0]["fields"]["quantity_issued"], {"actual": 0, "expected": 3})
+
+        report = reconcile_stock(repair=True, chunk_size=1)
+        self.assertEqual(report["repaired"], 1)
+        asset.refresh_from_db()
+        self.assertEqual((asset.quantity_issued, asset.available_quantity), (3, 7))
+        self.assertEqual(reconcile_stock()["mismatched"], 0)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RESERVATIONS
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ReservationTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.asset       = make_asset("LAP-0001", quantity=10)
+        self.reservation = reserve_stock(self.asset.id, 8, self.employee, reserved_by=self.admin)
+
+    def test_held_units_block_an_issue(self):
+        response = self.issue(self.asset, 3)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.issue(self.asset, 2).status_code, 201)
+
+        self.asset.refresh_from_db()
+        self.assertEqual((self.asset.available_quantity, self.asset.reserved_quantity), (8, 8))
+
+    def test_held_units_block_a_kiosk_issue(self):
+        response = self.post_json("/api/inventory/kiosk/scan/action/", {
+            "code": self.asset.asset_tag, "action": "issue", "employee_id": self.employee.id, "quantity": 3,
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_release_frees_the_units(self):
+        release_reservation(self.reservation.id)
+        self.assertEqual(self.issue(self.asset, 10).status_code, 201)
+
+    def test_confirm_issues_the_held_units(self):
+        _, record = confirm_reservation(self.reservation.id, issued_by=self.admin)
+
+        self.assertEqual(record.quantity_issued, 8)
+        self.asset.refresh_from_db()
+        self.assertEqual(
+            (self.asset.available_quantity, self.asset.reserved_quantity, self.asset.quantity_issued),
+            (2, 0, 8),
+        )
+        with self.assertRaises(ValueError):
+            reserve_stock(self.asset.id, 3, self.employee)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOCATION STOCK — Σ AssetStock stays within available_quantity
+# ─────────────────────────────────────────────────────────────────────────────
+
+class LocationStockTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.asset   = make_asset("LAP-0001", quantity=10)
+        self.lahore  = create_location("Lahore", "LHE")
+        self.karachi = create_location("Karachi", "KHI")
+        transfer_stock(self.asset.id, 6, to_location=self.lahore)
+        transfer_stock(self.asset.id, 2, to_location=self.karachi)
+
+    def stock(self):
+        return dict(AssetStock.objects.filter(asset=self.asset).values_list("location__code", "quantity"))
+
+    def assertWithinAvailable(self):
+        self.asset.refresh_from_db()
+        self.assertLessEqual(placed_quantity(self.asset.id), self.asset.available_quantity)
+
+    def test_issue_takes_unplaced_stock_first(self):
+        response = self.post_json("/api/inventory/kiosk/scan/action/", {
+            "code": self.asset.asset_tag, "action": "issue", "employee_id": self.employee.id, "quantity": 5,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.stock(), {"LHE": 3, "KHI": 2})
+        self.assertWithinAvailable()
+
+    def test_issue_from_a_chosen_location(self):
+        self.assertEqual(self.issue(self.asset, 2, location_id=self.karachi.id).status_code, 201)
+        self.assertEqual(self.stock(), {"LHE": 6, "KHI": 0})
+
+        self.assertEqual(self.issue(self.asset, 1, location_id=self.karachi.id).status_code, 400)
+        self.assertWithinAvailable()
+
+    def test_confirmed_reservation_leaves_a_location(self):
+        reservation = reserve_stock(self.asset.id, 4, self.employee)
+        confirm_reservation(reservation.id, location_id=self.lahore.id)
+        self.assertEqual(self.stock(), {"LHE": 2, "KHI": 2})
+        self.assertWithinAvailable()
+
+    def test_total_cannot_drop_below_placed_stock(self):
+        response = self.client.put(
+            "/api/inventory/update/", json.dumps({"id": self.asset.id, "total_quantity": 7}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertWithinAvailable()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# VENDOR ROLLUPS — the nightly rebuild matches the incremental path
+# ─────────────────────────────────────────────────────────────────────────────
+
+class VendorRollupTests(ApiTestCase):
+
+    def rollups(self):
+        return sorted(VendorMonthlySpend.objects.values_list(
+            "vendor_id", "month", "spend", "assets_purchased", "units_issued", "units_damaged_lost",
+        ))
+
+    def test_rebuild_matches_incremental_after_hand_over(self):
+        vendor    = Vendor.objects.create(name="Acme")
+        colleague = User.objects.create(email="colleague@example.com", name="Colleague", role="EMPLOYEE")
+        response  = self.post_json("/api/inventory/add/", {
+            "brand": "Dell", "model_name": "Latitude 5440", "category": "LAPTOP", "total_quantity": 12,
+            "purchase_date": "2025-01-01", "purchase_price": "900", "vendor_name": vendor.name,
+        })
+        asset = Asset.objects.get(id=response.json()["asset_id"])
+        self.assertEqual(self.issue(asset, 5).status_code, 201)
+        self.assertEqual(self.issue(asset, 4).status_code, 201)
+
+        first = AssetDetails.objects.filter(asset=asset).order_by("id").first()
+        result = transfer_issue_records([{"issue_id": first.id, "employee_id": colleague.id}], transferred_by=self.admin)
+        self.assertEqual(len(result["transferred"]), 1)
+
+        incremental = self.rollups()
+        self.assertEqual(sum(row[4] for row in incremental), 9)
+
+        rebuild_vendor_rollups()
+        self.assertEqual(self.rollups(), incremental)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# STOCK TAKE — applied corrections clear the discrepancies they fix
+# ─────────────────────────────────────────────────────────────────────────────
+
+class StockTakeCorrectionTests(ApiTestCase):
+
+    def test_apply_moves_misplaced_and_places_unexpected_stock(self):
+        site    = create_location("Lahore", "LHE")
+        room_1  = create_location("Room 1", "LHE-R1", kind="ROOM", parent=site)
+        room_2  = create_location("Room 2", "LHE-R2", kind="ROOM", parent=site)
+        moved   = make_asset("LAP-0001", quantity=1)
+        found   = make_asset("LAP-0002", quantity=1)
+        issued  = make_asset("LAP-0003", quantity=1)
+        transfer_stock(moved.id, 1, to_location=room_1)
+        self.assertEqual(self.issue(issued, 1).status_code, 201)
+
+        session = StockTakeSession.objects.create(name="Q4", location=site, started_by=self.admin)
+        body    = "\n".join(json.dumps({"code": asset.asset_tag, "location_id": room_2.id}) for asset in (moved, found, issued))
+        load_scans(session, body.encode())
+        summary = discrepancies(session)["summary"]
+        self.assertEqual((summary["misplaced"], summary["unexpected"]), (1, 2))
+
+        applied = apply_corrections(session, user=self.admin)
+
+        self.assertEqual((applied["transfers"], applied["unresolved"]), (2, 1))
+        self.assertEqual(
+            dict(AssetStock.objects.filter(quantity__gt=0).values_list("asset__asset_tag", "location__code")),
+            {"LAP-0001": "LHE-R2", "LAP-0002": "LHE-R2"},
+        )
+        self.assertEqual(StockTransfer.objects.filter(remarks__startswith="Stock take").count(), 2)
+        summary = discrepancies(session)["summary"]
+        # The issued asset has no stock to place — still reported
+        self.assertEqual((summary["missing"], summary["misplaced"], summary["unexpected"]), (0, 0, 1))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TAG ALLOCATION
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TagAllocationTests(TestCase):
+
+    def test_blocks_are_unique_and_skip_existing_tags(self):
+        prefix = prefix_for("LAPTOP")
+        make_asset(f"{prefix}-000041")
+
+        first  = allocate_tags("LAPTOP", 3)
+        second = allocate_tags("LAPTOP", 2)
+
+        self.assertEqual(first[0], f"{prefix}-000042")
+        self.assertEqual(len(set(first + second)), 5)
+        self.assertLess(first[-1], second[0])
+        self.assertNotIn(allocate_tag("LAPTOP"), first + second)
+
+    def test_block_size_is_bounded(self):
+        with self.assertRaises(ValueError):
+            allocate_tags("LAPTOP", 0)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PURCHASE ORDERS — partial receipts
+# ─────────────────────────────────────────────────────────────────────────────
+
+class PurchaseOrderReceiptTests(TestCase):
+
+    def setUp(self):
+        self.asset = make_asset("LAP-0001", quantity=2)
+        self.order = create_order([{"asset_id": self.asset.id, "quantity": 10}])
+
+    def test_partial_then_full_receipt(self):
+        receive_order(self.order.id, [{"asset_id": self.asset.id, "quantity": 6}])
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, "PARTIALLY_RECEIVED")
+
+        receive_order(self.order.id, [{"asset_id": self.asset.id, "quantity": 4}])
+        self.order.refresh_from_db()
+        self.asset.refresh_from_db()
+        self.assertEqual(self.order.status, "RECEIVED")
+        self.assertEqual((self.asset.total_quantity, self.asset.available_quantity), (12, 12))
+
+    def test_over_receipt_is_refused(self):
+        receive_order(self.order.id, [{"asset_id": self.asset.id, "quantity": 6}])
+        with self.assertRaises(ValueError):
+            receive_order(self.order.id, [{"asset_id": self.asset.id, "quantity": 5}])
+
+        self.asset.refresh_from_db()
+        self.assertEqual(self.asset.total_quantity, 8)
+        self.assertEqual(self.order.lines.get().quantity_received, 6)
@@ -1,5 +1,12 @@
 from django.urls import path
 from . import views
+from . import views_kiosk
+from . import views_labels
+from . import views_locations
+from . import views_media
+from . import views_purchasing
+from . import views_reservations
+from . import views_stocktake
 from .views import (
     add_inventory,
     update_inventory,
@@ -20,9 +27,17 @@ from .views import (
 
 urlpatterns = [
     path('add/', add_inventory, name='add_inventory'),
+
+    # server-side asset tags — block of unique "<prefix>-<number>" tags for bulk imports
+    path('asset-tags/allocate/', views.allocate_asset_tags, name='allocate_asset_tags'),
     path('update/', update_inventory, name='update_inventory'),
+
+    # bulk patch — id list or filter + sparse field map, optional dry run, audited
+    path('bulk-update/', views.bulk_update_inventory, name='bulk_update_inventory'),
+
     path('delete/', delete_inventory, name='delete_inventory'),
     path('list/', list_inventory, name='list_inventory'),
+    path('facets/', views.facet_inventory, name='facet_inventory'),
     path('issue/', issue_inventory, name='issue_inventory'),
     path('assets/', list_assets, name='list_assets'),
     path('assets/employee/<int:employee_id>/', get_employee_assets, name='employee_assets'),
@@ -37,6 +52,9 @@ urlpatterns = [
 
     path('employee-return-assets/<int:employee_id>/', return_all_employee_assets),
 
+    # hand issued assets to another employee (single, batch, or everything one employee holds)
+    path('transfer-assets/', views.transfer_assets, name='transfer_assets'),
+
     # request for inventory to finance
 
     path("create-purchase-request/", views.create_purchase_request),
@@ -54,6 +72,36 @@ urlpatterns = [
     # finance purchase add record 
     path("purchase-request/<int:request_id>/finance-purchase/", views.finance_mark_as_purchased, name="finance_purchase_request"),
 
+    # batch approvals / receipts (state machine) + per-request history
+    path("purchase-requests/bulk-transition/", views_purchasing.bulk_transition_purchase_requests, name="bulk_transition_purchase_requests"),
+    path("purchase-request/<int:request_id>/history/", views_purchasing.purchase_request_history, name="purchase_request_history"),
+
+    # time-limited stock holds: list / reserve, confirm (→ issue record), release
+    path("reservations/",                               views_reservations.reservations,              name="stock_reservations"),
+    path("reservations/<int:reservation_id>/confirm/", views_reservations.confirm_stock_reservation, name="confirm_stock_reservation"),
+    path("reservations/<int:reservation_id>/release/", views_reservations.release_stock_reservation, name="release_stock_reservation"),
+
+    # location hierarchy + per-location stock: tree, subtree stock / low stock, transfers
+    path("locations/",                               views_locations.locations,          name="locations"),
+    path("locations/<int:location_id>/move/",        views_locations.move_location_view, name="move_location"),
+    path("locations/<int:location_id>/stock/",       views_locations.location_stock,     name="location_stock"),
+    path("locations/<int:location_id>/low-stock/",   views_locations.location_low_stock, name="location_low_stock"),
+    path("stock-transfers/",                         views_locations.stock_transfers,    name="stock_transfers"),
+
+    # offline stock-take: session, JSONL (gzip) scan uploads, discrepancies, corrections
+    path("stock-takes/",                                views_stocktake.stock_takes,              name="stock_takes"),
+    path("stock-takes/<int:session_id>/scans/",         views_stocktake.upload_stock_take_scans,  name="upload_stock_take_scans"),
+    path("stock-takes/<int:session_id>/discrepancies/", views_stocktake.stock_take_discrepancies, name="stock_take_discrepancies"),
+    path("stock-takes/<int:session_id>/apply/",         views_stocktake.apply_stock_take,         name="apply_stock_take"),
+    path("stock-takes/<int:session_id>/close/",         views_stocktake.close_stock_take,         name="close_stock_take"),
+
+    # multi-line purchase orders, received in partial deliveries (one invoice per receipt)
+    path("purchase-orders/",                         views_purchasing.purchase_orders,        name="purchase_orders"),
+    path("purchase-orders/<int:order_id>/",          views_purchasing.purchase_order_detail,  name="purchase_order_detail"),
+    path("purchase-orders/<int:order_id>/place/",    views_purchasing.place_purchase_order,   name="place_purchase_order"),
+    path("purchase-orders/<int:order_id>/cancel/",   views_purchasing.cancel_purchase_order,  name="cancel_purchase_order"),
+    path("purchase-orders/<int:order_id>/receipts/", views_purchasing.receive_purchase_order, name="receive_purchase_order"),
+
     # list of purchse 
 
     path("purchase-requests/", list_purchase_requests, name="list_purchase_requests"),
@@ -68,10 +116,26 @@ urlpatterns = [
 
     path("assets/<int:asset_id>/details/", asset_details, name="asset_details"),
 
+    # QR code for the details page — ?format=png|svg&size=150..1200, rendered on demand
+    path("assets/<int:asset_id>/qr/", views_media.asset_qr, name="asset_qr"),
+
+    # printable QR label sheets — ?format=pdf|png + category / vendor / from_date / to_date / ids
+    path("labels/", views_labels.label_sheets, name="label_sheets"),
+
+    # check-in / check-out kiosk: exact scan lookup + scan-then-issue / scan-then-return
+    path("kiosk/scan/",        views_kiosk.kiosk_scan,        name="kiosk_scan"),
+    path("kiosk/scan/action/", views_kiosk.kiosk_scan_action, name="kiosk_scan_action"),
+
     # edit vendor details
     path("vendors/<int:vendor_id>/edit/",   edit_vendor,   name="edit_vendor"),
 
     # delete vendor
     path("vendors/<int:vendor_id>/delete/", delete_vendor, name="delete_vendor"),
 
+    # resized image derivatives (thumb / medium) — rendered lazily, then cached
+    path("media/derivatives/<str:size>/<path:name>", views_media.image_derivative, name="image_derivative"),
+
+    # GET /api/inventory/media/<path> — JWT-protected media (invoices); X-Accel-Redirect / X-Sendfile when configured
+    path("media/<path:path>", views_media.protected_media, name="protected_media"),
+
 ]
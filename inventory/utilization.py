@@ -0,0 +1,258 @@
+# inventory/utilization.py
+"""
+Asset utilization — the share of stock that was out with employees over a
+window.
+
+Every issue record overlapping the window is pulled with ONE values_list
+query into NumPy arrays (start, end, quantity, asset index) and the interval
+arithmetic is done at once:
+
+  start     issue_date (created_at when missing)
+  end       return_date; open records run to "now"; closed records without a
+            return_date end at their last update
+  overlap   max(0, min(end, window_end) - max(start, window_start)) × quantity
+  capacity  total_quantity × the part of the window after purchase_date
+
+Per-asset sums are one np.bincount over the asset index; category totals are
+another over the category index. Results are cached per (window, data
+fingerprint) — a new issue, return or quantity change starts a new entry.
+"""
+import hashlib
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .depreciation import fleet_fingerprint
+from .models import Asset, AssetDetails
+
+CACHE_TIMEOUT = getattr(settings, "UTILIZATION_CACHE_TIMEOUT", 60 * 60)
+
+DEFAULT_WINDOW_DAYS = 90
+MAX_WINDOW_DAYS     = 10 * 366
+
+# Idle-time histogram bucket edges, in days (last bucket is open-ended)
+IDLE_BUCKETS = (0, 7, 30, 90, 180, 365)
+
+DAY = 86400.0
+
+
+def _seconds(values):
+    """Aware datetimes → float epoch seconds (NaN for None)."""
+    return np.fromiter(
+        (value.timestamp() if value is not None else np.nan for value in values),
+        dtype=np.float64, count=len(values),
+    )
+
+
+def window_bounds(from_date, to_date):
+    """[from_date 00:00, to_date + 1 day 00:00) in the local timezone."""
+    start = timezone.make_aware(datetime.combine(from_date, time.min))
+    end   = timezone.make_aware(datetime.combine(to_date + timedelta(days=1), time.min))
+    return start, end
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOAD — one query per table → column arrays
+# ─────────────────────────────────────────────────────────────────────────────
+
+def load_assets(window_end):
+    """Assets in service before the window ends, ordered by id (searchsorted below relies on it)."""
+    rows = list(
+        Asset.objects
+        .filter(Q(purchase_date__isnull=True) | Q(purchase_date__lt=window_end.date() + timedelta(days=1)))
+        .order_by("id")
+        .values_list("id", "asset_tag", "category", "total_quantity", "purchase_date")
+    )
+    ids, tags, categories, quantities, purchased = zip(*rows) if rows else ((),) * 5
+    return {
+        "id":        np.array(ids, dtype=np.int64),
+        "asset_tag": np.array(tags, dtype=object),
+        "category":  np.array(categories, dtype=object),
+        "units":     np.array(quantities, dtype=np.float64),
+        "purchased": _seconds([
+            timezone.make_aware(datetime.combine(d, time.min)) if d else None for d in purchased
+        ]),
+    }
+
+
+def load_intervals(window_start, window_end):
+    """Issue records that overlap the window — asset_id, start, end (epoch seconds), quantity."""
+    rows = list(
+        AssetDetails.objects
+        .filter(asset__isnull=False)
+        .annotate(started=Coalesce("issue_date", "created_at"))
+        .filter(started__lt=window_end)
+        .filter(Q(return_date__isnull=True) | Q(return_date__gt=window_start))
+        .values_list("asset_id", "started", "return_date", "updated_at", "quantity_issued", "status")
+    )
+    asset_ids, starts, returns, updated, quantities, statuses = zip(*rows) if rows else ((),) * 6
+
+    end    = _seconds(returns)
+    closed = ~np.isin(np.array(statuses, dtype=object), AssetDetails.OPEN_STATUSES)
+    now    = timezone.now().timestamp()
+    end    = np.where(np.isnan(end), np.where(closed, _seconds(updated), now), end)
+    return {
+        "asset_id": np.array(asset_ids, dtype=np.int64),
+        "start":    _seconds(starts),
+        "end":      end,
+        "quantity": np.array(quantities, dtype=np.float64),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# UTILIZATION — vectorized
+# ─────────────────────────────────────────────────────────────────────────────
+
+def issued_unit_days(assets, intervals, window_start, window_end):
+    """Per-asset unit-days out with employees inside the window (aligned with assets["id"])."""
+    lo, hi  = window_start.timestamp(), window_end.timestamp()
+    overlap = np.clip(np.minimum(intervals["end"], hi) - np.maximum(intervals["start"], lo), 0.0, None)
+
+    # Records of assets outside `assets` (bought after the window) are dropped
+    index = np.searchsorted(assets["id"], intervals["asset_id"])
+    index = np.clip(index, 0, max(len(assets["id"]) - 1, 0))
+    known = (assets["id"][index] == intervals["asset_id"]) if len(assets["id"]) else np.zeros(0, dtype=bool)
+
+    return np.bincount(
+        index[known],
+        weights=(overlap * intervals["quantity"])[known] / DAY,
+        minlength=len(assets["id"]),
+    )
+
+
+def capacity_unit_days(assets, window_start, window_end):
+    """total_quantity × days in the window the asset was owned."""
+    lo, hi = window_start.timestamp(), window_end.timestamp()
+    owned  = np.maximum(np.nan_to_num(assets["purchased"], nan=lo), lo)
+    return assets["units"] * np.clip(hi - owned, 0.0, None) / DAY
+
+
+def _ratio(issued, capacity):
+    return np.divide(issued, capacity, out=np.zeros_like(issued), where=capacity > 0)
+
+
+def _by_category(assets, issued, capacity):
+    names, index = np.unique(assets["category"], return_inverse=True)
+    counts       = np.bincount(index, minlength=len(names))
+    units        = np.bincount(index, weights=assets["units"], minlength=len(names))
+    issued_sum   = np.bincount(index, weights=issued, minlength=len(names))
+    capacity_sum = np.bincount(index, weights=capacity, minlength=len(names))
+    utilization  = _ratio(issued_sum, capacity_sum)
+    return [
+        {
+            "category":           name,
+            "assets":             int(counts[i]),
+            "units":              int(units[i]),
+            "issued_unit_days":   round(float(issued_sum[i]), 2),
+            "capacity_unit_days": round(float(capacity_sum[i]), 2),
+            "utilization":        round(float(utilization[i]), 4),
+        }
+        for i, name in enumerate(names)
+    ]
+
+
+def _idle_histogram(idle_days):
+    edges     = np.array(IDLE_BUCKETS + (np.inf,), dtype=np.float64)
+    counts, _ = np.histogram(idle_days, bins=edges)
+    return [
+        {
+            "from_days": int(edges[i]),
+            "to_days":   None if np.isinf(edges[i + 1]) else int(edges[i + 1]),
+            "assets":    int(counts[i]),
+        }
+        for i in range(len(counts))
+    ]
+
+
+def history_fingerprint():
+    """Change detector for the cache key: issue records + the asset fleet."""
+    stats  = AssetDetails.objects.aggregate(count=Count("id"), latest=Max("updated_at"))
+    latest = stats["latest"].isoformat() if stats["latest"] else "-"
+    return f"{stats['count']}:{latest}:{fleet_fingerprint()}"
+
+
+def utilization_cache_key(from_date, to_date):
+    fingerprint = hashlib.sha1(history_fingerprint().encode()).hexdigest()[:12]
+    return f"utilization:{from_date.isoformat()}:{to_date.isoformat()}:{fingerprint}"
+
+
+def fleet_utilization(from_date, to_date):
+    """
+    {window, totals, by_category, idle_histogram, assets} where `assets`
+    holds per-asset columns (NumPy arrays) for assets with capacity in the
+    window. A window reaching into the future is measured up to now.
+    """
+    key    = utilization_cache_key(from_date, to_date)
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    window_start, window_end = window_bounds(from_date, to_date)
+    window_end = min(window_end, max(window_start, timezone.now()))
+
+    assets    = load_assets(window_end)
+    intervals = load_intervals(window_start, window_end)
+    issued    = issued_unit_days(assets, intervals, window_start, window_end)
+    capacity  = capacity_unit_days(assets, window_start, window_end)
+
+    # Assets with no units or bought after the window carry no capacity
+    keep     = capacity > 0
+    assets   = {column: values[keep] for column, values in assets.items()}
+    issued   = issued[keep]
+    capacity = capacity[keep]
+
+    utilization = _ratio(issued, capacity)
+    # Average idle days per unit over the part of the window the asset was owned
+    owned_days  = _ratio(capacity, assets["units"])
+    idle_days   = owned_days * (1.0 - np.clip(utilization, 0.0, 1.0))
+
+    result = {
+        "window": {
+            "from_date": from_date.isoformat(),
+            "to_date":   to_date.isoformat(),
+            "days":      round((window_end - window_start).total_seconds() / DAY, 2),
+        },
+        "totals": {
+            "assets":             int(len(assets["id"])),
+            "units":              int(assets["units"].sum()),
+            "issued_unit_days":   round(float(issued.sum()), 2),
+            "capacity_unit_days": round(float(capacity.sum()), 2),
+            "utilization":        round(float(_ratio(np.array([issued.sum()]), np.array([capacity.sum()]))[0]), 4),
+        },
+        "by_category":    _by_category(assets, issued, capacity),
+        "idle_histogram": _idle_histogram(idle_days),
+        "assets": {
+            "id":          assets["id"],
+            "asset_tag":   assets["asset_tag"],
+            "category":    assets["category"],
+            "units":       assets["units"],
+            "issued":      issued,
+            "capacity":    capacity,
+            "utilization": utilization,
+            "idle_days":   idle_days,
+        },
+    }
+    cache.set(key, result, CACHE_TIMEOUT)
+    return result
+
+
+def asset_rows(assets, order=None, start=0, stop=None):
+    """Per-asset dicts for a slice of fleet_utilization()["assets"], in `order` (index array)."""
+    order = np.arange(len(assets["id"])) if order is None else order
+    stop  = len(order) if stop is None else min(stop, len(order))
+    for i in order[start:stop]:
+        yield {
+            "asset_id":           int(assets["id"][i]),
+            "asset_tag":          assets["asset_tag"][i],
+            "category":           assets["category"][i],
+            "units":              int(assets["units"][i]),
+            "issued_unit_days":   round(float(assets["issued"][i]), 2),
+            "capacity_unit_days": round(float(assets["capacity"][i]), 2),
+            "utilization":        round(float(assets["utilization"][i]), 4),
+            "idle_days":          round(float(assets["idle_days"][i]), 1),
+        }
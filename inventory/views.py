@@ -15,14 +15,37 @@ from users.jwt_decorators import jwt_required
 
 from django.views.decorators.http import require_GET
 
-import base64, os, qrcode, logging
-from io import BytesIO
+import logging
 
-from django.conf import settings
+from django.urls import reverse
+from django.utils.dateparse import parse_date
 from .models import Asset
+from .services import LOW_STOCK_STATUSES, enqueue_reorder_check
+from .search import search_assets
+from .specs import apply_filters, facet_counts, spec_filters, with_port_text
+from .images import derivative_urls, enqueue_derivatives
+from .qr import qr_payload_url
+from .warranty import warranty_status_for
+from .purchasing import apply_transitions, can_transition
+from .locations import issue_stock, placed_quantity, put_stock, stocked_at
+from .tags import MAX_BLOCK, allocate_tag, allocate_tags
+from .bulk_edit import bulk_edit, clean_changes, target_queryset
+from .handover import MAX_BATCH, transfer_issue_records
+from .forecasting import forecast_order_quantity
+from .storage import protected_url
+from django.core.exceptions import ValidationError
+from django.views.decorators.http import require_http_methods
+from .models import Location
+from .rollups import (
+    record_asset_added,
+    record_asset_changed,
+    record_asset_removed,
+    record_damage_loss,
+    record_issue,
+    spend_snapshot,
+)
 
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png"}
-MEDIA_QR_PATH = "qr_codes/"
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -30,7 +53,13 @@ MEDIA_QR_PATH = "qr_codes/"
 # ─────────────────────────────────────────────────────────────────────────────
 
 def _update_asset_status(asset):
-    """Set asset status based on available_quantity. Call before asset.save()."""
+    """
+    Set asset status based on available_quantity. Call before asset.save().
+    When stock drops into LOW_STOCK / OUT_OF_STOCK, queues the reorder job
+    (runs after the current transaction commits).
+    """
+    previous_status = asset.status
+
     if asset.available_quantity <= 0:
         asset.status = "OUT_OF_STOCK"
     elif asset.available_quantity <= asset.minimum_stock_level:
@@ -38,18 +67,102 @@ def _update_asset_status(asset):
     else:
         asset.status = "AVAILABLE"
 
+    if asset.status in LOW_STOCK_STATUSES and asset.status != previous_status:
+        enqueue_reorder_check(asset.id)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HELPERS — issue / close one issue record (shared with the kiosk views)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _issue_units(asset, employee, quantity, issued_by, issue_date, location, issue_reason, remarks=None):
+    """Issue `quantity` units of a row-locked asset. Caller checks available stock."""
+    # ✅ Update quantities in view only
+    asset.available_quantity -= quantity
+    asset.quantity_issued    += quantity
+
+    # ✅ Update status in view
+    _update_asset_status(asset)
+
+    asset.save(update_fields=[
+        "available_quantity",
+        "quantity_issued",
+        "status",
+        "updated_at",
+    ])
+
+    # Create issue record — model save() does nothing now
+    asset_detail = AssetDetails.objects.create(
+        asset           = asset,
+        user            = employee,
+        quantity_issued = quantity,
+        issued_by       = issued_by,
+        issue_date      = issue_date,
+        location        = location,
+        issue_reason    = issue_reason,
+        remarks         = remarks,
+        status          = "ISSUED",
+    )
+    record_issue(asset, quantity)
+    return asset_detail
+
+
+def _close_issue_record(asset_detail, asset, status, remarks=""):
+    """Close a row-locked, still open issue record as RETURNED / DAMAGED / LOST."""
+    # ✅ Update asset detail record
+    asset_detail.status      = status
+    asset_detail.return_date = timezone.now()
+    if remarks:
+        asset_detail.remarks = remarks
+    asset_detail.save(update_fields=[
+        "status", "return_date", "remarks", "updated_at"
+    ])
+
+    # ✅ RETURNED — item reusable
+    if status == "RETURNED":
+        asset.available_quantity += asset_detail.quantity_issued
+        asset.quantity_issued    -= asset_detail.quantity_issued
+
+    # ✅ DAMAGED — item gone forever
+    elif status == "DAMAGED":
+        asset.total_quantity  -= asset_detail.quantity_issued
+        asset.quantity_issued -= asset_detail.quantity_issued
+
+    # ✅ LOST — item gone forever
+    elif status == "LOST":
+        asset.total_quantity  -= asset_detail.quantity_issued
+        asset.quantity_issued -= asset_detail.quantity_issued
+
+    if status in ("DAMAGED", "LOST"):
+        record_damage_loss(asset, asset_detail.quantity_issued)
+
+    # ✅ Update asset status
+    _update_asset_status(asset)
+    asset.save(update_fields=[
+        "available_quantity",
+        "quantity_issued",
+        "total_quantity",
+        "status",
+        "updated_at",
+    ])
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # PAGINATION HELPER — default page=1, limit=10
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _paginate(request, data):
+def _page_params(request):
     try:
         page  = max(1, int(request.GET.get("page",  1)))
         limit = max(1, int(request.GET.get("limit", 10)))
     except (ValueError, TypeError):
         page  = 1
         limit = 10
+    return page, limit
+
+
+def _paginate(request, data):
+    page, limit = _page_params(request)
 
     total       = len(data)
     start       = (page - 1) * limit
@@ -67,12 +180,33 @@ def _paginate(request, data):
     }
 
 
+def _paginate_queryset(request, queryset):
+    """Same shape as _paginate(), but counts + slices in the DB — only the page is fetched."""
+    page, limit = _page_params(request)
+
+    total       = queryset.count()
+    start       = (page - 1) * limit
+    end         = start + limit
+    total_pages = max(1, (total + limit - 1) // limit)
+
+    return {
+        "page":        page,
+        "limit":       limit,
+        "total":       total,
+        "total_pages": total_pages,
+        "has_next":    page < total_pages,
+        "has_prev":    page > 1,
+        "data":        list(queryset[start:end]),
+    }
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # ADD INVENTORY
 # ─────────────────────────────────────────────────────────────────────────────
 
 @require_POST
 @csrf_exempt
+@transaction.atomic
 @jwt_required
 def add_inventory(request):
     try:
@@ -97,6 +231,11 @@ def add_inventory(request):
     except ValueError:
         return JsonResponse({"error": "Quantity fields must be integers."}, status=400)
 
+    # ✅ Tag allocated server-side when the client does not bring its own
+    asset_tag = (data.get("asset_tag") or "").strip()
+    if asset_tag and Asset.objects.filter(asset_tag=asset_tag).exists():
+        return JsonResponse({"error": f"asset_tag {asset_tag} already exists"}, status=409)
+
     # ✅ Set status based on quantities before saving
     if available_qty <= 0:
         initial_status = "OUT_OF_STOCK"
@@ -107,7 +246,7 @@ def add_inventory(request):
 
     try:
         asset = Asset.objects.create(
-            asset_tag            = data.get("asset_tag"),
+            asset_tag            = asset_tag or allocate_tag(data.get("category")),
             serial_number        = data.get("serial_number"),
             model_number         = data.get("model_number"),
             brand                = data.get("brand"),
@@ -143,7 +282,7 @@ def add_inventory(request):
             invoice_number       = data.get("invoice_number"),
             warranty_start       = data.get("warranty_start"),
             warranty_end         = data.get("warranty_end"),
-            warranty_status      = data.get("warranty_status"),
+            warranty_status      = warranty_status_for(parse_date(data.get("warranty_end") or "")) or data.get("warranty_status"),
             condition            = data.get("condition") or "NEW",
             current_location     = data.get("current_location"),
             remarks              = data.get("remarks"),
@@ -151,6 +290,12 @@ def add_inventory(request):
             warranty_documents   = warranty_docs,
         )
 
+        # ✅ Vendor rollup (spend / asset count) — same transaction as the asset
+        record_asset_added(asset)
+
+        # ✅ Thumbnails rendered in the background (Celery worker)
+        enqueue_derivatives(asset.attachment, asset.warranty_documents)
+
         # Assign to user if provided
         assigned_to_id = data.get("assigned_to")
         if assigned_to_id:
@@ -161,22 +306,8 @@ def add_inventory(request):
             except User.DoesNotExist:
                 return JsonResponse({"error": "Assigned user not found."}, status=400)
 
-        # Generate QR code
-        qr_url    = f"http://192.168.18.160:8000/api/inventory/assets/{asset.id}/details/"
-        qr        = qrcode.make(qr_url)
-        buffer    = BytesIO()
-        qr.save(buffer, format="PNG")
-        buffer.seek(0)
-
-        qr_folder   = os.path.join(settings.MEDIA_ROOT, MEDIA_QR_PATH)
-        os.makedirs(qr_folder, exist_ok=True)
-        qr_filename = f"{asset.asset_tag}_qr.png"
-        qr_path     = os.path.join(MEDIA_QR_PATH, qr_filename)
-        with open(os.path.join(settings.MEDIA_ROOT, qr_path), "wb") as f:
-            f.write(buffer.getvalue())
-
-        asset.barcode_qr_code = qr_path[:100]
-        asset.save(update_fields=["barcode_qr_code"])
+        # ✅ QR rendered on demand by the QR service — nothing encoded inline
+        qr_url = qr_payload_url(asset.id)
 
         return JsonResponse({
             "message":            "Asset added successfully",
@@ -187,10 +318,11 @@ def add_inventory(request):
             "quantity_issued":    asset.quantity_issued,
             "status":             asset.status,
             "assigned_to_id":     asset.assigned_to.id if asset.assigned_to else None,
-            "qr_code_path":       asset.barcode_qr_code,
+            "qr_code_path":       reverse("asset_qr", args=[asset.id]),
             "qr_url":             qr_url,
             "attachment":         asset.attachment.url if asset.attachment else None,
             "warranty_documents": asset.warranty_documents.url if asset.warranty_documents else None,
+            "attachment_derivatives": derivative_urls(asset.attachment),
         }, status=201)
 
     except Exception as e:
@@ -198,11 +330,41 @@ def add_inventory(request):
         return JsonResponse({"error": str(e)}, status=500)
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# ALLOCATE ASSET TAGS — block of unique tags for bulk imports
+#   {"category": "LAPTOP", "count": 50}
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_POST
+@jwt_required
+def allocate_asset_tags(request):
+    try:
+        data  = json.loads(request.body)
+        count = int(data.get("count", 1))
+    except (json.JSONDecodeError, TypeError, ValueError):
+        return JsonResponse({"error": "count must be an integer"}, status=400)
+
+    category = (data.get("category") or "").upper()
+    if category and category not in dict(Asset.CATEGORY_CHOICES):
+        return JsonResponse({"error": "Unknown category"}, status=400)
+    if not 0 < count <= MAX_BLOCK:
+        return JsonResponse({"error": f"count must be between 1 and {MAX_BLOCK}"}, status=400)
+
+    tags = allocate_tags(category, count)
+    return JsonResponse({
+        "category": category or None,
+        "count":    len(tags),
+        "tags":     tags,
+    }, status=201)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # UPDATE ASSET
 # ─────────────────────────────────────────────────────────────────────────────
 
 @csrf_exempt
+@transaction.atomic
 @jwt_required
 def update_inventory(request):
     if request.method != "PUT":
@@ -218,7 +380,8 @@ def update_inventory(request):
         return JsonResponse({"error": "Asset ID is required"}, status=400)
 
     try:
-        asset = Asset.objects.get(id=asset_id)
+        # ✅ Locked like the issue / placement paths — quantities are checked below
+        asset = Asset.objects.select_for_update().get(id=asset_id)
     except Asset.DoesNotExist:
         return JsonResponse({"error": "Asset not found"}, status=404)
 
@@ -229,6 +392,17 @@ def update_inventory(request):
         }, status=400)
     if new_total_quantity < 0:
         return JsonResponse({"error": "Total quantity cannot be negative"}, status=400)
+    if new_total_quantity - asset.quantity_issued < asset.reserved_quantity:
+        return JsonResponse({
+            "error": f"Total quantity ({new_total_quantity}) leaves less than the {asset.reserved_quantity} reserved unit(s)"
+        }, status=400)
+    placed = placed_quantity(asset.id)
+    if new_total_quantity - asset.quantity_issued < placed:
+        return JsonResponse({
+            "error": f"Total quantity ({new_total_quantity}) leaves less than the {placed} unit(s) placed at locations — transfer them out first"
+        }, status=400)
+
+    spend_before = spend_snapshot(asset)
 
     asset.asset_tag           = data.get("asset_tag",           asset.asset_tag)
     asset.brand               = data.get("brand",               asset.brand)
@@ -247,6 +421,9 @@ def update_inventory(request):
     _update_asset_status(asset)
     asset.save()
 
+    # ✅ Price / purchase date edits move spend between rollup buckets
+    record_asset_changed(spend_before, asset)
+
     return JsonResponse({
         "message":            "Asset updated successfully",
         "asset_id":           asset.id,
@@ -257,11 +434,48 @@ def update_inventory(request):
     })
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# BULK UPDATE ASSETS — one sparse field map for many assets
+#   {"ids": [1, 2, 3]} or {"filter": {"category": "MONITOR", "location_id": 4}}
+#   + {"changes": {"current_location": "Floor 3", "condition": "GOOD"}, "dry_run": true, "remarks": "..."}
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_http_methods(["PATCH", "POST"])
+@jwt_required
+def bulk_update_inventory(request):
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    # ✅ Validated once for the whole batch
+    try:
+        changes = clean_changes(data.get("changes"))
+    except ValidationError as e:
+        return JsonResponse({"error": "Invalid changes", "fields": e.message_dict}, status=400)
+
+    try:
+        queryset = target_queryset(data.get("ids"), data.get("filter"))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    dry_run = bool(data.get("dry_run"))
+    result  = bulk_edit(queryset, changes, user=request.jwt_user, remarks=data.get("remarks"), dry_run=dry_run)
+
+    return JsonResponse({
+        "message": "Dry run — nothing changed" if dry_run else f"Updated {result['changed']} asset(s)",
+        "dry_run": dry_run,
+        **result,
+    })
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # DELETE ASSET
 # ─────────────────────────────────────────────────────────────────────────────
 
 @csrf_exempt
+@transaction.atomic
 @jwt_required
 def delete_inventory(request):
     if request.method != "DELETE":
@@ -274,6 +488,7 @@ def delete_inventory(request):
 
     try:
         asset = Asset.objects.get(id=asset_id)
+        record_asset_removed(asset)
         asset.delete()
         return JsonResponse({"message": "Asset deleted successfully"})
     except Asset.DoesNotExist:
@@ -287,33 +502,39 @@ def delete_inventory(request):
 @csrf_exempt
 @jwt_required
 def list_inventory(request):
-    from django.db.models import Q
-
     assets   = Asset.objects.select_related("vendor", "assigned_to").all()
     category = request.GET.get("category")
     status   = request.GET.get("status")
     search   = request.GET.get("search")
     issued   = request.GET.get("issued")
-
+    location = request.GET.get("location_id")
+
+    if location:
+        # ✅ Stock anywhere in the location's subtree — EXISTS on the path + (location, asset) indexes
+        try:
+            assets = assets.filter(stocked_at(Location.objects.get(id=location)))
+        except (Location.DoesNotExist, ValueError):
+            return JsonResponse({"error": "Location not found"}, status=404)
     if category:
         assets = assets.filter(category__iexact=category)
     if status:
         assets = assets.filter(status__iexact=status)
-    if search:
-        assets = assets.filter(
-            Q(serial_number__icontains=search) |
-            Q(asset_tag__icontains=search)     |
-            Q(model_name__icontains=search)    |
-            Q(brand__icontains=search)
-        )
     if issued is not None:
         if issued.lower() == "true":
             assets = assets.filter(quantity_issued__gt=0)
         elif issued.lower() == "false":
             assets = assets.filter(quantity_issued=0)
+    if search:
+        # ✅ Indexed, ranked search (pg_trgm on Postgres, portable fallback otherwise)
+        assets = search_assets(assets, search)
+    else:
+        # Deterministic order — LIMIT/OFFSET pages must not skip or repeat rows
+        assets = assets.order_by("asset_tag", "id")
 
+    # ✅ Paginate in the DB — only the requested page is loaded + serialized
+    paginated   = _paginate_queryset(request, assets)
     assets_list = []
-    for a in assets:
+    for a in paginated["data"]:
         assets_list.append({
             "id":                  a.id,
             "asset_tag":           a.asset_tag,
@@ -326,6 +547,7 @@ def list_inventory(request):
             "total_quantity":      a.total_quantity,
             "available_quantity":  a.available_quantity,
             "quantity_issued":     a.quantity_issued,
+            "reserved_quantity":   a.reserved_quantity,
             "minimum_stock_level": a.minimum_stock_level,
             "purchase_date":       a.purchase_date.isoformat() if a.purchase_date else "",
             "purchase_price":      float(a.purchase_price) if a.purchase_price else "",
@@ -334,11 +556,13 @@ def list_inventory(request):
             "warranty_end":        a.warranty_end.isoformat() if a.warranty_end else "",
             "assigned_to":         a.assigned_to.name if a.assigned_to else "",
             "current_location":    a.current_location or "",
+            "attachment":          a.attachment.url if a.attachment else None,
+            "attachment_derivatives": derivative_urls(a.attachment),
+            "qr_code_url":         reverse("asset_qr", args=[a.id]),
             "created_at":          a.created_at.isoformat(),
             "updated_at":          a.updated_at.isoformat(),
         })
 
-    paginated = _paginate(request, assets_list)
     return JsonResponse({
         "total":       paginated["total"],
         "total_pages": paginated["total_pages"],
@@ -347,12 +571,73 @@ def list_inventory(request):
         "has_next":    paginated["has_next"],
         "has_prev":    paginated["has_prev"],
         "filters_applied": {
-            "category": category or None,
-            "status":   status   or None,
-            "search":   search   or None,
-            "issued":   issued   or None,
+            "category":    category or None,
+            "status":      status   or None,
+            "search":      search   or None,
+            "issued":      issued   or None,
+            "location_id": location or None,
         },
-        "assets": paginated["data"],
+        "assets": assets_list,
+    })
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FACETED SPEC SEARCH — filters on the normalized spec columns + per-facet counts
+# ?category=&min_ram=&max_ram=&min_storage=&max_storage=&storage_kind=SSD
+# &min_cpu_gen=&min_screen=&max_screen=&port=HDMI&port=USB-C&search=
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_GET
+@jwt_required
+def facet_inventory(request):
+    try:
+        filters = spec_filters(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    base   = with_port_text(Asset.objects.all())
+    search = request.GET.get("search")
+    if search:
+        base = search_assets(base, search)
+
+    # ✅ All facet buckets in ONE aggregate query (conditional counts)
+    facets = facet_counts(base, filters)
+
+    assets = apply_filters(base.select_related("vendor"), filters)
+    if not search:
+        assets = assets.order_by("asset_tag", "id")
+
+    paginated   = _paginate_queryset(request, assets)
+    assets_list = []
+    for a in paginated["data"]:
+        assets_list.append({
+            "id":                 a.id,
+            "asset_tag":          a.asset_tag,
+            "brand":              a.brand or "",
+            "model_name":         a.model_name or "",
+            "category":           a.category or "",
+            "status":             a.status or "",
+            "available_quantity": a.available_quantity,
+            "ram_gb":             a.ram_gb,
+            "storage_gb":         a.storage_gb,
+            "storage_kind":       a.storage_kind,
+            "cpu_generation":     a.cpu_generation,
+            "screen_size_inch":   float(a.screen_size_inch) if a.screen_size_inch is not None else None,
+            "input_ports":        a.input_ports or [],
+            "ports":              a.ports_normalized or [],
+            "vendor_name":        a.vendor.name if a.vendor else "",
+        })
+
+    return JsonResponse({
+        "total":       paginated["total"],
+        "total_pages": paginated["total_pages"],
+        "page":        paginated["page"],
+        "limit":       paginated["limit"],
+        "has_next":    paginated["has_next"],
+        "has_prev":    paginated["has_prev"],
+        "facets":      facets,
+        "assets":      assets_list,
     })
 
 
@@ -390,34 +675,21 @@ def issue_inventory(request):
         asset    = Asset.objects.select_for_update().get(id=asset_id)
         employee = User.objects.get(id=employee_id)
 
-        if asset.available_quantity < quantity_issued:
+        # ✅ Units held by reservations are not available to other issues
+        if asset.available_quantity - asset.reserved_quantity < quantity_issued:
             return JsonResponse({"error": "Not enough stock available"}, status=400)
 
-        # ✅ Update quantities in view only
-        asset.available_quantity -= quantity_issued
-        asset.quantity_issued    += quantity_issued
-
-        # ✅ Update status in view
-        _update_asset_status(asset)
-
-        asset.save(update_fields=[
-            "available_quantity",
-            "quantity_issued",
-            "status",
-            "updated_at",
-        ])
-
-        # Create issue record — model save() does nothing now
-        asset_detail = AssetDetails.objects.create(
-            asset           = asset,
-            user            = employee,
-            quantity_issued = quantity_issued,
-            issued_by       = issued_by,
-            issue_date      = issue_date,
-            location        = location,
-            issue_reason    = issue_reason,
-            remarks         = remarks,
-            status          = "ISSUED",
+        # ✅ Units leave location_id when given, otherwise unplaced stock first
+        if data.get("location_id") and not Location.objects.filter(id=data["location_id"]).exists():
+            return JsonResponse({"error": "Location not found"}, status=404)
+        try:
+            issue_stock(asset.id, quantity_issued, data.get("location_id"))
+        except ValueError:
+            return JsonResponse({"error": "Not enough stock at that location"}, status=400)
+
+        asset_detail = _issue_units(
+            asset, employee, quantity_issued, issued_by,
+            issue_date, location, issue_reason, remarks,
         )
 
         return JsonResponse({
@@ -622,6 +894,7 @@ def get_asset_detail(request, asset_id):
             "brand":    record.asset.brand if record.asset else "",
             "model":    record.asset.model_name if record.asset else "",
             "category": record.asset.category if record.asset else "",
+            "attachment_derivatives": derivative_urls(record.asset.attachment) if record.asset else None,
         },
         "employee": {
             "id":    record.user.id,
@@ -659,6 +932,14 @@ def return_asset(request):
         remarks = data.get("remarks", "")
         status  = data.get("status", "RETURNED")
 
+        # ✅ Optional: RETURNED units go back on the shelf at this stock location
+        return_location = None
+        if data.get("location_id"):
+            try:
+                return_location = Location.objects.get(id=data["location_id"])
+            except (Location.DoesNotExist, ValueError):
+                return JsonResponse({"error": "Location not found"}, status=404)
+
         # ✅ Accept both single ID and array of IDs
         asset_ids = data.get("asset_ids", [])
         if not asset_ids:
@@ -690,46 +971,16 @@ def return_asset(request):
                 asset = asset_detail.asset
 
                 # ✅ Skip already closed records
-                if asset_detail.status in ["RETURNED", "DAMAGED", "LOST"]:
+                if asset_detail.status not in AssetDetails.OPEN_STATUSES:
                     errors.append({
                         "asset_id": asset_detail_id,
                         "error":    "Asset already closed"
                     })
                     continue
 
-                # ✅ Update asset detail record
-                asset_detail.status      = status
-                asset_detail.return_date = timezone.now()
-                if remarks:
-                    asset_detail.remarks = remarks
-                asset_detail.save(update_fields=[
-                    "status", "return_date", "remarks", "updated_at"
-                ])
-
-                # ✅ RETURNED — item reusable
-                if status == "RETURNED":
-                    asset.available_quantity += asset_detail.quantity_issued
-                    asset.quantity_issued    -= asset_detail.quantity_issued
-
-                # ✅ DAMAGED — item gone forever
-                elif status == "DAMAGED":
-                    asset.total_quantity  -= asset_detail.quantity_issued
-                    asset.quantity_issued -= asset_detail.quantity_issued
-
-                # ✅ LOST — item gone forever
-                elif status == "LOST":
-                    asset.total_quantity  -= asset_detail.quantity_issued
-                    asset.quantity_issued -= asset_detail.quantity_issued
-
-                # ✅ Update asset status
-                _update_asset_status(asset)
-                asset.save(update_fields=[
-                    "available_quantity",
-                    "quantity_issued",
-                    "total_quantity",
-                    "status",
-                    "updated_at",
-                ])
+                _close_issue_record(asset_detail, asset, status, remarks)
+                if return_location is not None and status == "RETURNED":
+                    put_stock(asset.id, return_location.id, asset_detail.quantity_issued)
 
                 results.append({
                     "asset_id":              asset_detail_id,
@@ -805,6 +1056,58 @@ def return_all_employee_assets(request, employee_id):
     }, status=200)
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# TRANSFER ASSETS BETWEEN EMPLOYEES — no return / re-issue round trip
+#   {"issue_id": 12, "employee_id": 9, "location": "...", "remarks": "..."}
+#   {"items": [{"issue_id": 12, "employee_id": 9}, ...]}
+#   {"from_employee_id": 7, "to_employee_id": 9}   ← every open record of 7
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_POST
+@jwt_required
+def transfer_assets(request):
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    if data.get("from_employee_id"):
+        if not data.get("to_employee_id"):
+            return JsonResponse({"error": "to_employee_id is required"}, status=400)
+        items = [
+            {"issue_id": issue_id, "employee_id": data["to_employee_id"], "location": data.get("location")}
+            for issue_id in AssetDetails.objects.filter(
+                user_id=data["from_employee_id"], status__in=AssetDetails.OPEN_STATUSES,
+            ).values_list("id", flat=True)
+        ]
+        if not items:
+            return JsonResponse({"message": "No open assets to transfer", "transferred": [], "skipped": []})
+    elif data.get("items") is not None:
+        items = data["items"]
+    else:
+        items = [data]
+
+    if not isinstance(items, list) or not items:
+        return JsonResponse({"error": "items must be a non-empty list"}, status=400)
+    if len(items) > MAX_BATCH:
+        return JsonResponse({"error": f"At most {MAX_BATCH} records per transfer"}, status=400)
+
+    try:
+        result = transfer_issue_records(items, transferred_by=request.jwt_user, remarks=data.get("remarks"))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    transferred = result["transferred"]
+    return JsonResponse({
+        "message":           f"Transferred {len(transferred)} record(s)",
+        "transferred_count": len(transferred),
+        "skipped_count":     len(result["skipped"]),
+        "transferred":       transferred,
+        "skipped":           result["skipped"],
+    }, status=200 if transferred else 409)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # CREATE PURCHASE REQUEST
 # ─────────────────────────────────────────────────────────────────────────────
@@ -834,11 +1137,17 @@ def create_purchase_request(request):
 
         created_by = request.jwt_user
 
-        if not asset_id or not quantity_needed:
-            return JsonResponse({"error": "asset_id and quantity_needed are required"}, status=400)
+        if not asset_id:
+            return JsonResponse({"error": "asset_id is required"}, status=400)
 
         asset = Asset.objects.get(id=asset_id)
 
+        # ✅ No quantity given — order what the depletion forecast recommends
+        if not quantity_needed:
+            quantity_needed = forecast_order_quantity(asset)
+            if not quantity_needed:
+                return JsonResponse({"error": "quantity_needed is required — the forecast has nothing left to order for this asset"}, status=400)
+
         pr = PurchaseRequest.objects.create(
             asset              = asset,
             request_type       = request_type,
@@ -854,7 +1163,8 @@ def create_purchase_request(request):
             "message":            "Purchase request created",
             "request_id":         pr.id,
             "status":             pr.status,
-            "invoice_attachment": pr.invoice_attachment.url if pr.invoice_attachment else None,
+            "quantity_needed":    int(pr.quantity_needed),
+            "invoice_attachment": protected_url(pr.invoice_attachment),
         }, status=201)
 
     except Asset.DoesNotExist:
@@ -874,10 +1184,13 @@ def create_purchase_request(request):
 def finance_approve_request(request, request_id):
     try:
         pr = PurchaseRequest.objects.get(id=request_id)
-        if pr.status != "PENDING_FINANCE":
+        if not can_transition(pr.status, "APPROVED_FINANCE"):
             return JsonResponse({"error": "Request is not pending finance approval"}, status=400)
-        pr.status = "APPROVED_FINANCE"
-        pr.save(update_fields=["status"])
+
+        result = apply_transitions([{"request_id": pr.id, "status": "APPROVED_FINANCE"}], user=request.jwt_user)
+        if result["skipped"]:
+            return JsonResponse({"error": result["skipped"][0]["error"]}, status=409)
+
         return JsonResponse({
             "message":    "Finance approved successfully",
             "request_id": pr.id,
@@ -896,10 +1209,13 @@ def finance_approve_request(request, request_id):
 def hr_approve_request(request, request_id):
     try:
         pr = PurchaseRequest.objects.get(id=request_id)
-        if pr.status != "APPROVED_FINANCE":
+        if not can_transition(pr.status, "APPROVED_HR"):
             return JsonResponse({"error": "Finance approval pending"}, status=400)
-        pr.status = "APPROVED_HR"
-        pr.save(update_fields=["status"])
+
+        result = apply_transitions([{"request_id": pr.id, "status": "APPROVED_HR"}], user=request.jwt_user)
+        if result["skipped"]:
+            return JsonResponse({"error": result["skipped"][0]["error"]}, status=409)
+
         return JsonResponse({
             "message":    "HR approved successfully",
             "request_id": pr.id,
@@ -914,6 +1230,7 @@ def hr_approve_request(request, request_id):
 # ─────────────────────────────────────────────────────────────────────────────
 
 @csrf_exempt
+@transaction.atomic
 @jwt_required
 def finance_mark_as_purchased(request, request_id):
     if request.method != "POST":
@@ -921,7 +1238,7 @@ def finance_mark_as_purchased(request, request_id):
 
     try:
         pr = PurchaseRequest.objects.get(id=request_id)
-        if pr.status != "APPROVED_HR":
+        if not can_transition(pr.status, "ORDER_PLACED"):
             return JsonResponse({"error": "HR approval pending or invalid status"}, status=400)
 
         invoice_file       = request.FILES.get("invoice_attachment")
@@ -934,18 +1251,20 @@ def finance_mark_as_purchased(request, request_id):
         if purchased_quantity <= 0:
             return JsonResponse({"error": "purchased_quantity must be greater than 0"}, status=400)
 
+        # ✅ Quantities, stock status, vendor rollup + history via the state machine
+        result = apply_transitions(
+            [{"request_id": pr.id, "status": "ORDER_PLACED", "purchased_quantity": purchased_quantity}],
+            user=request.jwt_user,
+        )
+        if result["skipped"]:
+            return JsonResponse({"error": result["skipped"][0]["error"]}, status=409)
+
+        pr.refresh_from_db()
         if invoice_file:
             pr.invoice_attachment = invoice_file
+            pr.save(update_fields=["invoice_attachment"])
 
-        # ✅ Update quantities in view
-        asset                     = pr.asset
-        asset.total_quantity     += purchased_quantity
-        asset.available_quantity += purchased_quantity
-        _update_asset_status(asset)
-        asset.save(update_fields=["total_quantity", "available_quantity", "status"])
-
-        pr.status = "ORDER_PLACED"
-        pr.save(update_fields=["status", "invoice_attachment"])
+        asset = Asset.objects.get(id=pr.asset_id)
 
         return JsonResponse({
             "message":                  f"Purchase completed for request {pr.id}",
@@ -954,7 +1273,7 @@ def finance_mark_as_purchased(request, request_id):
             "asset_total_quantity":     asset.total_quantity,
             "asset_available_quantity": asset.available_quantity,
             "status":                   pr.status,
-            "invoice_attachment":       pr.invoice_attachment.url if pr.invoice_attachment else None,
+            "invoice_attachment":       protected_url(pr.invoice_attachment),
         })
 
     except PurchaseRequest.DoesNotExist:
@@ -986,7 +1305,7 @@ def list_purchase_requests(request):
             "quantity_needed":    pr.quantity_needed,
             "status":             pr.status,
             "remarks":            pr.remarks,
-            "invoice_attachment": pr.invoice_attachment.url if pr.invoice_attachment else None,
+            "invoice_attachment": protected_url(pr.invoice_attachment),
             "created_at":         pr.created_at.isoformat(),
             "updated_at":         pr.updated_at.isoformat(),
         })
@@ -1071,8 +1390,10 @@ def list_vendors(request):
     if status:
         vendors = vendors.filter(status__iexact=status)
 
+    # ✅ Paginate in the DB — only the requested page is serialized
+    paginated   = _paginate_queryset(request, vendors.order_by("id"))
     vendor_list = []
-    for v in vendors:
+    for v in paginated["data"]:
         vendor_list.append({
             "id":             v.id,
             "name":           v.name,
@@ -1086,7 +1407,6 @@ def list_vendors(request):
             "created_at":     v.created_at.isoformat(),
         })
 
-    paginated = _paginate(request, vendor_list)
     return JsonResponse({
         "total":       paginated["total"],
         "total_pages": paginated["total_pages"],
@@ -1099,7 +1419,7 @@ def list_vendors(request):
             "category": category or None,
             "status":   status   or None,
         },
-        "vendors":     paginated["data"],
+        "vendors":     vendor_list,
     }, status=200)
 
 
@@ -1179,8 +1499,26 @@ def delete_vendor(request, vendor_id):
 # ASSET DETAILS PAGE (HTML)
 # ─────────────────────────────────────────────────────────────────────────────
 
-from django.shortcuts import get_object_or_404, render
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
 
+from .detail_page import get_detail_page
+
+@require_safe
+@jwt_required
 def asset_details(request, asset_id):
-    asset = get_object_or_404(Asset, id=asset_id)
-    return render(request, "asset_detail.html", {"asset": asset})
\ No newline at end of file
+    # ✅ Auth first — the cache and 304 paths never answer an anonymous scan
+    # ✅ Cached HTML keyed on the asset — repeat scans are a single cache lookup
+    page = get_detail_page(asset_id)
+
+    # ✅ 304 when the scanner already has this version
+    response = get_conditional_response(request, etag=page["etag"], last_modified=page["last_modified"])
+    if response is None:
+        response = HttpResponse(page["html"])
+    response["ETag"]          = page["etag"]
+    response["Last-Modified"] = http_date(page["last_modified"])
+    # Authenticated content — browsers may revalidate, shared caches must not store it
+    response["Cache-Control"] = "private, no-cache"
+    return response
\ No newline at end of file
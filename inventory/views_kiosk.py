@@ -0,0 +1,125 @@
+# inventory/views_kiosk.py
+import json
+
+from django.db import transaction
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from users.models import User
+
+# ✅ JWT auth
+from users.jwt_decorators import jwt_required
+
+from .kiosk import OPEN_ISSUE_STATUSES, build_scan_payload, lookup_scan, resolve_scan
+from .locations import issue_stock
+from .models import Asset, AssetDetails
+from .views import _close_issue_record, _issue_units
+
+KIOSK_LOCATION     = "Kiosk"
+KIOSK_ISSUE_REASON = "Kiosk check-out"
+RETURN_STATUSES    = ("RETURNED", "DAMAGED", "LOST")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SCAN LOOKUP — ?code=<asset_tag | serial_number | QR payload URL>
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_GET
+@jwt_required
+def kiosk_scan(request):
+    code = request.GET.get("code", "").strip()
+    if not code:
+        return JsonResponse({"error": "code is required"}, status=400)
+
+    payload = lookup_scan(code)
+    if payload is None:
+        return JsonResponse({"error": "No asset matches this code", "code": code}, status=404)
+    return JsonResponse(payload)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SCAN + ACTION — one round trip
+#   {"code": "...", "action": "issue",  "employee_id": 7, "quantity": 1, "location": "...", "issue_reason": "...",
+#    "location_id": 4}   (optional stock location the units leave)
+#   {"code": "...", "action": "return", "employee_id": 7 | "issue_id": 12, "status": "RETURNED"}
+# Responds with the refreshed scan payload.
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_POST
+@transaction.atomic
+@jwt_required
+def kiosk_scan_action(request):
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    code   = str(data.get("code") or "").strip()
+    action = str(data.get("action") or "").lower()
+    if not code or action not in ("issue", "return"):
+        return JsonResponse({"error": "code and action (issue | return) are required"}, status=400)
+
+    asset_id = resolve_scan(code)
+    if asset_id is None:
+        return JsonResponse({"error": "No asset matches this code", "code": code}, status=404)
+    asset = Asset.objects.select_for_update().get(id=asset_id)
+
+    if action == "issue":
+        try:
+            quantity = int(data.get("quantity", 1))
+        except (TypeError, ValueError):
+            return JsonResponse({"error": "quantity must be an integer"}, status=400)
+        if quantity <= 0:
+            return JsonResponse({"error": "quantity must be > 0"}, status=400)
+        try:
+            employee = User.objects.get(id=data.get("employee_id"))
+        except (User.DoesNotExist, ValueError, TypeError):
+            return JsonResponse({"error": "Employee not found"}, status=404)
+        if asset.available_quantity - asset.reserved_quantity < quantity:
+            return JsonResponse({"error": "Not enough stock available"}, status=400)
+        try:
+            issue_stock(asset.id, quantity, data.get("location_id"))
+        except ValueError:
+            return JsonResponse({"error": "Not enough stock at that location"}, status=400)
+
+        record = _issue_units(
+            asset, employee, quantity, request.jwt_user,
+            timezone.now(),
+            data.get("location") or KIOSK_LOCATION,
+            data.get("issue_reason") or KIOSK_ISSUE_REASON,
+            data.get("remarks"),
+        )
+        message = f"Issued {quantity} × {asset.asset_tag} to {employee.name}"
+
+    else:
+        status = str(data.get("status") or "RETURNED").upper()
+        if status not in RETURN_STATUSES:
+            return JsonResponse({"error": "status must be RETURNED, DAMAGED or LOST"}, status=400)
+
+        open_records = AssetDetails.objects.select_for_update().filter(asset=asset, status__in=OPEN_ISSUE_STATUSES)
+        if data.get("issue_id"):
+            open_records = open_records.filter(id=data["issue_id"])
+        elif data.get("employee_id"):
+            open_records = open_records.filter(user_id=data["employee_id"])
+        else:
+            return JsonResponse({"error": "employee_id or issue_id is required to return"}, status=400)
+
+        # Oldest open issue first
+        record = open_records.order_by("created_at", "id").first()
+        if record is None:
+            return JsonResponse({"error": "No open issue record for this asset"}, status=404)
+
+        _close_issue_record(record, asset, status, data.get("remarks", ""))
+        message = f"{asset.asset_tag} {status.lower()} (issue {record.id})"
+
+    # Built uncached — the transaction has not committed yet
+    return JsonResponse({
+        "message":  message,
+        "action":   action,
+        "issue_id": record.id,
+        "asset":    build_scan_payload(asset.id),
+    }, status=201 if action == "issue" else 200)
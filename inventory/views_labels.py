@@ -0,0 +1,88 @@
+# inventory/views_labels.py
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
+
+# ✅ JWT auth
+from users.jwt_decorators import jwt_required
+
+from .labels import (
+    DEFAULT_PAGE,
+    LABEL_FORMATS,
+    PAGE_SIZES,
+    iter_sheets,
+    label_jobs,
+    label_queryset,
+    sheet_count,
+    sheet_jobs,
+    sheet_png,
+    stream_pdf,
+)
+
+# Hard cap per request — bigger runs go through `manage.py print_labels`
+MAX_LABELS_PER_REQUEST = 5000
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LABEL SHEETS — ?format=pdf|png&category=&vendor=&from_date=&to_date=&ids=1,2
+# PDF streams every sheet; PNG returns one sheet (?sheet=N, default 1)
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_GET
+@jwt_required
+def label_sheets(request):
+    fmt  = request.GET.get("format", "pdf").lower()
+    page = request.GET.get("page_size", DEFAULT_PAGE).lower()
+    if fmt not in LABEL_FORMATS:
+        return JsonResponse({"error": f"format must be one of {list(LABEL_FORMATS)}"}, status=400)
+    if page not in PAGE_SIZES:
+        return JsonResponse({"error": f"page_size must be one of {list(PAGE_SIZES)}"}, status=400)
+
+    try:
+        ids = [int(i) for i in request.GET.get("ids", "").split(",") if i.strip()]
+    except ValueError:
+        return JsonResponse({"error": "ids must be a comma-separated list of integers"}, status=400)
+
+    assets = label_queryset(
+        category  = request.GET.get("category"),
+        vendor    = request.GET.get("vendor"),
+        from_date = request.GET.get("from_date"),
+        to_date   = request.GET.get("to_date"),
+        ids       = ids,
+    )
+    try:
+        jobs = label_jobs(assets[:MAX_LABELS_PER_REQUEST + 1])
+    except Exception as e:
+        return JsonResponse({"error": f"Invalid filter: {e}"}, status=400)
+
+    if not jobs:
+        return JsonResponse({"error": "No assets match the filter"}, status=404)
+    if len(jobs) > MAX_LABELS_PER_REQUEST:
+        return JsonResponse({
+            "error": f"More than {MAX_LABELS_PER_REQUEST} labels — narrow the filter or use `manage.py print_labels`",
+        }, status=400)
+
+    stamp = timezone.now().strftime("%Y%m%d_%H%M%S")
+
+    if fmt == "png":
+        try:
+            sheet = max(1, int(request.GET.get("sheet", 1)))
+        except ValueError:
+            sheet = 1
+        total = sheet_count(jobs)
+        if sheet > total:
+            return JsonResponse({"error": f"Only {total} sheet(s)"}, status=404)
+
+        composed = next(iter_sheets(sheet_jobs(jobs, sheet), page))
+        response = HttpResponse(sheet_png(composed), content_type=LABEL_FORMATS["png"])
+        response["Content-Disposition"] = f'inline; filename="asset_labels_{stamp}_{sheet}of{total}.png"'
+        response["X-Sheet-Count"]       = str(total)
+        return response
+
+    # ✅ Sheets are encoded and sent as they are composed — never all in memory
+    response = StreamingHttpResponse(stream_pdf(iter_sheets(jobs, page)), content_type=LABEL_FORMATS["pdf"])
+    response["Content-Disposition"] = f'attachment; filename="asset_labels_{stamp}.pdf"'
+    response["X-Sheet-Count"]       = str(sheet_count(jobs))
+    return response
@@ -0,0 +1,316 @@
+# inventory/views_locations.py
+import json
+
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST, require_http_methods
+
+# ✅ JWT auth
+from users.jwt_decorators import jwt_required
+
+from .locations import create_location, move_location, subtree_stock, transfer_stock
+from .models import Asset, AssetStock, Location, StockTransfer
+from .views import _paginate_queryset
+
+
+def _location_dict(loc):
+    return {
+        "id":         loc.id,
+        "name":       loc.name,
+        "code":       loc.code,
+        "kind":       loc.kind,
+        "parent_id":  loc.parent_id,
+        "path":       loc.path,
+        "depth":      loc.depth,
+        "is_active":  loc.is_active,
+        "created_at": loc.created_at.isoformat(),
+    }
+
+
+def _transfer_dict(t):
+    return {
+        "id":               t.id,
+        "asset_id":         t.asset_id,
+        "asset_tag":        t.asset.asset_tag,
+        "from_location_id": t.from_location_id,
+        "from_location":    t.from_location.code if t.from_location else None,
+        "to_location_id":   t.to_location_id,
+        "to_location":      t.to_location.code if t.to_location else None,
+        "quantity":         t.quantity,
+        "remarks":          t.remarks,
+        "transferred_by":   t.transferred_by_id,
+        "created_at":       t.created_at.isoformat(),
+    }
+
+
+def _page_meta(paginated):
+    return {
+        "total":       paginated["total"],
+        "total_pages": paginated["total_pages"],
+        "page":        paginated["page"],
+        "limit":       paginated["limit"],
+        "has_next":    paginated["has_next"],
+        "has_prev":    paginated["has_prev"],
+    }
+
+
+def _get_location(location_id):
+    """Location or None; ids come from JSON bodies as int or str."""
+    if location_id in (None, ""):
+        return None
+    return Location.objects.get(id=location_id)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOCATIONS — GET list (?parent_id= | ?root= subtree | ?kind=), POST create
+#   {"name": "Lahore Office", "code": "LHE", "kind": "SITE", "parent_id": 1}
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+@jwt_required
+def locations(request):
+    if request.method == "GET":
+        qs = Location.objects.order_by("path")
+        if request.GET.get("root"):
+            try:
+                root = Location.objects.get(id=request.GET["root"])
+            except (Location.DoesNotExist, ValueError):
+                return JsonResponse({"error": "Location not found"}, status=404)
+            qs = qs.filter(path__startswith=root.path)
+        if request.GET.get("parent_id"):
+            qs = qs.filter(parent_id=request.GET["parent_id"])
+        if request.GET.get("kind"):
+            qs = qs.filter(kind=request.GET["kind"].upper())
+        if request.GET.get("active", "").lower() == "true":
+            qs = qs.filter(is_active=True)
+
+        paginated = _paginate_queryset(request, qs)
+        return JsonResponse({**_page_meta(paginated), "locations": [_location_dict(l) for l in paginated["data"]]})
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    name = (data.get("name") or "").strip()
+    code = (data.get("code") or "").strip().upper()
+    kind = (data.get("kind") or "SITE").upper()
+    if not name or not code:
+        return JsonResponse({"error": "name and code are required"}, status=400)
+    if kind not in dict(Location.KIND_CHOICES):
+        return JsonResponse({"error": "kind must be REGION, SITE, BUILDING or ROOM"}, status=400)
+
+    try:
+        parent = _get_location(data.get("parent_id"))
+    except (Location.DoesNotExist, ValueError):
+        return JsonResponse({"error": "Parent location not found"}, status=404)
+
+    try:
+        location = create_location(name, code, kind, parent)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except IntegrityError:
+        return JsonResponse({"error": f"Location code {code} already exists"}, status=400)
+
+    return JsonResponse({"message": "Location created", "location": _location_dict(location)}, status=201)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MOVE LOCATION — {"parent_id": 4 | null}; rewrites the subtree's paths
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_POST
+@jwt_required
+def move_location_view(request, location_id):
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    try:
+        location = Location.objects.get(id=location_id)
+        parent   = _get_location(data.get("parent_id"))
+    except (Location.DoesNotExist, ValueError):
+        return JsonResponse({"error": "Location not found"}, status=404)
+
+    try:
+        location = move_location(location, parent)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({"message": "Location moved", "location": _location_dict(location)})
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOCATION STOCK — GET per-asset units in the subtree (?category=&asset_id=&direct=true)
+#   POST {"asset_id": 3, "minimum_quantity": 5} sets the per-location threshold
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+@jwt_required
+def location_stock(request, location_id):
+    try:
+        location = Location.objects.get(id=location_id)
+    except Location.DoesNotExist:
+        return JsonResponse({"error": "Location not found"}, status=404)
+
+    if request.method == "POST":
+        try:
+            data     = json.loads(request.body)
+            asset_id = int(data.get("asset_id"))
+            minimum  = int(data.get("minimum_quantity"))
+        except (json.JSONDecodeError, TypeError, ValueError):
+            return JsonResponse({"error": "asset_id and minimum_quantity must be integers"}, status=400)
+        if minimum < 0:
+            return JsonResponse({"error": "minimum_quantity must be >= 0"}, status=400)
+        if not Asset.objects.filter(id=asset_id).exists():
+            return JsonResponse({"error": "Asset not found"}, status=404)
+
+        stock, _ = AssetStock.objects.update_or_create(
+            asset_id=asset_id, location=location, defaults={"minimum_quantity": minimum},
+        )
+        return JsonResponse({
+            "message":          "Threshold updated",
+            "asset_id":         asset_id,
+            "location_id":      location.id,
+            "quantity":         stock.quantity,
+            "minimum_quantity": stock.minimum_quantity,
+        })
+
+    if request.GET.get("direct", "").lower() == "true":
+        stock = AssetStock.objects.filter(location=location)
+    else:
+        stock = subtree_stock(location)
+    if request.GET.get("category"):
+        stock = stock.filter(asset__category__iexact=request.GET["category"])
+    if request.GET.get("asset_id"):
+        stock = stock.filter(asset_id=request.GET["asset_id"])
+
+    # ✅ Grouped in SQL — one row per asset across the subtree
+    per_asset = (
+        stock
+        .values("asset_id", "asset__asset_tag", "asset__brand", "asset__model_name", "asset__category")
+        .annotate(quantity=Sum("quantity"))
+        .filter(quantity__gt=0)
+        .order_by("asset__category", "asset__asset_tag")
+    )
+    total_units = stock.aggregate(total=Sum("quantity"))["total"] or 0
+
+    paginated = _paginate_queryset(request, per_asset)
+    return JsonResponse({
+        "location":    _location_dict(location),
+        "total_units": total_units,
+        **_page_meta(paginated),
+        "stock": [
+            {
+                "asset_id":   row["asset_id"],
+                "asset_tag":  row["asset__asset_tag"],
+                "brand":      row["asset__brand"] or "",
+                "model_name": row["asset__model_name"] or "",
+                "category":   row["asset__category"] or "",
+                "quantity":   row["quantity"],
+            }
+            for row in paginated["data"]
+        ],
+    })
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOCATION LOW STOCK — rows in the subtree at or below their minimum_quantity
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_GET
+@jwt_required
+def location_low_stock(request, location_id):
+    try:
+        location = Location.objects.get(id=location_id)
+    except Location.DoesNotExist:
+        return JsonResponse({"error": "Location not found"}, status=404)
+
+    rows = (
+        subtree_stock(location)
+        .filter(minimum_quantity__gt=0, quantity__lte=F("minimum_quantity"))
+        .select_related("asset", "location")
+        .order_by("location__path", "asset__asset_tag")
+    )
+    if request.GET.get("category"):
+        rows = rows.filter(asset__category__iexact=request.GET["category"])
+
+    paginated = _paginate_queryset(request, rows)
+    return JsonResponse({
+        "location": _location_dict(location),
+        **_page_meta(paginated),
+        "low_stock": [
+            {
+                "asset_id":         s.asset_id,
+                "asset_tag":        s.asset.asset_tag,
+                "category":         s.asset.category or "",
+                "location_id":      s.location_id,
+                "location":         s.location.code,
+                "quantity":         s.quantity,
+                "minimum_quantity": s.minimum_quantity,
+            }
+            for s in paginated["data"]
+        ],
+    })
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# STOCK TRANSFERS — GET history (?asset_id=&location_id=), POST move
+#   {"asset_id": 3, "quantity": 2, "from_location_id": 5, "to_location_id": 9, "remarks": "..."}
+#   omit from_location_id to place unplaced stock, to_location_id to un-place it
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+@jwt_required
+def stock_transfers(request):
+    if request.method == "GET":
+        qs = StockTransfer.objects.select_related("asset", "from_location", "to_location").order_by("-created_at", "-id")
+        if request.GET.get("asset_id"):
+            qs = qs.filter(asset_id=request.GET["asset_id"])
+        if request.GET.get("location_id"):
+            location_id = request.GET["location_id"]
+            qs = qs.filter(from_location_id=location_id) | qs.filter(to_location_id=location_id)
+
+        paginated = _paginate_queryset(request, qs)
+        return JsonResponse({**_page_meta(paginated), "transfers": [_transfer_dict(t) for t in paginated["data"]]})
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    try:
+        asset_id = int(data.get("asset_id"))
+        quantity = int(data.get("quantity", 1))
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "asset_id and quantity must be integers"}, status=400)
+
+    try:
+        from_location = _get_location(data.get("from_location_id"))
+        to_location   = _get_location(data.get("to_location_id"))
+    except (Location.DoesNotExist, ValueError):
+        return JsonResponse({"error": "Location not found"}, status=404)
+
+    try:
+        transfer = transfer_stock(
+            asset_id, quantity, from_location, to_location,
+            user    = request.jwt_user,
+            remarks = data.get("remarks"),
+        )
+    except Asset.DoesNotExist:
+        return JsonResponse({"error": "Asset not found"}, status=404)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        "message":  "Stock transferred",
+        "transfer": _transfer_dict(StockTransfer.objects.select_related("asset", "from_location", "to_location").get(id=transfer.id)),
+    }, status=201)
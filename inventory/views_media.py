@@ -0,0 +1,272 @@
+# inventory/views_media.py
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_safe
+
+from .images import (
+    DERIVATIVE_ROOT,
+    DERIVATIVE_SIZES,
+    build_derivative,
+    is_image,
+)
+from .models import Asset, GoodsReceipt, PurchaseRequest
+from .qr import DEFAULT_SIZE, QR_FORMATS, get_qr
+from .storage import BLOB_ROOT, TMP_DIR, strong_etag
+
+# ✅ JWT auth
+from users.jwt_decorators import jwt_required
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+# Content-addressed files never change — cache for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Everything else (QR PNGs, legacy uploads) — cache, but revalidate (cheap 304)
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+# None | "nginx" (X-Accel-Redirect) | "apache" (X-Sendfile)
+SENDFILE_BACKEND      = getattr(settings, "MEDIA_SENDFILE_BACKEND", None)
+ACCEL_REDIRECT_PREFIX = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+
+# Never served without authentication: in-flight uploads and invoices
+PRIVATE_PREFIXES = (f"{TMP_DIR}/", "purchase_invoices/")
+INVOICE_MODELS   = (PurchaseRequest, GoodsReceipt)
+# Blobs are deduplicated — one also referenced here is public content
+PUBLIC_FIELDS    = ((Asset, "attachment"), (Asset, "warranty_documents"), (User, "profile_image"))
+
+RANGE_RE     = re.compile(r"^bytes=(\d*)-(\d*)$")
+STREAM_CHUNK = 64 * 1024
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HELPERS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _is_immutable(path):
+    # blobs/… and derivatives/<size>/blobs/…
+    return path.startswith(f"{BLOB_ROOT}/") or (path.startswith(DERIVATIVE_ROOT) and f"/{BLOB_ROOT}/" in path)
+
+
+def _is_private(path):
+    """Temporary uploads, legacy invoice paths, and blobs referenced only as an invoice."""
+    if path.startswith(PRIVATE_PREFIXES):
+        return True
+    if not path.startswith(f"{BLOB_ROOT}/"):
+        return False
+    if not any(model.objects.filter(invoice_attachment=path).exists() for model in INVOICE_MODELS):
+        return False
+    return not any(model.objects.filter(**{field: path}).exists() for model, field in PUBLIC_FIELDS)
+
+
+def _file_etag(path, full_path, st):
+    """Strong ETag: the content hash — free for blobs, memoized per (mtime, size) otherwise."""
+    etag = strong_etag(path)
+    if etag:
+        return etag
+
+    key  = f"media-etag:{path}:{st.st_mtime_ns}:{st.st_size}"
+    etag = cache.get(key)
+    if etag is None:
+        digest = hashlib.sha256()
+        with open(full_path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(STREAM_CHUNK), b""):
+                digest.update(chunk)
+        etag = f'"{digest.hexdigest()}"'
+        cache.set(key, etag, None)
+    return etag
+
+
+def _parse_range(header, size):
+    """Single byte range → (start, end) inclusive; None = serve whole file; False = unsatisfiable."""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None  # malformed or multi-range — ignore, send 200
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # suffix range: last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end   = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _range_iter(full_path, start, length):
+    with open(full_path, "rb") as fh:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fh.read(min(STREAM_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _set_validators(response, etag, st, cache_control):
+    response["ETag"]          = etag
+    response["Last-Modified"] = http_date(st.st_mtime)
+    response["Cache-Control"] = cache_control
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SERVE MEDIA — ETag / Last-Modified / 304 / Range / X-Accel-Redirect
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _resolve(path):
+    """(normalized relative path, full path, stat) of an existing file under MEDIA_ROOT, else Http404."""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Invalid path")
+
+    try:
+        st = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404("File not found")
+    if not os.path.isfile(full_path):
+        raise Http404("File not found")
+
+    return os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, "/"), full_path, st
+
+
+@require_safe
+def serve_media(request, path):
+    """Public /media/ — mounted in DEBUG only (the web server serves it in production)."""
+    path, full_path, st = _resolve(path)
+    if _is_private(path):
+        raise Http404("File not found")
+    return _serve_file(request, path, full_path, st)
+
+
+@require_safe
+@jwt_required
+def protected_media(request, path):
+    """Authenticated media (invoices included) — use with MEDIA_SENDFILE_BACKEND in production."""
+    path, full_path, st = _resolve(path)
+    if path.startswith(f"{TMP_DIR}/"):
+        raise Http404("File not found")
+    return _serve_file(request, path, full_path, st)
+
+
+def _serve_file(request, path, full_path, st):
+    etag          = _file_etag(path, full_path, st)
+    cache_control = IMMUTABLE_CACHE_CONTROL if _is_immutable(path) else REVALIDATE_CACHE_CONTROL
+
+    # ✅ 304 Not Modified (If-None-Match / If-Modified-Since) — no file I/O at all
+    conditional = get_conditional_response(request, etag=etag, last_modified=int(st.st_mtime))
+    if conditional is not None:
+        return _set_validators(conditional, etag, st, cache_control)
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    # ✅ Hand the transfer to the web server — worker never streams bytes
+    if SENDFILE_BACKEND in ("nginx", "apache"):
+        response = HttpResponse(content_type=content_type)
+        if SENDFILE_BACKEND == "nginx":
+            response["X-Accel-Redirect"] = f"{ACCEL_REDIRECT_PREFIX.rstrip('/')}/{path}"
+        else:
+            response["X-Sendfile"] = full_path
+        return _set_validators(response, etag, st, cache_control)
+
+    byte_range = None
+    range_header = request.META.get("HTTP_RANGE")
+    if range_header:
+        if_range = request.META.get("HTTP_IF_RANGE")
+        # If-Range: only honour the range if the client's copy is still current
+        if not if_range or etag in parse_etags(if_range):
+            byte_range = _parse_range(range_header, st.st_size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{st.st_size}"
+        return _set_validators(response, etag, st, cache_control)
+
+    if byte_range:
+        start, end = byte_range
+        length     = end - start + 1
+        response   = StreamingHttpResponse(
+            _range_iter(full_path, start, length) if request.method == "GET" else iter(()),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Range"]  = f"bytes {start}-{end}/{st.st_size}"
+        response["Content-Length"] = str(length)
+    else:
+        response = FileResponse(open(full_path, "rb"), content_type=content_type)
+
+    if encoding:
+        response["Content-Encoding"] = encoding
+    return _set_validators(response, etag, st, cache_control)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# IMAGE DERIVATIVE — lazy render + cache
+# No JWT: loaded by <img> tags, same exposure as /media/ itself
+# ─────────────────────────────────────────────────────────────────────────────
+
+@require_safe
+def image_derivative(request, size, name):
+    if size not in DERIVATIVE_SIZES or not is_image(name) or name.startswith(DERIVATIVE_ROOT):
+        raise Http404("Unknown derivative")
+
+    try:
+        if not default_storage.exists(name) or _is_private(name):
+            raise Http404("Source image not found")
+        target = build_derivative(name, size)
+    except SuspiciousFileOperation:
+        raise Http404("Invalid path")
+    except Http404:
+        raise
+    except Exception:
+        logger.exception("Could not render %s derivative for %s", size, name)
+        raise Http404("Derivative unavailable")
+
+    # Same validators / 304 / cache headers as any other media file
+    return _serve_file(request, *_resolve(target))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ASSET QR CODE — rendered on demand from QR_BASE_URL, LRU + disk cached
+# No JWT: printed labels / <img> tags — the code only encodes the details URL
+# ─────────────────────────────────────────────────────────────────────────────
+
+@require_safe
+def asset_qr(request, asset_id):
+    fmt = request.GET.get("format", "png").lower()
+    if fmt not in QR_FORMATS:
+        raise Http404("Unknown QR format")
+
+    if not Asset.objects.filter(id=asset_id).exists():
+        raise Http404("Asset not found")
+
+    data, etag = get_qr(asset_id, fmt, request.GET.get("size", DEFAULT_SIZE))
+
+    # ✅ 304 when the client already has this exact image
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(data, content_type=QR_FORMATS[fmt])
+    response["ETag"]          = etag
+    response["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+    return response
@@ -0,0 +1,286 @@
+# inventory/views_purchasing.py
+import json
+
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST, require_http_methods
+
+# ✅ JWT auth
+from users.jwt_decorators import jwt_required
+
+from .models import Location, PurchaseOrder, PurchaseRequest, PurchaseRequestTransition, Vendor
+from .purchase_orders import cancel_order, create_order, place_order, receive_order
+from .purchasing import apply_transitions
+from .storage import protected_url
+from .views import _paginate_queryset
+
+# Finance reviews month-end batches of ~50 — anything far bigger is a mistake
+MAX_TRANSITIONS_PER_REQUEST = 500
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BULK TRANSITION
+#   {"status": "APPROVED_FINANCE", "request_ids": [1, 2, 3], "remarks": "..."}
+#   or mixed targets:
+#   {"items": [{"request_id": 1, "status": "ORDER_PLACED", "purchased_quantity": 5}, ...]}
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_POST
+@jwt_required
+def bulk_transition_purchase_requests(request):
+    try:
+        data = json.loads(request.body or b"{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    items = data.get("items")
+    if items is None:
+        request_ids = data.get("request_ids") or []
+        if not isinstance(request_ids, list) or not data.get("status"):
+            return JsonResponse({"error": "Provide items, or status and request_ids"}, status=400)
+        items = [{"request_id": request_id, "status": data["status"]} for request_id in request_ids]
+
+    if not isinstance(items, list) or not items:
+        return JsonResponse({"error": "items must be a non-empty list"}, status=400)
+    if len(items) > MAX_TRANSITIONS_PER_REQUEST:
+        return JsonResponse({"error": f"At most {MAX_TRANSITIONS_PER_REQUEST} transitions per request"}, status=400)
+
+    result = apply_transitions(items, user=request.jwt_user, remarks=data.get("remarks"))
+
+    return JsonResponse({
+        "message":       f"{len(result['applied'])} applied, {len(result['skipped'])} skipped",
+        "applied_count": len(result["applied"]),
+        "skipped_count": len(result["skipped"]),
+        "applied":       result["applied"],
+        "skipped":       result["skipped"],
+    }, status=200 if result["applied"] else 400)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TRANSITION HISTORY — one purchase request, oldest first
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_GET
+@jwt_required
+def purchase_request_history(request, request_id):
+    pr = PurchaseRequest.objects.filter(id=request_id).values("id", "status").first()
+    if pr is None:
+        return JsonResponse({"error": "Purchase request not found"}, status=404)
+
+    history = [
+        {
+            "from_status": row["from_status"],
+            "to_status":   row["to_status"],
+            "changed_by":  row["changed_by__email"],
+            "quantity":    row["quantity"],
+            "remarks":     row["remarks"],
+            "created_at":  row["created_at"].isoformat(),
+        }
+        for row in (
+            PurchaseRequestTransition.objects
+            .filter(purchase_request_id=request_id)
+            .order_by("created_at", "id")
+            .values("from_status", "to_status", "changed_by__email", "quantity", "remarks", "created_at")
+        )
+    ]
+
+    return JsonResponse({
+        "request_id": pr["id"],
+        "status":     pr["status"],
+        "history":    history,
+    })
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PURCHASE ORDERS — multi-line orders, received in partial deliveries
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _order_dict(order, detail=False):
+    data = {
+        "id":          order.id,
+        "vendor_id":   order.vendor_id,
+        "vendor_name": order.vendor.name if order.vendor else "",
+        "status":      order.status,
+        "remarks":     order.remarks,
+        "created_by":  order.created_by_id,
+        "ordered_at":  order.ordered_at.isoformat() if order.ordered_at else None,
+        "created_at":  order.created_at.isoformat(),
+        "updated_at":  order.updated_at.isoformat(),
+    }
+    if detail:
+        data["lines"] = [
+            {
+                "id":                line.id,
+                "asset_id":          line.asset_id,
+                "asset_tag":         line.asset.asset_tag,
+                "quantity_ordered":  line.quantity_ordered,
+                "quantity_received": line.quantity_received,
+                "outstanding":       line.quantity_ordered - line.quantity_received,
+                "unit_price":        float(line.unit_price) if line.unit_price is not None else None,
+            }
+            for line in order.lines.select_related("asset").order_by("id")
+        ]
+        data["receipts"] = [
+            {
+                "id":                 receipt.id,
+                "invoice_number":     receipt.invoice_number,
+                "invoice_attachment": protected_url(receipt.invoice_attachment),
+                "received_by":        receipt.received_by_id,
+                "received_at":        receipt.received_at.isoformat(),
+                "remarks":            receipt.remarks,
+                "lines":              [
+                    {"line_id": rl.order_line_id, "quantity": rl.quantity}
+                    for rl in receipt.lines.all()
+                ],
+            }
+            for receipt in order.receipts.prefetch_related("lines").order_by("received_at", "id")
+        ]
+    return data
+
+
+def _load_order(order_id):
+    return PurchaseOrder.objects.select_related("vendor").get(id=order_id)
+
+
+# GET list (?status=&vendor_id=) / POST create
+#   {"vendor_id": 2, "remarks": "...", "place": true,
+#    "lines": [{"asset_id": 3, "quantity": 20, "unit_price": "199.00"}, ...]}
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+@jwt_required
+def purchase_orders(request):
+    if request.method == "GET":
+        qs = PurchaseOrder.objects.select_related("vendor").order_by("-created_at", "-id")
+        if request.GET.get("status"):
+            qs = qs.filter(status=request.GET["status"].upper())
+        if request.GET.get("vendor_id"):
+            qs = qs.filter(vendor_id=request.GET["vendor_id"])
+
+        paginated = _paginate_queryset(request, qs)
+        return JsonResponse({
+            "total":           paginated["total"],
+            "total_pages":     paginated["total_pages"],
+            "page":            paginated["page"],
+            "limit":           paginated["limit"],
+            "has_next":        paginated["has_next"],
+            "has_prev":        paginated["has_prev"],
+            "purchase_orders": [_order_dict(o) for o in paginated["data"]],
+        })
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    vendor = None
+    if data.get("vendor_id"):
+        vendor = Vendor.objects.filter(id=data["vendor_id"]).first()
+        if vendor is None:
+            return JsonResponse({"error": "Vendor not found"}, status=404)
+
+    try:
+        order = create_order(
+            data.get("lines"),
+            vendor  = vendor,
+            user    = request.jwt_user,
+            remarks = data.get("remarks"),
+            place   = bool(data.get("place", True)),
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        "message":        "Purchase order created",
+        "purchase_order": _order_dict(_load_order(order.id), detail=True),
+    }, status=201)
+
+
+@csrf_exempt
+@require_GET
+@jwt_required
+def purchase_order_detail(request, order_id):
+    try:
+        order = _load_order(order_id)
+    except PurchaseOrder.DoesNotExist:
+        return JsonResponse({"error": "Purchase order not found"}, status=404)
+    return JsonResponse(_order_dict(order, detail=True))
+
+
+@csrf_exempt
+@require_POST
+@jwt_required
+def place_purchase_order(request, order_id):
+    try:
+        place_order(order_id)
+    except PurchaseOrder.DoesNotExist:
+        return JsonResponse({"error": "Purchase order not found"}, status=404)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=409)
+    return JsonResponse({"message": "Order placed", "purchase_order": _order_dict(_load_order(order_id))})
+
+
+@csrf_exempt
+@require_POST
+@jwt_required
+def cancel_purchase_order(request, order_id):
+    try:
+        cancel_order(order_id)
+    except PurchaseOrder.DoesNotExist:
+        return JsonResponse({"error": "Purchase order not found"}, status=404)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=409)
+    return JsonResponse({"message": "Order cancelled", "purchase_order": _order_dict(_load_order(order_id))})
+
+
+# POST one delivery — multipart (lines = JSON string, invoice_attachment = file,
+# invoice_number, remarks, location_id) or a JSON body without the file
+#   lines: [{"line_id": 7, "quantity": 5}, {"asset_id": 3, "quantity": 10}]
+
+@csrf_exempt
+@require_POST
+@jwt_required
+def receive_purchase_order(request, order_id):
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "Invalid JSON body"}, status=400)
+        lines = data.get("lines")
+    else:
+        data = request.POST
+        try:
+            lines = json.loads(data.get("lines") or "null")
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "lines must be a JSON list"}, status=400)
+
+    location = None
+    if data.get("location_id"):
+        try:
+            location = Location.objects.get(id=data["location_id"])
+        except (Location.DoesNotExist, ValueError):
+            return JsonResponse({"error": "Location not found"}, status=404)
+
+    try:
+        receipt = receive_order(
+            order_id, lines,
+            user           = request.jwt_user,
+            invoice_number = data.get("invoice_number"),
+            invoice_file   = request.FILES.get("invoice_attachment"),
+            remarks        = data.get("remarks"),
+            location       = location,
+        )
+    except PurchaseOrder.DoesNotExist:
+        return JsonResponse({"error": "Purchase order not found"}, status=404)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        "message":        f"Receipt {receipt.id} posted",
+        "receipt_id":     receipt.id,
+        "purchase_order": _order_dict(_load_order(order_id), detail=True),
+    }, status=201)
@@ -0,0 +1,170 @@
+# inventory/views_reservations.py
+import json
+
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST, require_http_methods
+
+from Tickets.models import Ticket
+from users.models import User
+
+# ✅ JWT auth
+from users.jwt_decorators import jwt_required
+
+from .models import Asset, StockReservation
+from .reservations import confirm_reservation, release_reservation, reserve_stock
+from .views import _paginate_queryset
+
+
+def _reservation_dict(r):
+    return {
+        "id":              r.id,
+        "asset_id":        r.asset_id,
+        "asset_tag":       r.asset.asset_tag,
+        "quantity":        r.quantity,
+        "status":          r.status,
+        "reserved_for_id": r.reserved_for_id,
+        "reserved_for":    r.reserved_for.name,
+        "reserved_by_id":  r.reserved_by_id,
+        "ticket_id":       r.ticket_id,
+        "issue_record_id": r.issue_record_id,
+        "reason":          r.reason,
+        "expires_at":      r.expires_at.isoformat(),
+        "created_at":      r.created_at.isoformat(),
+        "updated_at":      r.updated_at.isoformat(),
+    }
+
+
+def _load(reservation_id):
+    return StockReservation.objects.select_related("asset", "reserved_for").get(id=reservation_id)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RESERVATIONS — GET list (?status=HELD&asset_id=&employee_id=&ticket_id=), POST reserve
+#   {"asset_id": 3, "quantity": 2, "employee_id": 7, "ticket_id": 12, "ttl_minutes": 120, "reason": "..."}
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+@jwt_required
+def reservations(request):
+    if request.method == "GET":
+        qs = StockReservation.objects.select_related("asset", "reserved_for").order_by("-created_at", "-id")
+        for param, field in (("status", "status"), ("asset_id", "asset_id"),
+                             ("employee_id", "reserved_for_id"), ("ticket_id", "ticket_id")):
+            if request.GET.get(param):
+                qs = qs.filter(**{field: request.GET[param].upper() if param == "status" else request.GET[param]})
+
+        paginated = _paginate_queryset(request, qs)
+        return JsonResponse({
+            "total":        paginated["total"],
+            "total_pages":  paginated["total_pages"],
+            "page":         paginated["page"],
+            "limit":        paginated["limit"],
+            "has_next":     paginated["has_next"],
+            "has_prev":     paginated["has_prev"],
+            "reservations": [_reservation_dict(r) for r in paginated["data"]],
+        })
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    try:
+        asset_id    = int(data.get("asset_id"))
+        quantity    = int(data.get("quantity", 1))
+        ttl_minutes = int(data["ttl_minutes"]) if data.get("ttl_minutes") else None
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "asset_id, quantity and ttl_minutes must be integers"}, status=400)
+
+    # Approved "Request New Item" tickets hold stock for the requesting employee
+    ticket = None
+    if data.get("ticket_id"):
+        ticket = Ticket.objects.filter(id=data["ticket_id"]).first()
+        if ticket is None:
+            return JsonResponse({"error": "Ticket not found"}, status=404)
+        if ticket.status != "APPROVED":
+            return JsonResponse({"error": "Only approved tickets can reserve stock"}, status=400)
+
+    employee_id = data.get("employee_id") or (ticket.employee_id if ticket else None)
+    if not employee_id:
+        return JsonResponse({"error": "employee_id (or ticket_id) is required"}, status=400)
+    try:
+        employee = User.objects.get(id=employee_id)
+    except (User.DoesNotExist, ValueError):
+        return JsonResponse({"error": "Employee not found"}, status=404)
+
+    try:
+        reservation = reserve_stock(
+            asset_id, quantity, employee,
+            reserved_by = request.jwt_user,
+            ticket      = ticket,
+            ttl_minutes = ttl_minutes,
+            reason      = data.get("reason"),
+        )
+    except Asset.DoesNotExist:
+        return JsonResponse({"error": "Asset not found"}, status=404)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        "message":     "Stock reserved",
+        "reservation": _reservation_dict(_load(reservation.id)),
+    }, status=201)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CONFIRM — hold → AssetDetails issue record
+#   {"location": "...", "issue_reason": "...", "remarks": "...", "location_id": 4}
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_POST
+@jwt_required
+def confirm_stock_reservation(request, reservation_id):
+    try:
+        data = json.loads(request.body or b"{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    try:
+        reservation, record = confirm_reservation(
+            reservation_id,
+            issued_by    = request.jwt_user,
+            location     = data.get("location"),
+            issue_reason = data.get("issue_reason"),
+            remarks      = data.get("remarks"),
+            location_id  = data.get("location_id"),
+        )
+    except StockReservation.DoesNotExist:
+        return JsonResponse({"error": "Reservation not found"}, status=404)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=409)
+
+    return JsonResponse({
+        "message":         "Reservation confirmed — asset issued",
+        "issue_record_id": record.id,
+        "reservation":     _reservation_dict(_load(reservation.id)),
+    })
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RELEASE — give the held units back
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_POST
+@jwt_required
+def release_stock_reservation(request, reservation_id):
+    try:
+        reservation = release_reservation(reservation_id)
+    except StockReservation.DoesNotExist:
+        return JsonResponse({"error": "Reservation not found"}, status=404)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=409)
+
+    return JsonResponse({
+        "message":     "Reservation released",
+        "reservation": _reservation_dict(_load(reservation.id)),
+    })
@@ -0,0 +1,165 @@
+# inventory/views_stocktake.py
+import json
+
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST, require_http_methods
+
+# ✅ JWT auth
+from users.jwt_decorators import jwt_required
+
+from .models import Location, StockTakeSession
+from .stocktake import MAX_LISTED, apply_corrections, close_session, discrepancies, load_scans
+from .views import _paginate_queryset
+
+
+def _session_dict(s):
+    return {
+        "id":          s.id,
+        "name":        s.name,
+        "location_id": s.location_id,
+        "status":      s.status,
+        "started_by":  s.started_by_id,
+        "created_at":  s.created_at.isoformat(),
+        "closed_at":   s.closed_at.isoformat() if s.closed_at else None,
+    }
+
+
+def _get_session(session_id):
+    return StockTakeSession.objects.select_related("location").get(id=session_id)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# STOCK-TAKE SESSIONS — GET list (?status=OPEN), POST start {"name": "...", "location_id": 4}
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+@jwt_required
+def stock_takes(request):
+    if request.method == "GET":
+        qs = StockTakeSession.objects.order_by("-created_at", "-id")
+        if request.GET.get("status"):
+            qs = qs.filter(status=request.GET["status"].upper())
+
+        paginated = _paginate_queryset(request, qs)
+        return JsonResponse({
+            "total":       paginated["total"],
+            "total_pages": paginated["total_pages"],
+            "page":        paginated["page"],
+            "limit":       paginated["limit"],
+            "has_next":    paginated["has_next"],
+            "has_prev":    paginated["has_prev"],
+            "stock_takes": [_session_dict(s) for s in paginated["data"]],
+        })
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    name = (data.get("name") or "").strip()
+    if not name:
+        return JsonResponse({"error": "name is required"}, status=400)
+
+    location = None
+    if data.get("location_id"):
+        try:
+            location = Location.objects.get(id=data["location_id"])
+        except (Location.DoesNotExist, ValueError):
+            return JsonResponse({"error": "Location not found"}, status=404)
+
+    session = StockTakeSession.objects.create(name=name, location=location, started_by=request.jwt_user)
+    return JsonResponse({"message": "Stock take started", "stock_take": _session_dict(session)}, status=201)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# UPLOAD SCANS — body: JSON lines, optionally gzip-compressed
+#   ?location_id= default location for lines without one, ?device=HH-2
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_POST
+@jwt_required
+def upload_stock_take_scans(request, session_id):
+    try:
+        session = _get_session(session_id)
+    except StockTakeSession.DoesNotExist:
+        return JsonResponse({"error": "Stock take not found"}, status=404)
+    if session.status != "OPEN":
+        return JsonResponse({"error": f"Stock take is {session.status.lower()}"}, status=409)
+
+    default_location = session.location
+    if request.GET.get("location_id"):
+        try:
+            default_location = Location.objects.get(id=request.GET["location_id"])
+        except (Location.DoesNotExist, ValueError):
+            return JsonResponse({"error": "Location not found"}, status=404)
+
+    try:
+        result = load_scans(session, request.body, default_location, device=request.GET.get("device", ""))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({"message": f"Loaded {result['loaded']} scan(s)", "stock_take_id": session.id, **result}, status=201)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DISCREPANCIES — missing / misplaced / unexpected / unknown / condition (?limit=)
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_GET
+@jwt_required
+def stock_take_discrepancies(request, session_id):
+    try:
+        session = _get_session(session_id)
+    except StockTakeSession.DoesNotExist:
+        return JsonResponse({"error": "Stock take not found"}, status=404)
+
+    try:
+        limit = min(MAX_LISTED, max(1, int(request.GET.get("limit", MAX_LISTED))))
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer"}, status=400)
+
+    return JsonResponse({"stock_take": _session_dict(session), **discrepancies(session, limit)})
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# APPLY CORRECTIONS — {"locations": true, "conditions": true}; CLOSE — no more uploads
+# ─────────────────────────────────────────────────────────────────────────────
+
+@csrf_exempt
+@require_POST
+@jwt_required
+def apply_stock_take(request, session_id):
+    try:
+        data = json.loads(request.body or b"{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    try:
+        session = _get_session(session_id)
+    except StockTakeSession.DoesNotExist:
+        return JsonResponse({"error": "Stock take not found"}, status=404)
+    if session.status == "CLOSED":
+        return JsonResponse({"error": "Stock take is closed"}, status=409)
+
+    applied = apply_corrections(
+        session,
+        user       = request.jwt_user,
+        locations  = bool(data.get("locations", True)),
+        conditions = bool(data.get("conditions", True)),
+    )
+    return JsonResponse({"message": "Corrections applied", "applied": applied, "stock_take": _session_dict(session)})
+
+
+@csrf_exempt
+@require_POST
+@jwt_required
+def close_stock_take(request, session_id):
+    try:
+        session = close_session(_get_session(session_id))
+    except StockTakeSession.DoesNotExist:
+        return JsonResponse({"error": "Stock take not found"}, status=404)
+    return JsonResponse({"message": "Stock take closed", "stock_take": _session_dict(session)})
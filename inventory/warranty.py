@@ -0,0 +1,110 @@
+# inventory/warranty.py
+"""
+Warranty status maintenance.
+
+`refresh_warranty_statuses` recomputes Asset.warranty_status from
+warranty_end with one set-based UPDATE (no per-row saves), and
+`upcoming_expiry_digest` groups soon-to-expire assets by vendor in a single
+GROUP BY query. Both run nightly from inventory.tasks.refresh_warranty_status.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Case, Count, Min, Q, Value, When
+from django.utils import timezone
+
+from .detail_page import detail_cache_key
+from .models import Asset
+
+logger = logging.getLogger(__name__)
+
+WARRANTY_DIGEST_DAYS       = getattr(settings, "WARRANTY_DIGEST_DAYS", 30)
+WARRANTY_DIGEST_RECIPIENTS = getattr(settings, "WARRANTY_DIGEST_RECIPIENTS", [])
+
+
+def warranty_status_for(warranty_end, today=None):
+    if not warranty_end:
+        return None
+    today = today or timezone.localdate()
+    return "EXPIRED" if warranty_end < today else "ACTIVE"
+
+
+def refresh_warranty_statuses(today=None):
+    """
+    ACTIVE → EXPIRED for warranty_end < today (and back to ACTIVE for
+    extended warranties, and fills in missing statuses) in one UPDATE.
+    Returns the number of assets changed.
+    """
+    today = today or timezone.localdate()
+    stale = Asset.objects.filter(
+        Q(warranty_end__lt=today) & ~Q(warranty_status="EXPIRED")
+        | Q(warranty_end__gte=today) & ~Q(warranty_status="ACTIVE")
+    )
+
+    with transaction.atomic():
+        # ids only for cache invalidation — the UPDATE itself stays set-based
+        changed_ids = list(stale.select_for_update().values_list("id", flat=True))
+        if not changed_ids:
+            return 0
+        updated = stale.update(
+            warranty_status=Case(
+                When(warranty_end__lt=today, then=Value("EXPIRED")),
+                default=Value("ACTIVE"),
+            ),
+            # bump updated_at so the details page ETag changes too
+            updated_at=timezone.now(),
+        )
+        transaction.on_commit(lambda: cache.delete_many([detail_cache_key(i) for i in changed_ids]))
+
+    return updated
+
+
+def upcoming_expiry_digest(days=None, today=None):
+    """Per-vendor counts of warranties ending in the next `days` days (one GROUP BY)."""
+    today = today or timezone.localdate()
+    days  = WARRANTY_DIGEST_DAYS if days is None else days
+
+    rows = (
+        Asset.objects
+        .filter(warranty_end__gte=today, warranty_end__lte=today + timedelta(days=days))
+        .values("vendor_id", "vendor__name")
+        .annotate(assets=Count("id"), first_expiry=Min("warranty_end"))
+        .order_by("first_expiry", "vendor__name")
+    )
+    return [
+        {
+            "vendor_id":    row["vendor_id"],
+            "vendor_name":  row["vendor__name"] or "No vendor",
+            "assets":       row["assets"],
+            "first_expiry": row["first_expiry"].isoformat(),
+        }
+        for row in rows
+    ]
+
+
+def send_expiry_digest(digest, days=None):
+    """Email the digest to WARRANTY_DIGEST_RECIPIENTS (no-op when unset or empty)."""
+    if not digest or not WARRANTY_DIGEST_RECIPIENTS:
+        return False
+
+    days  = WARRANTY_DIGEST_DAYS if days is None else days
+    lines = [
+        f"{row['vendor_name']}: {row['assets']} asset(s), first expiry {row['first_expiry']}"
+        for row in digest
+    ]
+    try:
+        send_mail(
+            f"Warranty expiries in the next {days} days",
+            "\n".join(lines),
+            getattr(settings, "DEFAULT_FROM_EMAIL", None),
+            WARRANTY_DIGEST_RECIPIENTS,
+            fail_silently=False,
+        )
+    except Exception:
+        logger.exception("Could not send warranty expiry digest")
+        return False
+    return True
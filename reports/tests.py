@@ -1,3 +1,41 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.test import Client, TestCase, override_settings
+
+from inventory.models import Asset, PurchaseRequest
+from users.jwt_utils import generate_token
+from users.models import User
+
+
+class PurchaseListInvoiceTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        admin = User.objects.create(email="admin@example.com", name="Admin", role="ADMIN")
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {generate_token(admin)}"
+
+        asset = Asset.objects.create(
+            asset_tag="LAP-0001", brand="Dell", model_name="Latitude 5440", category="LAPTOP",
+            total_quantity=1, available_quantity=1, purchase_date=date(2025, 1, 1), purchase_price=100,
+        )
+        request = PurchaseRequest.objects.create(
+            asset=asset, request_type="MANUAL", triggered_by="ADMIN", quantity_needed=2,
+        )
+        request.invoice_attachment.save("invoice.pdf", ContentFile(b"%PDF-1.4 invoice"), save=True)
+
+    def test_invoice_link_goes_through_protected_media(self):
+        response = self.client.get("/api/reports/purchases/list/")
+        self.assertEqual(response.status_code, 200)
+        url = response.json()["purchase_requests"][0]["invoice_attachment"]
+
+        self.assertTrue(url.startswith("/api/inventory/media/"))
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(Client().get(url).status_code, 401)
@@ -24,9 +24,17 @@ urlpatterns = [
     path("assets/currently-issued/", views.report_currently_issued_assets, name="report_currently_issued_assets"),
 
     # GET /api/reports/assets/low-stock/
-    # Assets with LOW_STOCK or OUT_OF_STOCK status
+    # Assets with LOW_STOCK or OUT_OF_STOCK status + depletion forecast — ?forecast_days=14 adds assets projected to run out
     path("assets/low-stock/", views.report_low_stock_assets, name="report_low_stock_assets"),
 
+    # GET /api/reports/assets/by-location/
+    # On-hand units per child location of ?location_id= (top level when omitted) — ?category=
+    path("assets/by-location/", views.report_stock_by_location, name="report_stock_by_location"),
+
+    # GET /api/reports/assets/utilization/
+    # Issued share of each asset / category over a window, idle-time histogram — ?from_date=&to_date=&category=&sort=idle|busy
+    path("assets/utilization/", views.report_asset_utilization, name="report_asset_utilization"),
+
     # GET /api/reports/assets/warranty-expiry/
     # Expired or expiring warranties — ?days=30 for next 30 days
     path("assets/warranty-expiry/", views.report_warranty_expiry, name="report_warranty_expiry"),
@@ -94,6 +102,14 @@ urlpatterns = [
     # All vendors with total assets purchased and total spend
     path("purchases/vendor-summary/", views.report_vendor_summary, name="report_vendor_summary"),
 
+    # GET /api/reports/purchases/vendor-scorecards/
+    # Spend, assets, damage/loss rate, avg lead time per vendor (from the monthly rollup) — ?from_date=&to_date=
+    path("purchases/vendor-scorecards/", views.report_vendor_scorecards, name="report_vendor_scorecards"),
+
+    # GET /api/reports/purchases/depreciation/
+    # Fleet book value, per-category totals, year-end schedule — ?as_of=&scenario=year_end&year=&schedule_years=&category=
+    path("purchases/depreciation/", views.report_depreciation, name="report_depreciation"),
+
 
     # ─────────────────────────────────────────
     # AUDIT LOG & DASHBOARD
@@ -1,14 +1,25 @@
 # reports/views.py
 import csv
+from datetime import date, timedelta
+from decimal import Decimal
 from io import StringIO
 
+import numpy as np
+
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
-from django.db.models import Count, Sum, Q
-from django.db.models.functions import TruncMonth, TruncDate
-
-from inventory.models import Asset, AssetDetails, PurchaseRequest, Vendor
+from django.db.models import Count, DecimalField, DurationField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth, TruncDate
+
+from inventory.models import Asset, AssetChange, AssetDetails, AssetStock, Location, PurchaseRequest, Vendor
+from inventory.depreciation import asset_rows, fleet_valuation
+from inventory.forecasting import forecast_row
+from inventory.locations import rollup_by_child, subtree_stock
+from inventory.rollups import vendor_scorecards
+from inventory.storage import protected_url
+from inventory.utilization import DEFAULT_WINDOW_DAYS, MAX_WINDOW_DAYS, fleet_utilization
+from inventory.utilization import asset_rows as utilization_rows
 from Tickets.models import Ticket, AssignedTicket, Workflow, WorkflowStep
 from users.models import User
 
@@ -301,7 +312,24 @@ def report_currently_issued_assets(request):
 @require_http_methods(["GET"])
 @jwt_required
 def report_low_stock_assets(request):
-    assets = Asset.objects.select_related("vendor").filter(status__in=["LOW_STOCK", "OUT_OF_STOCK"])
+    """
+    LOW_STOCK / OUT_OF_STOCK assets with their depletion forecast
+    (inventory/forecasting.py — read from StockForecast, not recomputed).
+    ?forecast_days=14 also lists assets projected to run out within 14 days.
+    """
+    low = Q(status__in=["LOW_STOCK", "OUT_OF_STOCK"])
+    if request.GET.get("forecast_days"):
+        try:
+            horizon = timezone.localdate() + timedelta(days=int(request.GET["forecast_days"]))
+        except (ValueError, OverflowError):
+            return JsonResponse({"error": "forecast_days must be an integer"}, status=400)
+        low |= Q(forecast__stockout_date__lte=horizon)
+
+    assets = (
+        Asset.objects.select_related("vendor", "forecast")
+        .filter(low)
+        .order_by(F("forecast__stockout_date").asc(nulls_last=True), "id")
+    )
 
     rows = []
     for a in assets:
@@ -316,12 +344,14 @@ def report_low_stock_assets(request):
             "available_quantity":  a.available_quantity,
             "minimum_stock_level": a.minimum_stock_level,
             "vendor_name":         a.vendor.name if a.vendor else "",
+            **forecast_row(getattr(a, "forecast", None)),
         })
 
     if _wants_csv(request):
         headers = [
             "asset_id","asset_tag","brand","model_name","category","status",
             "total_quantity","available_quantity","minimum_stock_level","vendor_name",
+            "daily_rate","stockout_date","reorder_date","lead_time_days","recommended_quantity","forecast_at",
         ]
         return _csv_response("low_stock_assets", headers, rows)
 
@@ -339,53 +369,215 @@ def report_low_stock_assets(request):
     })
 
 
+@require_http_methods(["GET"])
+@jwt_required
+def report_stock_by_location(request):
+    """
+    On-hand units rolled up one level below ?location_id= (top-level
+    locations when omitted), optionally for one ?category=. One grouped
+    query over the subtree; units at the location itself are reported
+    under its own id.
+    """
+    root = None
+    if request.GET.get("location_id"):
+        try:
+            root = Location.objects.get(id=request.GET["location_id"])
+        except (Location.DoesNotExist, ValueError):
+            return JsonResponse({"error": "Location not found"}, status=404)
+
+    stock    = subtree_stock(root) if root else AssetStock.objects.all()
+    category = request.GET.get("category")
+    if category:
+        stock = stock.filter(asset__category__iexact=category)
+
+    if root:
+        totals   = rollup_by_child(root, stock)
+        children = list(Location.objects.filter(parent=root).order_by("name")) + [root]
+    else:
+        # Top level: roll every path up to its first segment
+        totals = {}
+        for path, units in stock.values_list("location__path").annotate(units=Sum("quantity")).order_by():
+            top_id = int(path.strip("/").split("/", 1)[0])
+            totals[top_id] = totals.get(top_id, 0) + (units or 0)
+        children = list(Location.objects.filter(parent__isnull=True).order_by("name"))
+
+    rows = [
+        {
+            "location_id": loc.id,
+            "code":        loc.code,
+            "name":        loc.name,
+            "kind":        loc.kind,
+            "units":       totals.get(loc.id, 0),
+        }
+        for loc in children
+        if loc is not root or totals.get(loc.id)
+    ]
+
+    if _wants_csv(request):
+        return _csv_response("stock_by_location", ["location_id", "code", "name", "kind", "units"], rows)
+
+    return JsonResponse({
+        "report":       "Stock by Location",
+        "generated_at": timezone.now().isoformat(),
+        "location_id":  root.id if root else None,
+        "category":     category or None,
+        "total_units":  sum(row["units"] for row in rows),
+        "locations":    rows,
+    })
+
+
+@require_http_methods(["GET"])
+@jwt_required
+def report_asset_utilization(request):
+    """
+    Share of each asset's units that was issued over a window
+    (inventory/utilization.py).
+    ?from_date=&to_date= — YYYY-MM-DD, default the last 90 days
+    ?category=LAPTOP — narrows the per-asset rows (totals stay fleet-wide)
+    ?sort=idle (default, least used first) | busy
+    CSV returns every per-asset row.
+    """
+    to_date = timezone.localdate()
+    try:
+        if request.GET.get("to_date"):
+            to_date = date.fromisoformat(request.GET["to_date"])
+        from_date = (
+            date.fromisoformat(request.GET["from_date"]) if request.GET.get("from_date")
+            else to_date - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+        )
+    except ValueError:
+        return JsonResponse({"error": "from_date and to_date must be YYYY-MM-DD"}, status=400)
+    if from_date > to_date:
+        return JsonResponse({"error": "from_date must not be after to_date"}, status=400)
+    if (to_date - from_date).days >= MAX_WINDOW_DAYS:
+        return JsonResponse({"error": f"The window can span at most {MAX_WINDOW_DAYS} days"}, status=400)
+
+    sort = request.GET.get("sort", "idle").lower()
+    if sort not in ("idle", "busy"):
+        return JsonResponse({"error": "sort must be idle or busy"}, status=400)
+
+    result = fleet_utilization(from_date, to_date)
+    assets = result["assets"]
+
+    category = request.GET.get("category")
+    if category:
+        mask   = assets["category"] == category.upper()
+        assets = {column: values[mask] for column, values in assets.items()}
+
+    # Stable sort on the arrays, ties by asset id
+    order = np.lexsort((assets["id"], assets["utilization"] if sort == "idle" else -assets["utilization"]))
+
+    if _wants_csv(request):
+        headers = [
+            "asset_id","asset_tag","category","units","issued_unit_days",
+            "capacity_unit_days","utilization","idle_days",
+        ]
+        return _csv_response(
+            f"asset_utilization_{from_date.isoformat()}_{to_date.isoformat()}",
+            headers, utilization_rows(assets, order),
+        )
+
+    page_info = _paginate(request, range(len(order)))
+    rows      = list(utilization_rows(assets, order, page_info["data"].start, page_info["data"].stop))
+
+    return JsonResponse({
+        "report":         "Asset Utilization",
+        "generated_at":   timezone.now().isoformat(),
+        "window":         result["window"],
+        "totals":         result["totals"],
+        "by_category":    result["by_category"],
+        "idle_histogram": result["idle_histogram"],
+        "total_assets":   page_info["total"],
+        "total_pages":    page_info["total_pages"],
+        "page":           page_info["page"],
+        "limit":          page_info["limit"],
+        "has_next":       page_info["has_next"],
+        "has_prev":       page_info["has_prev"],
+        "assets":         rows,
+    })
+
+
 @require_http_methods(["GET"])
 @jwt_required
 def report_warranty_expiry(request):
-    from datetime import timedelta
-    today = timezone.now().date()
-    days  = int(request.GET.get("days", 0))
+    """
+    Filtered, days_left computed and keyset-paginated in SQL on the
+    (warranty_end, id) index. Query params: ?days=&limit=&cursor=
+    (cursor = next_cursor from the previous page).
+    """
+    today = timezone.localdate()
+    try:
+        days = int(request.GET.get("days", 0))
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "days must be an integer"}, status=400)
 
-    assets = Asset.objects.select_related("vendor").exclude(warranty_end__isnull=True)
+    assets = Asset.objects.exclude(warranty_end__isnull=True)
     if days:
-        threshold = today + timedelta(days=days)
-        assets = assets.filter(warranty_end__lte=threshold)
+        assets = assets.filter(warranty_end__lte=today + timedelta(days=days))
     else:
         assets = assets.filter(warranty_end__lt=today)
 
-    rows = []
-    for a in assets:
-        rows.append({
-            "asset_id":          a.id,
-            "asset_tag":         a.asset_tag,
-            "brand":             a.brand,
-            "model_name":        a.model_name,
-            "category":          a.category,
-            "warranty_end":      a.warranty_end.isoformat(),
-            "warranty_status":   a.warranty_status,
-            "days_until_expiry": (a.warranty_end - today).days,
-            "vendor_name":       a.vendor.name if a.vendor else "",
-        })
+    rows = (
+        assets
+        .annotate(
+            days_left=ExpressionWrapper(F("warranty_end") - Value(today), output_field=DurationField()),
+            vendor_name=Coalesce("vendor__name", Value("")),
+        )
+        .order_by("warranty_end", "id")
+        .values(
+            "id", "asset_tag", "brand", "model_name", "category",
+            "warranty_end", "warranty_status", "days_left", "vendor_name",
+        )
+    )
+
+    def _row(a):
+        return {
+            "asset_id":          a["id"],
+            "asset_tag":         a["asset_tag"],
+            "brand":             a["brand"],
+            "model_name":        a["model_name"],
+            "category":          a["category"],
+            "warranty_end":      a["warranty_end"].isoformat(),
+            "warranty_status":   a["warranty_status"],
+            "days_until_expiry": a["days_left"].days,
+            "vendor_name":       a["vendor_name"],
+        }
 
     if _wants_csv(request):
         headers = [
             "asset_id","asset_tag","brand","model_name","category",
             "warranty_end","warranty_status","days_until_expiry","vendor_name",
         ]
-        return _csv_response("warranty_expiry", headers, rows)
+        return _csv_response("warranty_expiry", headers, (_row(a) for a in rows.iterator(chunk_size=2000)))
+
+    try:
+        limit = max(1, min(500, int(request.GET.get("limit", 10))))
+    except (TypeError, ValueError):
+        limit = 10
+
+    cursor = request.GET.get("cursor")
+    if cursor:
+        try:
+            after_end, after_id = cursor.split(",", 1)
+            after_end, after_id = date.fromisoformat(after_end), int(after_id)
+        except ValueError:
+            return JsonResponse({"error": "Invalid cursor"}, status=400)
+        # ✅ Keyset: seek past the last row of the previous page — no OFFSET scan
+        rows = rows.filter(Q(warranty_end__gt=after_end) | Q(warranty_end=after_end, id__gt=after_id))
+
+    page     = [_row(a) for a in rows[:limit + 1]]
+    has_next = len(page) > limit
+    page     = page[:limit]
 
-    paginated = _paginate(request, rows)
     return JsonResponse({
         "report":       "Warranty Expiry Report",
         "generated_at": timezone.now().isoformat(),
         "filter_days":  days or "expired only",
-        "total":        paginated["total"],
-        "total_pages":  paginated["total_pages"],
-        "page":         paginated["page"],
-        "limit":        paginated["limit"],
-        "has_next":     paginated["has_next"],
-        "has_prev":     paginated["has_prev"],
-        "assets":       paginated["data"],
+        "total":        assets.count(),
+        "limit":        limit,
+        "has_next":     has_next,
+        "next_cursor":  f"{page[-1]['warranty_end']},{page[-1]['asset_id']}" if has_next else None,
+        "assets":       page,
     })
 
 
@@ -916,7 +1108,7 @@ def report_purchase_full_list(request):
             "quantity_needed":    pr.quantity_needed,
             "status":             pr.status,
             "remarks":            pr.remarks or "",
-            "invoice_attachment": pr.invoice_attachment.url if pr.invoice_attachment else "",
+            "invoice_attachment": protected_url(pr.invoice_attachment) or "",
             "created_at":         pr.created_at.isoformat(),
             "updated_at":         pr.updated_at.isoformat(),
         })
@@ -946,15 +1138,18 @@ def report_purchase_full_list(request):
 @require_http_methods(["GET"])
 @jwt_required
 def report_vendor_summary(request):
-    vendors = Vendor.objects.all()
+    # ✅ One GROUP BY query for every vendor (was 2 queries per vendor)
+    vendors = (
+        Vendor.objects
+        .annotate(
+            asset_count=Count("assets"),
+            total_spend=Coalesce(Sum("assets__purchase_price"), Value(Decimal("0")), output_field=DecimalField()),
+        )
+        .order_by("id")
+    )
 
     rows = []
     for v in vendors:
-        asset_count = Asset.objects.filter(vendor=v).count()
-        total_spend = Asset.objects.filter(
-            vendor=v
-        ).aggregate(total=Sum("purchase_price"))["total"] or 0
-
         rows.append({
             "vendor_id":              v.id,
             "name":                   v.name,
@@ -962,8 +1157,8 @@ def report_vendor_summary(request):
             "phone":                  v.phone or "",
             "email":                  v.email or "",
             "gst_number":             v.gst_number or "",
-            "total_assets_purchased": asset_count,
-            "total_spend":            float(total_spend),
+            "total_assets_purchased": v.asset_count,
+            "total_spend":            float(v.total_spend),
         })
 
     if _wants_csv(request):
@@ -987,6 +1182,109 @@ def report_vendor_summary(request):
     })
 
 
+@require_http_methods(["GET"])
+@jwt_required
+def report_vendor_scorecards(request):
+    """
+    Spend, asset count, damage/loss rate and average lead time per vendor,
+    read from the VendorMonthlySpend rollup. ?from_date=&to_date= select months.
+    """
+    from_date, to_date = _date_filters(request)
+    rows = vendor_scorecards(from_month=from_date, to_month=to_date)
+
+    if _wants_csv(request):
+        headers = [
+            "vendor_id","vendor_name","total_spend","assets_purchased","units_received",
+            "units_issued","units_damaged_lost","damage_loss_rate","avg_lead_time_days",
+        ]
+        return _csv_response("vendor_scorecards", headers, rows)
+
+    paginated = _paginate(request, rows)
+    return JsonResponse({
+        "report":        "Vendor Scorecards",
+        "generated_at":  timezone.now().isoformat(),
+        "from_date":     from_date,
+        "to_date":       to_date,
+        "total_vendors": paginated["total"],
+        "total_pages":   paginated["total_pages"],
+        "page":          paginated["page"],
+        "limit":         paginated["limit"],
+        "has_next":      paginated["has_next"],
+        "has_prev":      paginated["has_prev"],
+        "vendors":       paginated["data"],
+    })
+
+
+@require_http_methods(["GET"])
+@jwt_required
+def report_depreciation(request):
+    """
+    Fleet book value and depreciation (inventory/depreciation.py).
+    ?as_of=YYYY-MM-DD (default today)
+    ?scenario=year_end[&year=2027] — value the fleet at 31 Dec of that year
+    ?schedule_years=5 — book value at each following year end
+    ?category=LAPTOP — narrows the per-asset rows (totals stay fleet-wide)
+    CSV returns every per-asset row.
+    """
+    as_of = timezone.localdate()
+    if request.GET.get("as_of"):
+        try:
+            as_of = date.fromisoformat(request.GET["as_of"])
+        except ValueError:
+            return JsonResponse({"error": "as_of must be YYYY-MM-DD"}, status=400)
+
+    scenario = request.GET.get("scenario")
+    if scenario not in (None, "", "year_end"):
+        return JsonResponse({"error": "scenario must be year_end"}, status=400)
+    if scenario == "year_end":
+        try:
+            as_of = date(int(request.GET.get("year", as_of.year)), 12, 31)
+        except ValueError:
+            return JsonResponse({"error": "year must be an integer"}, status=400)
+
+    try:
+        schedule_years = int(request.GET.get("schedule_years", 5))
+    except ValueError:
+        return JsonResponse({"error": "schedule_years must be an integer"}, status=400)
+
+    valuation = fleet_valuation(as_of, schedule_years)
+    assets    = valuation["assets"]
+
+    category = request.GET.get("category")
+    if category:
+        mask   = assets["category"] == category.upper()
+        assets = {column: values[mask] for column, values in assets.items()}
+
+    if _wants_csv(request):
+        headers = [
+            "asset_id","asset_tag","category","condition","purchase_date","method",
+            "cost","book_value","accumulated_depreciation",
+        ]
+        return _csv_response(f"depreciation_{as_of.isoformat()}", headers, asset_rows(assets))
+
+    # Paginate on the arrays — only the requested page becomes dicts
+    page_info = _paginate(request, range(len(assets["id"])))
+    rows      = list(asset_rows(assets, page_info["data"].start, page_info["data"].stop))
+
+    return JsonResponse({
+        "report":         "Fleet Depreciation",
+        "generated_at":   timezone.now().isoformat(),
+        "as_of":          valuation["as_of"],
+        "scenario":       scenario or None,
+        "policy_version": valuation["policy_version"],
+        "totals":         valuation["totals"],
+        "by_category":    valuation["by_category"],
+        "schedule":       valuation["schedule"],
+        "total_assets":   page_info["total"],
+        "total_pages":    page_info["total_pages"],
+        "page":           page_info["page"],
+        "limit":          page_info["limit"],
+        "has_next":       page_info["has_next"],
+        "has_prev":       page_info["has_prev"],
+        "assets":         rows,
+    })
+
+
 # ============================================================
 # 5. AUDIT LOG
 # ============================================================
@@ -1000,6 +1298,8 @@ def report_audit_log(request):
     asset_records  = _apply_date_range(asset_records, "created_at", from_date, to_date)
     ticket_history = AssignedTicket.objects.select_related("ticket", "assigned_to").all()
     ticket_history = _apply_date_range(ticket_history, "action_date", from_date, to_date)
+    asset_changes  = AssetChange.objects.select_related("asset", "changed_by").all()
+    asset_changes  = _apply_date_range(asset_changes, "created_at", from_date, to_date)
 
     events = []
 
@@ -1016,6 +1316,19 @@ def report_audit_log(request):
             "remarks":           r.remarks or "",
         })
 
+    for ch in asset_changes:
+        events.append({
+            "event_type":        "ASSET_EDIT",
+            "action":            ch.field.upper(),
+            "timestamp":         ch.created_at.isoformat(),
+            "actor":             ch.changed_by.name if ch.changed_by else "System",
+            "actor_email":       ch.changed_by.email if ch.changed_by else "",
+            "target_user":       "",
+            "target_user_email": "",
+            "detail":            f"Asset {ch.asset.asset_tag} — {ch.field}: {ch.old_value or '—'} → {ch.new_value or '—'}",
+            "remarks":           ch.remarks or "",
+        })
+
     for h in ticket_history:
         events.append({
             "event_type":        "TICKET",
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:44
+
+import inventory.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_workflow'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='profile_image',
+            field=models.ImageField(blank=True, null=True, storage=inventory.storage.ContentAddressedStorage(), upload_to='profile_images/'),
+        ),
+    ]
@@ -6,6 +6,8 @@ from django.contrib.auth.models import (
     PermissionsMixin
 )
 
+from inventory.storage import content_addressed_storage
+
 class Role(models.Model):
     name = models.CharField(max_length=50, unique=True)  # e.g. EMPLOYEE, TEAM_PMO, HR
     is_active = models.BooleanField(default=True)
@@ -81,7 +83,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     designation = models.CharField(max_length=100, blank=True, null=True)  
 
     # For storing the employee's image
-    profile_image = models.ImageField(upload_to='profile_images/', blank=True, null=True)  
+    profile_image = models.ImageField(upload_to='profile_images/', storage=content_addressed_storage, blank=True, null=True)  
 
     # ✅ NEW (minimal onboarding/offboarding)
     employment_status = models.CharField(
@@ -8,6 +8,7 @@ from django.core.files.base import ContentFile
 from django.utils import timezone
 
 from Tickets.models import Workflow, WorkflowStep
+from inventory.images import derivative_urls, enqueue_derivatives
 
 # JWT imports
 from .jwt_utils import (
@@ -89,6 +90,7 @@ def register_user(request):
 
         user.set_password(password)
         user.save()
+        enqueue_derivatives(user.profile_image)
 
         # ✅ Generate JWT tokens
         access_token = generate_token(user)
@@ -100,6 +102,7 @@ def register_user(request):
             "role": user.role,
             "employment_status": user.employment_status,
             "profile_image": user.profile_image.url if user.profile_image else None,
+            "profile_image_derivatives": derivative_urls(user.profile_image),
             "tokens": {
                 "access": access_token,
                 "refresh": refresh_token,
@@ -245,6 +248,8 @@ def update_user(request):
         user.profile_image = request.FILES['profile_image']
 
     user.save()
+    if 'profile_image' in request.FILES:
+        enqueue_derivatives(user.profile_image)
 
     return JsonResponse({
         "message": "User updated successfully",
@@ -337,11 +342,13 @@ def upload_employee_image(request):
     # Save the image to the model
     user.profile_image = profile_image
     user.save()
+    enqueue_derivatives(user.profile_image)
 
     return JsonResponse({
         "message": "Image uploaded successfully",
         "user_id": user.id,
-        "profile_image_url": user.profile_image.url
+        "profile_image_url": user.profile_image.url,
+        "profile_image_derivatives": derivative_urls(user.profile_image),
     }, status=200)
 
 
@@ -554,5 +561,6 @@ def token_me(request):
         "employment_status": user.employment_status,
         "join_date": user.join_date.isoformat() if user.join_date else None,
         "profile_image": user.profile_image.url if user.profile_image else None,
+        "profile_image_derivatives": derivative_urls(user.profile_image),
         "is_active": user.is_active,
     }, status=200)